@@ -0,0 +1,27 @@
+from functools import cache
+
+from audit.repositories import (
+    AuditLogInMemoryRepository,
+    AuditLogPostgreSQLRepository,
+)
+from audit.services import AuditLogService
+from settings import get_settings
+
+
+@cache
+def audit_log_service() -> AuditLogService:
+    settings = get_settings()
+    return AuditLogService(
+        (
+            AuditLogInMemoryRepository()
+            if settings.USERS_REPOSITORY == "memory"
+            else AuditLogPostgreSQLRepository
+        ),
+        batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+        flush_interval=settings.AUDIT_LOG_FLUSH_INTERVAL_SECONDS,
+        max_buffer_size=settings.AUDIT_LOG_MAX_BUFFER_SIZE,
+        retention_days=settings.AUDIT_LOG_RETENTION_DAYS,
+        partitions_ahead_days=settings.AUDIT_LOG_PARTITIONS_AHEAD_DAYS,
+        maintenance_interval=settings.AUDIT_LOG_MAINTENANCE_INTERVAL_SECONDS,
+        max_retry_interval=settings.AUDIT_LOG_MAX_RETRY_INTERVAL_SECONDS,
+    )
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Sequence
+from sqlmodel import SQLModel, Field
+
+audit_log_id_seq = Sequence("auth_audit_log_id_seq")
+
+
+class AuditEvent(SQLModel, table=True):
+    """
+    ORM-модель записи журнала аудита безопасности.
+    Таблица секционирована по времени события (секция на сутки),
+    старые секции удаляются по истечении срока хранения.
+    Attrs:
+        id (int): Идентификатор записи.
+        created_at (datetime): Время события (ключ секционирования).
+        event_type (str): Тип события: `login` или `refresh`.
+        success (bool): Успешно ли завершилось действие.
+        user_id (Optional[int]): Идентификатор пользователя, если известен.
+        email (Optional[str]): Email, указанный при входе.
+        ip (Optional[str]): IP-адрес клиента.
+    """
+
+    __tablename__ = "auth_audit_log"
+    __table_args__ = (
+        Index("ix_auth_audit_log_user_id_created_at", "user_id", "created_at"),
+        Index("ix_auth_audit_log_email_created_at", "email", "created_at"),
+        {
+            "extend_existing": True,
+            "postgresql_partition_by": "RANGE (created_at)",
+        },
+    )
+    id: int = Field(
+        default=None,
+        sa_column=Column(
+            BigInteger,
+            audit_log_id_seq,
+            server_default=audit_log_id_seq.next_value(),
+            primary_key=True,
+        ),
+    )
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), primary_key=True)
+    )
+    event_type: str
+    success: bool
+    user_id: Optional[int] = Field(
+        default=None, sa_column=Column(BigInteger, nullable=True)
+    )
+    email: Optional[str] = None
+    ip: Optional[str] = None
@@ -0,0 +1,144 @@
+import logging
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy import insert, text
+
+from audit.models import AuditEvent
+from database import async_session
+
+PARTITION_PREFIX = f"{AuditEvent.__tablename__}_p"
+# Ключ advisory lock: обслуживание секций выполняет только один воркер.
+MAINTENANCE_LOCK_KEY = 7_310_310_001
+
+
+class AuditLogAbstractRepository(ABC):
+    """
+    Абстрактный репозиторий журнала аудита.
+
+    Определяет базовые методы для:
+    - пакетной записи событий,
+    - обслуживания секций (создание новых и удаление устаревших).
+    """
+
+    @abstractmethod
+    async def add_many(self, events: List[dict]) -> None:
+        """
+        Записывает пачку событий одним запросом.
+        Args:
+            events (List[dict]): События.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def maintain_partitions(
+        self, days_ahead: int, retention_days: int
+    ) -> None:
+        """
+        Создаёт секции на days_ahead дней вперёд и удаляет секции
+        старше retention_days дней.
+        Args:
+            days_ahead (int): На сколько дней вперёд создавать секции.
+            retention_days (int): Срок хранения записей в днях.
+        """
+        raise NotImplementedError
+
+
+class AuditLogPostgreSQLRepository(AuditLogAbstractRepository):
+    """
+    Репозиторий журнала аудита с использованием PostgreSQL и SQLAlchemy Async.
+    Пачка событий записывается многострочным INSERT.
+    """
+
+    @staticmethod
+    async def add_many(events: List[dict]) -> None:
+        async with async_session() as session:
+            await session.execute(insert(AuditEvent), events)
+            await session.commit()
+
+    @staticmethod
+    async def maintain_partitions(days_ahead: int, retention_days: int) -> None:
+        today = datetime.now(timezone.utc).date()
+        async with async_session() as session:
+            async with session.begin():
+                locked = await session.scalar(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"),
+                    {"key": MAINTENANCE_LOCK_KEY},
+                )
+                if not locked:
+                    return
+                for days in range(days_ahead + 1):
+                    day = today + timedelta(days=days)
+                    await session.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS {partition_name(day)} "
+                            f"PARTITION OF {AuditEvent.__tablename__} "
+                            f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+                            f"TO ('{(day + timedelta(days=1)).isoformat()} "
+                            "00:00:00+00')"
+                        )
+                    )
+                result = await session.scalars(
+                    text(
+                        "SELECT child.relname FROM pg_inherits "
+                        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                        "JOIN pg_class parent "
+                        "ON parent.oid = pg_inherits.inhparent "
+                        "WHERE parent.relname = :table"
+                    ),
+                    {"table": AuditEvent.__tablename__},
+                )
+                oldest = today - timedelta(days=retention_days)
+                for name in result.all():
+                    day = partition_day(name)
+                    if day is not None and day < oldest:
+                        logging.info("dropping audit log partition %s", name)
+                        await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+class AuditLogInMemoryRepository(AuditLogAbstractRepository):
+    """
+    Репозиторий журнала аудита, хранящий события в памяти процесса.
+    """
+
+    def __init__(self):
+        self.events: List[dict] = []
+
+    async def add_many(self, events: List[dict]) -> None:
+        self.events.extend(events)
+
+    async def maintain_partitions(
+        self, days_ahead: int, retention_days: int
+    ) -> None:
+        oldest = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        self.events = [
+            event for event in self.events if event["created_at"] >= oldest
+        ]
+
+
+def partition_name(day: date) -> str:
+    """
+    Имя секции журнала аудита за день.
+    Args:
+        day (date): День.
+    Returns:
+        str: Имя секции.
+    """
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_day(name: str):
+    """
+    День, за который хранит данные секция.
+    Args:
+        name (str): Имя секции.
+    Returns:
+        Optional[date]: День или None, если имя не соответствует шаблону.
+    """
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+    except ValueError:
+        return None
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from audit.repositories import AuditLogAbstractRepository
+from utils.metrics import metrics
+
+
+class AuditLogService:
+    """
+    Буферизованный журнал аудита безопасности.
+    События накапливаются в памяти и записываются пачками при достижении
+    batch_size событий или по истечении flush_interval секунд.
+    Если буфер заполнен, запись события ожидает освобождения места.
+    Пачка, которую не удалось записать, возвращается в буфер (события,
+    для которых в нём нет места, теряются) и записывается повторно
+    с экспоненциально растущей паузой, не больше max_retry_interval.
+    Пока сервис не запущен (start), события не записываются.
+
+    Внешние зависимости: AuditLogAbstractRepository.
+    """
+
+    def __init__(
+        self,
+        repo: AuditLogAbstractRepository,
+        batch_size: int,
+        flush_interval: float,
+        max_buffer_size: int,
+        retention_days: int,
+        partitions_ahead_days: int,
+        maintenance_interval: float,
+        max_retry_interval: float,
+    ):
+        """
+        Инициализация журнала аудита.
+        Args:
+            repo (AuditLogAbstractRepository): Репозиторий журнала аудита.
+            batch_size (int): Размер пачки для записи.
+            flush_interval (float): Максимальное время ожидания пачки (в секундах).
+            max_buffer_size (int): Максимальное количество событий в буфере.
+            retention_days (int): Срок хранения записей в днях.
+            partitions_ahead_days (int): На сколько дней вперёд создавать секции.
+            maintenance_interval (float): Период обслуживания секций (в секундах).
+            max_retry_interval (float): Максимальная пауза перед повторной
+                записью после ошибки (в секундах).
+        """
+        self.repo = repo
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer_size = max_buffer_size
+        self.retention_days = retention_days
+        self.partitions_ahead_days = partitions_ahead_days
+        self.maintenance_interval = maintenance_interval
+        self.max_retry_interval = max_retry_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = asyncio.Event()
+        self._written = metrics.counter(
+            "auth_audit_log_events_written_total",
+            "События аудита, записанные в БД",
+        )
+        self._failed = metrics.counter(
+            "auth_audit_log_events_failed_total",
+            "События аудита, потерянные из-за ошибок записи",
+        )
+        metrics.gauge(
+            "auth_audit_log_buffer_size",
+            "События аудита, ожидающие записи",
+            lambda: self._queue.qsize() if self._queue is not None else 0,
+        )
+
+    async def record(
+        self,
+        event_type: str,
+        success: bool,
+        user_id: Optional[int] = None,
+        email: Optional[str] = None,
+        ip: Optional[str] = None,
+    ) -> None:
+        """
+        Добавляет событие в буфер.
+        Args:
+            event_type (str): Тип события.
+            success (bool): Успешно ли завершилось действие.
+            user_id (Optional[int]): Идентификатор пользователя.
+            email (Optional[str]): Email пользователя.
+            ip (Optional[str]): IP-адрес клиента.
+        """
+        if self._task is None:
+            return
+        await self._queue.put(
+            {
+                "created_at": datetime.now(timezone.utc),
+                "event_type": event_type,
+                "success": success,
+                "user_id": user_id,
+                "email": email,
+                "ip": ip,
+            }
+        )
+
+    async def start(self) -> None:
+        """
+        Запускает фоновую запись событий.
+        """
+        self._queue = asyncio.Queue(self.max_buffer_size)
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую запись, предварительно записав
+        все накопленные события.
+        """
+        if self._task is None:
+            return
+        self._stopped.set()
+        task, self._task = self._task, None
+        await task
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_maintenance = loop.time()
+        retry_interval = self.flush_interval
+        while not self._stopped.is_set() or not self._queue.empty():
+            if loop.time() >= next_maintenance:
+                await self._maintain()
+                next_maintenance = loop.time() + self.maintenance_interval
+            batch = await self._collect()
+            if not batch:
+                continue
+            if await self._write(batch):
+                retry_interval = self.flush_interval
+                continue
+            # Остановка прерывает паузу: оставшиеся события записываются
+            # одной попыткой.
+            try:
+                await asyncio.wait_for(self._stopped.wait(), retry_interval)
+            except asyncio.TimeoutError:
+                pass
+            retry_interval = min(retry_interval * 2, self.max_retry_interval)
+
+    async def _collect(self) -> List[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0 or self._stopped.is_set():
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: List[dict]) -> bool:
+        try:
+            await self.repo.add_many(batch)
+        except Exception as e:
+            logging.error("audit log write failed (%s events): %s", len(batch), e)
+            dropped = len(batch) - self._requeue(batch)
+            if dropped:
+                self._failed.inc(dropped)
+                logging.error("audit log dropped %s events", dropped)
+            return False
+        self._written.inc(len(batch))
+        return True
+
+    def _requeue(self, batch: List[dict]) -> int:
+        # После остановки повторной попытки не будет.
+        if self._stopped.is_set():
+            return 0
+        for requeued, event in enumerate(batch):
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                return requeued
+        return len(batch)
+
+    async def _maintain(self) -> None:
+        try:
+            await self.repo.maintain_partitions(
+                self.partitions_ahead_days, self.retention_days
+            )
+        except Exception as e:
+            logging.error("audit log maintenance failed: %s", e)
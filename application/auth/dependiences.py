@@ -1,7 +1,79 @@
-from auth.repositories import UsersPostgreSQLRepository
+import logging
+from functools import cache
+
+from auth.repositories import (
+    UsersAbstractRepository,
+    UsersFaultInjectionRepository,
+    UsersInMemoryRepository,
+    UsersPostgreSQLRepository,
+    UsersResilientRepository,
+    is_database_failure,
+)
 from auth.services import UserService
+from events.dependiences import outbox_repository
+from settings import get_settings
+from utils.breached_passwords import BreachedPasswordService
+from utils.circuit_breaker import CircuitBreaker
 from utils.hashes import HashService
+from utils.idempotency import IdempotencyInMemoryStore
+
+
+@cache
+def users_repository() -> UsersAbstractRepository:
+    if get_settings().USERS_REPOSITORY == "memory":
+        return UsersInMemoryRepository(outbox_repository())
+    return UsersPostgreSQLRepository
+
+
+@cache
+def service_users_repository() -> UsersAbstractRepository:
+    """
+    Репозиторий, через который работает UserService.
+    Returns:
+        UsersAbstractRepository: Репозиторий пользователей с внедрением
+            отказов и автоматическим выключателем, если они включены.
+    """
+    settings = get_settings()
+    repository = users_repository()
+    if settings.DB_FAULT_LATENCY_MS or settings.DB_FAULT_ERROR_RATE:
+        logging.warning(
+            "Внедрение отказов БД: задержка %s мс, доля ошибок %s",
+            settings.DB_FAULT_LATENCY_MS,
+            settings.DB_FAULT_ERROR_RATE,
+        )
+        repository = UsersFaultInjectionRepository(
+            repository,
+            settings.DB_FAULT_LATENCY_MS / 1000,
+            settings.DB_FAULT_ERROR_RATE,
+        )
+    if settings.DB_CIRCUIT_BREAKER_ENABLED:
+        repository = UsersResilientRepository(
+            repository,
+            CircuitBreaker(
+                "users_db",
+                settings.DB_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                settings.DB_CIRCUIT_BREAKER_RESET_SECONDS,
+                is_failure=is_database_failure,
+            ),
+            settings.DB_QUERY_TIMEOUT_SECONDS,
+            settings.DEGRADED_USER_CACHE_TTL_SECONDS,
+            settings.DEGRADED_USER_CACHE_MAX_SIZE,
+        )
+    return repository
+
+
+@cache
+def idempotency_store() -> IdempotencyInMemoryStore:
+    settings = get_settings()
+    return IdempotencyInMemoryStore(
+        settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_SIZE
+    )
 
 
 def user_service():
-    return UserService(UsersPostgreSQLRepository, HashService)
+    return UserService(
+        service_users_repository(),
+        HashService,
+        BreachedPasswordService,
+        outbox_repository(),
+    )
@@ -15,3 +15,24 @@ class VerifyPasswordError(Exception):
     """
 
     pass
+
+
+class CompromisedPasswordError(Exception):
+    """
+    Исключение, выбрасываемое при регистрации с паролем,
+    найденным в списке утёкших паролей.
+    """
+
+    pass
+
+
+class RepositoryUnavailableError(Exception):
+    """
+    Исключение, выбрасываемое, когда хранилище пользователей недоступно:
+    запрос превысил таймаут, завершился отказом БД или отклонён
+    автоматическим выключателем.
+    """
+
+    def __init__(self, message: str, retry_after: float = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
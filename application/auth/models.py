@@ -1,18 +1,64 @@
 from pydantic import EmailStr
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Sequence,
+    SmallInteger,
+    UniqueConstraint,
+    event,
+    text,
+)
 from sqlmodel import SQLModel, Field
 
+# Количество секций таблицы users. Изменение требует перераспределения
+# данных (новой миграции), поэтому это не настройка.
+USERS_SHARDS = 16
+
+users_id_seq = Sequence("users_id_seq", metadata=SQLModel.metadata)
+
 
 class User(SQLModel, table=True):
     """
     ORM-модель пользователя для хранения в базе данных.
+    Таблица секционирована по хэшу email: shard = md5(email) % USERS_SHARDS,
+    секция users_pNN на каждое значение shard. Идентификатор кодирует
+    секцию: id = nextval('users_id_seq') * USERS_SHARDS + shard.
     Attrs:
-        id (int): Уникальный идентификатор пользователя (Primary Key).
+        id (int): Уникальный идентификатор пользователя.
+        shard (int): Номер секции (ключ секционирования).
         email (EmailStr): Электронная почта пользователя (уникальное поле).
         hash_password (str): Хэшированный пароль пользователя.
     """
 
     __tablename__ = "users"
-    __table_args__ = {"extend_existing": True}
-    id: int = Field(default=None, primary_key=True)
-    email: EmailStr = Field(unique=True)
+    __table_args__ = (
+        # Ключ секционирования должен входить в уникальные ограничения;
+        # shard вычисляется из email, поэтому email остаётся уникальным.
+        UniqueConstraint("email", "shard", name="users_email_shard_key"),
+        {"extend_existing": True, "postgresql_partition_by": "LIST (shard)"},
+    )
+    id: int = Field(
+        default=None,
+        sa_column=Column(BigInteger, primary_key=True, autoincrement=False),
+    )
+    shard: int = Field(
+        default=None,
+        sa_column=Column(SmallInteger, primary_key=True, autoincrement=False),
+    )
+    email: EmailStr
     hash_password: str
+
+
+@event.listens_for(User.__table__, "after_create")
+def create_user_shards(target, connection, **kwargs) -> None:
+    """
+    Создаёт секции таблицы users при create_all (тесты, бенчмарки).
+    В рабочей БД секции создаются миграцией.
+    """
+    for shard in range(USERS_SHARDS):
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS users_p{shard:02d} "
+                f"PARTITION OF users FOR VALUES IN ({shard})"
+            )
+        )
@@ -1,10 +1,75 @@
+import asyncio
+import hashlib
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
-from auth.models import User
+from auth.exceptions import RepositoryUnavailableError
+from auth.models import USERS_SHARDS, User, users_id_seq
 from database import async_session
+from events.models import OutboxEvent
+from events.repositories import OutboxInMemoryRepository
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+def user_shard(email: str) -> int:
+    """
+    Номер секции пользователя: первые 32 бита md5(email) по модулю
+    USERS_SHARDS (то же вычисляет SQL-функция auth_user_shard).
+    Args:
+        email (str): Электронная почта пользователя.
+    Returns:
+        int: Номер секции.
+    """
+    return int(hashlib.md5(email.encode()).hexdigest()[:8], 16) % USERS_SHARDS
+
+
+def encode_user_id(sequence_value: int, shard: int) -> int:
+    """
+    Идентификатор пользователя, по которому можно определить его секцию.
+    Args:
+        sequence_value (int): Очередное значение последовательности users_id_seq.
+        shard (int): Номер секции.
+    Returns:
+        int: Идентификатор пользователя.
+    """
+    return sequence_value * USERS_SHARDS + shard
+
+
+def user_id_shard(id: int) -> int:
+    """
+    Номер секции по идентификатору пользователя (см. encode_user_id).
+    Args:
+        id (int): Идентификатор пользователя.
+    Returns:
+        int: Номер секции.
+    """
+    return id % USERS_SHARDS
+
+
+def is_database_failure(error: Exception) -> bool:
+    """
+    Является ли исключение отказом БД, а не ошибкой самого запроса.
+    Args:
+        error (Exception): Исключение, выброшенное репозиторием.
+    Returns:
+        bool: True для таймаутов, сетевых ошибок и ошибок драйвера,
+            False для нарушения ограничений (например, уникальности email).
+    """
+    if isinstance(error, IntegrityError):
+        return False
+    return isinstance(
+        error, (asyncio.TimeoutError, OSError, PoolTimeoutError, DBAPIError)
+    )
 
 
 class UsersAbstractRepository(ABC):
@@ -53,26 +118,279 @@ class UsersAbstractRepository(ABC):
 class UsersPostgreSQLRepository(UsersAbstractRepository):
     """
     Репозиторий пользователей с использованием PostgreSQL и SQLAlchemy Async.
+    Запросы содержат номер секции (по email или закодированный в id),
+    поэтому PostgreSQL обращается только к одной секции таблицы users.
+    При добавлении пользователя в той же транзакции в outbox
+    записывается событие `user.registered`.
     """
 
     @staticmethod
     async def add_one(data: dict) -> User:
+        shard = user_shard(data["email"])
         async with async_session() as session:
-            user = User(**data)
-            session.add(user)
+            result = await session.execute(
+                insert(User)
+                .values(
+                    **data,
+                    shard=shard,
+                    id=encode_user_id(users_id_seq.next_value(), shard),
+                )
+                .returning(User)
+            )
+            user = result.scalar_one()
+            session.add(
+                OutboxEvent(
+                    event_type="user.registered",
+                    payload={"id": user.id, "email": user.email},
+                )
+            )
             await session.commit()
-            await session.refresh(user)
             return user
 
     @staticmethod
     async def get_one_by_email(email: str) -> Optional[User]:
         async with async_session() as session:
-            query = select(User).where(User.email == email)
+            query = select(User).where(
+                User.shard == user_shard(email), User.email == email
+            )
             result = await session.execute(query)
             return result.scalar_one_or_none()
 
     @staticmethod
     async def get_one(id: int) -> Optional[User]:
         async with async_session() as session:
-            result = await session.get(User, id)
-            return result
+            query = select(User).where(
+                User.shard == user_id_shard(id), User.id == id
+            )
+            user = (await session.execute(query)).scalar_one_or_none()
+            if user is None:
+                # Пользователи, перенесённые из несекционированной таблицы,
+                # сохранили прежние id, которые не кодируют секцию.
+                # Они меньше любого закодированного id, поэтому совпадение
+                # в нескольких секциях - ошибка данных (MultipleResultsFound).
+                query = select(User).where(User.id == id)
+                user = (await session.execute(query)).scalar_one_or_none()
+            return user
+
+
+class UsersInMemoryRepository(UsersAbstractRepository):
+    """
+    Репозиторий пользователей, хранящий данные в памяти процесса.
+    Используется в тестах и бенчмарках, где не нужна PostgreSQL.
+    Повторяет поведение БД: секция и id вычисляются так же, email уникален
+    (с учётом регистра, как и ограничение UNIQUE в таблице users),
+    при нарушении уникальности выбрасывается IntegrityError.
+    Если передан outbox, при добавлении пользователя в него
+    записывается событие `user.registered`.
+    """
+
+    def __init__(self, outbox: Optional[OutboxInMemoryRepository] = None):
+        self.outbox = outbox
+        self._users: Dict[int, User] = {}
+        self._ids_by_email: Dict[str, int] = {}
+        self._last_id = 0
+
+    async def add_one(self, data: dict) -> User:
+        user = User(**data)
+        if user.email in self._ids_by_email:
+            raise IntegrityError(
+                "INSERT INTO users",
+                data,
+                ValueError(f"Key (email)=({user.email}) already exists."),
+            )
+        self._last_id += 1
+        user.shard = user_shard(user.email)
+        user.id = encode_user_id(self._last_id, user.shard)
+        self._users[user.id] = user
+        self._ids_by_email[user.email] = user.id
+        if self.outbox is not None:
+            self.outbox.add(
+                "user.registered", {"id": user.id, "email": user.email}
+            )
+        return self._copy(user)
+
+    async def get_one_by_email(self, email: str) -> Optional[User]:
+        id = self._ids_by_email.get(email)
+        return await self.get_one(id) if id is not None else None
+
+    async def get_one(self, id: int) -> Optional[User]:
+        user = self._users.get(id)
+        return self._copy(user) if user is not None else None
+
+    def remove(self, id: int) -> None:
+        """
+        Удаляет пользователя по идентификатору.
+        Args:
+            id (int): Идентификатор пользователя.
+        """
+        user = self._users.pop(id, None)
+        if user is not None:
+            del self._ids_by_email[user.email]
+
+    def clear(self) -> None:
+        """
+        Удаляет всех пользователей.
+        """
+        self._users.clear()
+        self._ids_by_email.clear()
+
+    @staticmethod
+    def _copy(user: User) -> User:
+        # Как и сессия БД, возвращаем отдельный объект, а не хранимый.
+        return User(**user.model_dump())
+
+
+class UsersResilientRepository(UsersAbstractRepository):
+    """
+    Репозиторий-обёртка, защищающий сервис от медленной или недоступной БД.
+    - Каждый запрос ограничен query_timeout секунд.
+    - Запросы идут через автоматический выключатель: после серии отказов
+      БД они сразу завершаются RepositoryUnavailableError, а не ждут
+      соединения из пула.
+    - Существование пользователей, успешно прочитанных из БД, запоминается.
+      Пока БД недоступна, get_one (обновление токенов) отвечает из этого
+      кэша, если пользователь был проверен не раньше, чем cache_ttl секунд
+      назад. Такой пользователь содержит только id, shard и email.
+    Поиск по email (вход и регистрация) кэш не использует: без хэша
+    пароля из БД вход невозможен, поэтому он быстро завершается ошибкой.
+    """
+
+    def __init__(
+        self,
+        repo: UsersAbstractRepository,
+        breaker: CircuitBreaker,
+        query_timeout: float,
+        cache_ttl: float,
+        cache_max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            repo (UsersAbstractRepository): Репозиторий, к которому
+                обращаются запросы.
+            breaker (CircuitBreaker): Автоматический выключатель БД.
+            query_timeout (float): Максимальная длительность запроса
+                (в секундах).
+            cache_ttl (float): Сколько секунд после проверки в БД
+                существование пользователя считается подтверждённым.
+            cache_max_size (int): Максимальное количество пользователей
+                в кэше (вытесняются давно проверенные).
+            clock (Callable[[], float]): Источник монотонного времени.
+        """
+        self.repo = repo
+        self.breaker = breaker
+        self.query_timeout = query_timeout
+        self.cache_ttl = cache_ttl
+        self.cache_max_size = cache_max_size
+        self._clock = clock
+        self._verified: OrderedDict[int, Tuple[float, int, str]] = (
+            OrderedDict()
+        )
+        self._degraded_reads = metrics.counter(
+            "auth_users_degraded_reads_total",
+            "Пользователи, полученные из кэша при недоступной БД",
+        )
+
+    async def add_one(self, data: dict) -> User:
+        user = await self._call(lambda: self.repo.add_one(data))
+        self._remember(user)
+        return user
+
+    async def get_one_by_email(self, email: str) -> Optional[User]:
+        user = await self._call(lambda: self.repo.get_one_by_email(email))
+        if user is not None:
+            self._remember(user)
+        return user
+
+    async def get_one(self, id: int) -> Optional[User]:
+        try:
+            user = await self._call(lambda: self.repo.get_one(id))
+        except RepositoryUnavailableError:
+            user = self._recently_verified(id)
+            if user is None:
+                raise
+            self._degraded_reads.inc()
+            return user
+        if user is None:
+            self._verified.pop(id, None)
+        else:
+            self._remember(user)
+        return user
+
+    async def _call(self, func: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await self.breaker.call(
+                lambda: asyncio.wait_for(func(), self.query_timeout)
+            )
+        except CircuitOpenError as e:
+            raise RepositoryUnavailableError(str(e), e.retry_after) from e
+        except Exception as e:
+            if not is_database_failure(e):
+                raise
+            raise RepositoryUnavailableError(
+                f"БД недоступна: {e!r}",
+                self.breaker.retry_after() or 1,
+            ) from e
+
+    def _remember(self, user: User) -> None:
+        self._verified[user.id] = (self._clock(), user.shard, user.email)
+        self._verified.move_to_end(user.id)
+        while len(self._verified) > self.cache_max_size:
+            self._verified.popitem(last=False)
+
+    def _recently_verified(self, id: int) -> Optional[User]:
+        entry = self._verified.get(id)
+        if entry is None:
+            return None
+        verified_at, shard, email = entry
+        if self._clock() - verified_at > self.cache_ttl:
+            del self._verified[id]
+            return None
+        return User(id=id, shard=shard, email=email, hash_password="")
+
+
+class UsersFaultInjectionRepository(UsersAbstractRepository):
+    """
+    Репозиторий-обёртка для локальных нагрузочных тестов отказов БД.
+    Перед каждым запросом добавляет задержку latency секунд и с
+    вероятностью error_rate выбрасывает ConnectionError, как при обрыве
+    соединения с БД. В production не используется.
+    """
+
+    def __init__(
+        self,
+        repo: UsersAbstractRepository,
+        latency: float,
+        error_rate: float,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Args:
+            repo (UsersAbstractRepository): Репозиторий, к которому
+                обращаются запросы.
+            latency (float): Добавляемая задержка (в секундах).
+            error_rate (float): Доля запросов, завершающихся ошибкой.
+            rng (Callable[[], float]): Источник случайных чисел [0, 1).
+        """
+        self.repo = repo
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = rng
+
+    async def add_one(self, data: dict) -> User:
+        await self._inject()
+        return await self.repo.add_one(data)
+
+    async def get_one_by_email(self, email: str) -> Optional[User]:
+        await self._inject()
+        return await self.repo.get_one_by_email(email)
+
+    async def get_one(self, id: int) -> Optional[User]:
+        await self._inject()
+        return await self.repo.get_one(id)
+
+    async def _inject(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._rng() < self.error_rate:
+            raise ConnectionError("Внедрённый отказ БД")
@@ -1,23 +1,58 @@
 import logging
+import math
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Cookie,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
 
+from audit.dependiences import audit_log_service
+from audit.services import AuditLogService
 from auth.dependiences import user_service
-from auth.exceptions import UserNotFoundError, VerifyPasswordError
+from auth.exceptions import (
+    CompromisedPasswordError,
+    RepositoryUnavailableError,
+    UserNotFoundError,
+    VerifyPasswordError,
+)
 from auth.schemes import JWTAccessToken, UserRequestScheme, UserResponseScheme
 from auth.services import UserService
-from settings import settings
+from settings import get_settings
 from utils.tokens import JWTTokenService
+from utils.tracing import traced
 
 router = APIRouter(prefix="/api/v1", tags=["Auth"])
 
 
+def service_unavailable(error: RepositoryUnavailableError) -> HTTPException:
+    """
+    Ответ 503 при недоступном хранилище пользователей.
+    Args:
+        error (RepositoryUnavailableError): Ошибка репозитория.
+    Returns:
+        HTTPException: Исключение с заголовком Retry-After.
+    """
+    logging.error(error)
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Сервис временно недоступен, повторите запрос позже",
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
 @router.post(
     "/registration/",
     status_code=status.HTTP_201_CREATED,
     response_model=UserResponseScheme,
 )
+@traced("routers.create_user")
 async def create_user(
     user: UserRequestScheme,
     user_service: UserService = Depends(user_service),
@@ -25,59 +60,91 @@ async def create_user(
     """
     Регистрация нового пользователя.
     Проверяет, существует ли пользователь с таким email.
+    Проверяет пароль по списку утёкших паролей.
     Хэширует пароль и сохраняет пользователя в базе данных.
     Args:
         user (UserRequestScheme): Данные пользователя (email, password).
         user_service (UserService): Сервис для работы с пользователями.
     Raises:
-        HTTPException: Если пользователь с таким email уже существует.
+        HTTPException: Если пользователь с таким email уже существует,
+            пароль найден в списке утёкших или БД недоступна.
     Returns:
         UserResponseScheme: Данные пользователя.
     """
-    if await user_service.get_one_by_email(email=user.email):
+    try:
+        if await user_service.get_one_by_email(email=user.email):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Пользователь с таким email уже зарегестрирован",
+            )
+        user = await user_service.add_one(user)
+    except CompromisedPasswordError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Пользователь с таким email уже зарегестрирован",
+            detail="Пароль найден в утечках данных, выберите другой пароль",
         )
-    user = await user_service.add_one(user)
+    except RepositoryUnavailableError as e:
+        raise service_unavailable(e)
     return user
 
 
 @router.post("/login/")
+@traced("routers.login")
 async def login(
+    request: Request,
     response: Response,
+    background_tasks: BackgroundTasks,
     user: UserRequestScheme,
     user_service: UserService = Depends(user_service),
     token_service: JWTTokenService = Depends(JWTTokenService),
+    audit_log: AuditLogService = Depends(audit_log_service),
 ):
     """
     Аутентификация пользователя.
     - Проверяет корректность email и пароля.
     - Создаёт access и refresh токены.
     - Сохраняет refresh token в cookie `resumes_token`.
+    - После ответа записывает событие `user.logged_in` в outbox.
+    - Записывает попытку входа в журнал аудита.
     Args:
+        request (Request): Объект FastAPI Request (IP-адрес клиента).
         response (Response): Объект FastAPI Response для установки cookie.
+        background_tasks (BackgroundTasks): Фоновые задачи после ответа.
         user (UserRequestScheme): Данные пользователя.
         user_service (UserService): Сервис пользователей.
         token_service (JWTTokenService): Сервис генерации JWT токенов.
+        audit_log (AuditLogService): Журнал аудита.
     Raises:
-        HTTPException: Если email или пароль некорректны.
+        HTTPException: Если email или пароль некорректны или БД недоступна
+            (вход не ждёт БД, а сразу завершается ошибкой).
     Returns:
         JWTAccessToken: Access токен с временем жизни.
     """
+    ip = request.client.host if request.client else None
+    email = user.email
     try:
         user = await user_service.authenticate_user(user)
     except (UserNotFoundError, VerifyPasswordError) as e:
         logging.error(e)
+        await audit_log.record("login", False, email=email, ip=ip)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Некорректный email или пароль",
         )
+    except RepositoryUnavailableError as e:
+        raise service_unavailable(e)
+    await audit_log.record(
+        "login", True, user_id=user.id, email=email, ip=ip
+    )
 
-    access_token, refresh_token = (
-        token_service.create_access_and_refresh_tokens({"id": user.id})
+    access_token, access_token_expire, refresh_token = (
+        token_service.create_tokens({"id": user.id})
     )
+    background_tasks.add_task(user_service.record_login, user)
 
+    # Ответ с токенами не кэшируется и не сохраняется для повтора
+    # по Idempotency-Key.
+    response.headers["Cache-Control"] = "no-store"
     response.set_cookie(
         key="resumes_token",
         value=refresh_token,
@@ -85,74 +152,98 @@ async def login(
         expires=datetime.now(
             timezone.utc
         ) + timedelta(
-            days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+            days=get_settings().REFRESH_TOKEN_EXPIRE_DAYS
         ),
         secure=True,
     )
 
     return JWTAccessToken(
         access_token=access_token,
-        access_token_expire=datetime.now(
-            timezone.utc
-        ) + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        ),
+        access_token_expire=access_token_expire,
     )
 
 
 @router.post("/logout/")
-async def logout(response: Response):
+async def logout(
+    response: Response,
+    resumes_token: str = Cookie(default=None),
+    token_service: JWTTokenService = Depends(JWTTokenService),
+):
     """
     Выход пользователя из системы.
-    Удаляет cookie с refresh token `resumes_token`.
+    Удаляет cookie с refresh token `resumes_token`
+    и сбрасывает закэшированный access токен пользователя.
     Args:
         response (Response): Объект FastAPI Response для удаления cookie.
+        resumes_token (str): Refresh token из cookie.
+        token_service (JWTTokenService): Сервис генерации JWT токенов.
     Returns:
         None
     """
+    decode_token = token_service.decode_jwt_token(resumes_token)
+    if decode_token is not None:
+        token_service.invalidate_access_token(decode_token["id"])
     response.delete_cookie("resumes_token", httponly=True, secure=True)
     return
 
 
 @router.get("/refresh_token/")
+@traced("routers.refresh_token")
 async def refresh_token(
+    request: Request,
     response: Response,
     resumes_token: str = Cookie(default=None),
     user_service: UserService = Depends(user_service),
     token_service: JWTTokenService = Depends(JWTTokenService),
+    audit_log: AuditLogService = Depends(audit_log_service),
 ):
     """
     Обновление access и refresh токенов.
     - Проверяет валидность refresh token из cookie.
+    - Проверяет, что пользователь существует (если БД недоступна,
+      используется недавняя проверка из кэша репозитория).
     - Генерирует новые access и refresh токены.
     - Сохраняет новый refresh token в cookie.
+    - Записывает попытку обновления в журнал аудита.
     Args:
+        request (Request): Объект FastAPI Request (IP-адрес клиента).
         response (Response): Объект FastAPI Response для установки cookie.
         resumes_token (str): Refresh token из cookie.
         user_service (UserService): Сервис пользователей.
         token_service (JWTTokenService): Сервис генерации JWT токенов.
+        audit_log (AuditLogService): Журнал аудита.
     Returns:
         JWTAccessToken: Новый access токен.
     Raises:
-        HTTPException: Если refresh token не валиден или пользователь не найден.
+        HTTPException: Если refresh token не валиден, пользователь
+            не найден или его существование нельзя проверить.
     """
+    ip = request.client.host if request.client else None
     decode_token = token_service.decode_jwt_token(resumes_token)
     if decode_token is None or decode_token.get("type") != "refresh":
+        await audit_log.record("refresh", False, ip=ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="refresh_token не валиден",
         )
 
-    user = await user_service.get_one(id=decode_token["id"])
+    try:
+        user = await user_service.get_one(id=decode_token["id"])
+    except RepositoryUnavailableError as e:
+        raise service_unavailable(e)
     if user is None:
+        await audit_log.record(
+            "refresh", False, user_id=decode_token["id"], ip=ip
+        )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь не зарегестрирован",
         )
 
-    access_token, refresh_token = (
-        token_service.create_access_and_refresh_tokens({"id": user.id})
+    access_token, access_token_expire, refresh_token = (
+        token_service.create_tokens({"id": user.id}, reuse_access_token=True)
     )
+    await audit_log.record("refresh", True, user_id=user.id, ip=ip)
 
     response.set_cookie(
         key="resumes_token",
@@ -161,18 +252,14 @@ async def refresh_token(
         expires=datetime.now(
             timezone.utc
         ) + timedelta(
-            days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+            days=get_settings().REFRESH_TOKEN_EXPIRE_DAYS
         ),
         secure=True,
     )
 
     return JWTAccessToken(
         access_token=access_token,
-        access_token_expire=datetime.now(
-            timezone.utc
-        ) + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        ),
+        access_token_expire=access_token_expire,
     )
 
 
@@ -184,4 +271,4 @@ def get_public_key():
     Returns:
         dict: Словарь с публичным ключом {"public_key": str}.
     """
-    return {"public_key": settings.PUBLIC_KEY}
+    return {"public_key": get_settings().PUBLIC_KEY}
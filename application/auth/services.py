@@ -1,7 +1,22 @@
-from auth.exceptions import UserNotFoundError, VerifyPasswordError
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+from typing import Optional
+
+from auth.exceptions import (
+    CompromisedPasswordError,
+    UserNotFoundError,
+    VerifyPasswordError,
+)
 from auth.repositories import UsersAbstractRepository
 from auth.schemes import UserRequestScheme
+from events.repositories import OutboxAbstractRepository
+from utils.breached_passwords import BreachedPasswordService
+from utils.coalescing import InFlightCoalescer
 from utils.hashes import HashService
+from utils.tracing import traced
 
 
 class UserService:
@@ -10,26 +25,46 @@ class UserService:
     Инкапсулирует бизнес-логику, связанную с пользователями:
     - добавление нового пользователя с хэшированием пароля;
     - поиск пользователя по email;
-    - аутентификация пользователя.
+    - аутентификация пользователя;
+    - запись события о входе пользователя в outbox.
 
-    Внешние зависимости: UsersAbstractRepository, HashService.
+    Внешние зависимости: UsersAbstractRepository, HashService,
+    BreachedPasswordService и OutboxAbstractRepository (необязательно).
     """
 
+    # Общие для всех экземпляров: сервис создаётся на каждый запрос.
+    _verifications = InFlightCoalescer()
+    _verification_secret = secrets.token_bytes(32)
+
     def __init__(
-        self, repo: UsersAbstractRepository, hash_service: HashService
+        self,
+        repo: UsersAbstractRepository,
+        hash_service: HashService,
+        breached_password_service: Optional[BreachedPasswordService] = None,
+        outbox: Optional[OutboxAbstractRepository] = None,
     ):
         """
         Инициализация сервиса пользователей.
         Args:
             repo (UsersAbstractRepository): Репозиторий для работы с БД.
             hash_service (HashService): Сервис для хэширования и проверки паролей.
+            breached_password_service (Optional[BreachedPasswordService]):
+                Сервис проверки пароля по списку утёкших паролей.
+            outbox (Optional[OutboxAbstractRepository]): Репозиторий outbox
+                для событий пользователей.
         """
         self.repo: UsersAbstractRepository = repo
         self.hash_service: HashService = hash_service
+        self.breached_password_service: Optional[BreachedPasswordService] = (
+            breached_password_service
+        )
+        self.outbox: Optional[OutboxAbstractRepository] = outbox
 
+    @traced("UserService.add_one")
     async def add_one(self, user: UserRequestScheme):
         """
         Добавляет нового пользователя.
+        - Пароль проверяется по списку утёкших паролей.
         - Пароль пользователя хэшируется.
         - Оригинальный пароль удаляется перед сохранением.
         - Пользователь сохраняется в БД.
@@ -37,7 +72,14 @@ class UserService:
             user (UserRequestScheme): Данные пользователя.
         Returns:
             User: Пользователь.
+        Raises:
+            CompromisedPasswordError: Если пароль найден в списке утёкших.
         """
+        breached_passwords = self.breached_password_service
+        if breached_passwords is not None and breached_passwords.is_breached(
+            user.password
+        ):
+            raise CompromisedPasswordError("Пароль найден в утечках")
         user = user.model_dump()
         hash_password = self.hash_service.create_hash_password(
             user["password"]
@@ -47,6 +89,7 @@ class UserService:
         user = await self.repo.add_one(user)
         return user
 
+    @traced("UserService.get_one_by_email")
     async def get_one_by_email(self, email: str):
         """
         Получает пользователя по email.
@@ -57,6 +100,7 @@ class UserService:
         """
         return await self.repo.get_one_by_email(email)
 
+    @traced("UserService.authenticate_user")
     async def authenticate_user(self, auth_user: UserRequestScheme):
         """
         Аутентифицирует пользователя по email и паролю.
@@ -74,12 +118,69 @@ class UserService:
         user = await self.get_one_by_email(auth_user.email)
         if user is None:
             raise UserNotFoundError("Пользователь не найден")
-        if not self.hash_service.verify_password(
-            auth_user.password, user.hash_password
+        if not await self.verify_password(
+            auth_user.email, auth_user.password, user.hash_password
         ):
             raise VerifyPasswordError("Пароль введен не верно")
         return user
 
+    @traced("UserService.verify_password")
+    async def verify_password(
+        self, email: str, password: str, hash_password: str
+    ) -> bool:
+        """
+        Проверяет пароль пользователя в отдельном потоке.
+        Одновременные проверки одной и той же тройки (email, пароль, хэш)
+        выполняются один раз, результат получают все ожидающие.
+        Args:
+            email (str): Электронная почта пользователя.
+            password (str): Введённый пароль.
+            hash_password (str): Хэш пароля, сохранённый в БД.
+        Returns:
+            bool: True, если пароль корректный, иначе False.
+        """
+        key = self._verification_key(email, password, hash_password)
+        return await self._verifications.run(
+            key,
+            lambda: asyncio.to_thread(
+                self.hash_service.verify_password, password, hash_password
+            ),
+        )
+
+    @classmethod
+    def _verification_key(cls, *parts: str) -> str:
+        """
+        Вычисляет ключ проверки пароля.
+        HMAC с секретом процесса: ключ не содержит пароль в открытом виде
+        и не может быть подобран перебором вне процесса.
+        Args:
+            *parts (str): Части ключа.
+        Returns:
+            str: Ключ проверки.
+        """
+        digest = hmac.new(cls._verification_secret, digestmod=hashlib.sha256)
+        for part in parts:
+            data = part.encode()
+            digest.update(len(data).to_bytes(4, "big"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    async def record_login(self, user) -> None:
+        """
+        Записывает в outbox событие `user.logged_in`.
+        Вызывается фоновой задачей после отправки ответа, ошибки
+        записи логируются и не влияют на вход пользователя.
+        Args:
+            user (User): Пользователь.
+        """
+        if self.outbox is None:
+            return
+        try:
+            await self.outbox.add_one("user.logged_in", {"id": user.id})
+        except Exception as e:
+            logging.error(e)
+
+    @traced("UserService.get_one")
     async def get_one(self, id: int):
         """
         Получает пользователя по id.
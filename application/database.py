@@ -1,24 +1,64 @@
+from typing import Optional
+
 from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     create_async_engine,
     async_sessionmaker,
     AsyncSession,
 )
 
-from settings import settings
-
-if settings.TESTING:
-    async_engine = create_async_engine(
-        settings.DB_URL_testing, echo=False, poolclass=NullPool
-    )
-else:
-    async_engine = create_async_engine(
-        settings.DB_URL,
-        pool_recycle=3600,
-        echo=True,
-        future=True,
-    )
-
-async_session = async_sessionmaker(
-    async_engine, class_=AsyncSession, expire_on_commit=False
-)
+from settings import get_settings
+
+# Движок создаётся при первом обращении: импорт модуля не загружает
+# драйвер БД (asyncpg), что ускоряет запуск миграций и утилит.
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Возвращает движок БД, создавая его при первом обращении.
+    Returns:
+        AsyncEngine: Движок БД.
+    """
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        if settings.TESTING:
+            _engine = create_async_engine(
+                settings.DB_URL_testing, echo=False, poolclass=NullPool
+            )
+        else:
+            _engine = create_async_engine(
+                settings.DB_URL,
+                pool_recycle=3600,
+                # Запрос ждёт свободное соединение не дольше этого времени,
+                # а не выстраивается в очередь за зависшими запросами.
+                pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+                echo=True,
+                future=True,
+            )
+    return _engine
+
+
+def async_session() -> AsyncSession:
+    """
+    Создаёт сессию БД.
+    Returns:
+        AsyncSession: Сессия БД.
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(
+            get_engine(), class_=AsyncSession, expire_on_commit=False
+        )
+    return _session_factory()
+
+
+async def dispose_engine() -> None:
+    """
+    Закрывает соединения пула, если движок был создан.
+    """
+    if _engine is not None:
+        await _engine.dispose()
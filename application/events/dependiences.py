@@ -0,0 +1,34 @@
+from functools import cache
+
+from events.dispatcher import OutboxDispatcher
+from events.repositories import (
+    OutboxAbstractRepository,
+    OutboxInMemoryRepository,
+    OutboxPostgreSQLRepository,
+)
+from events.sinks import EventSink, FileEventSink, LoggingEventSink
+from settings import get_settings
+
+
+@cache
+def outbox_repository() -> OutboxAbstractRepository:
+    if get_settings().USERS_REPOSITORY == "memory":
+        return OutboxInMemoryRepository()
+    return OutboxPostgreSQLRepository
+
+
+def event_sink() -> EventSink:
+    settings = get_settings()
+    if settings.OUTBOX_SINK == "file":
+        return FileEventSink(settings.OUTBOX_SINK_PATH)
+    return LoggingEventSink()
+
+
+def outbox_dispatcher() -> OutboxDispatcher:
+    settings = get_settings()
+    return OutboxDispatcher(
+        outbox_repository(),
+        event_sink(),
+        settings.OUTBOX_BATCH_SIZE,
+        settings.OUTBOX_POLL_INTERVAL_SECONDS,
+    )
@@ -0,0 +1,79 @@
+"""
+Диспетчер outbox: фоновая доставка событий пачками.
+
+Запуск отдельным процессом:
+    cd application
+    python -m events.dispatcher
+"""
+
+import asyncio
+import logging
+
+from events.repositories import OutboxAbstractRepository
+from events.sinks import EventSink
+
+
+class OutboxDispatcher:
+    """
+    Фоновый диспетчер, который переносит события из outbox в приёмник.
+    Пока outbox выдаёт полные пачки, диспетчер работает без пауз,
+    иначе ждёт interval секунд перед следующей попыткой.
+    """
+
+    def __init__(
+        self,
+        repo: OutboxAbstractRepository,
+        sink: EventSink,
+        batch_size: int,
+        interval: float,
+    ):
+        """
+        Args:
+            repo (OutboxAbstractRepository): Репозиторий outbox.
+            sink (EventSink): Приёмник событий.
+            batch_size (int): Максимальный размер пачки.
+            interval (float): Пауза между опросами пустого outbox (в секундах).
+        """
+        self.repo = repo
+        self.sink = sink
+        self.batch_size = batch_size
+        self.interval = interval
+        self._stopped = asyncio.Event()
+
+    async def dispatch(self) -> int:
+        """
+        Доставляет все накопившиеся события.
+        Returns:
+            int: Количество доставленных событий.
+        """
+        total = 0
+        while True:
+            count = await self.repo.dispatch_batch(self.sink, self.batch_size)
+            total += count
+            if count < self.batch_size:
+                return total
+
+    async def run(self) -> None:
+        """
+        Доставляет события до вызова stop().
+        Ошибки доставки логируются, события остаются в outbox.
+        """
+        while not self._stopped.is_set():
+            try:
+                await self.dispatch()
+            except Exception as e:
+                logging.error("outbox dispatch failed: %s", e)
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+if __name__ == "__main__":
+    from events.dependiences import outbox_dispatcher
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(outbox_dispatcher().run())
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field
+
+
+class OutboxEvent(SQLModel, table=True):
+    """
+    ORM-модель события в таблице outbox.
+    Событие записывается в той же транзакции, что и изменение данных,
+    и удаляется после доставки диспетчером.
+    Attrs:
+        id (int): Уникальный идентификатор события (Primary Key).
+        event_type (str): Тип события, например `user.registered`.
+        payload (dict): Данные события.
+        created_at (datetime): Время создания события.
+    """
+
+    __tablename__ = "auth_outbox"
+    __table_args__ = {"extend_existing": True}
+    id: int = Field(
+        default=None, sa_column=Column(BigInteger, primary_key=True)
+    )
+    event_type: str
+    payload: dict = Field(sa_column=Column(JSONB, nullable=False))
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(
+            DateTime(timezone=True), server_default=func.now(), nullable=False
+        ),
+    )
+
+    def to_message(self) -> dict:
+        """
+        Представление события для отправки во внешние системы.
+        Returns:
+            dict: Событие.
+        """
+        return {
+            "id": self.id,
+            "type": self.event_type,
+            "payload": self.payload,
+            "created_at": (
+                self.created_at.isoformat() if self.created_at else None
+            ),
+        }
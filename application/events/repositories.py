@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from sqlalchemy import delete, select
+
+from database import async_session
+from events.models import OutboxEvent
+from events.sinks import EventSink
+
+
+class OutboxAbstractRepository(ABC):
+    """
+    Абстрактный репозиторий для работы с outbox.
+
+    Определяет базовые методы для:
+    - добавления события,
+    - доставки пачки событий в приёмник.
+    """
+
+    @abstractmethod
+    async def add_one(self, event_type: str, payload: dict) -> None:
+        """
+        Добавляет событие в outbox в отдельной транзакции.
+        Args:
+            event_type (str): Тип события.
+            payload (dict): Данные события.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def dispatch_batch(self, sink: EventSink, batch_size: int) -> int:
+        """
+        Отправляет в приёмник самые старые события и удаляет их из outbox.
+        Если приёмник выбросил исключение, события остаются в outbox.
+        Args:
+            sink (EventSink): Приёмник событий.
+            batch_size (int): Максимальный размер пачки.
+        Returns:
+            int: Количество доставленных событий.
+        """
+        raise NotImplementedError
+
+
+class OutboxPostgreSQLRepository(OutboxAbstractRepository):
+    """
+    Репозиторий outbox с использованием PostgreSQL и SQLAlchemy Async.
+    Пачки выбираются через `SELECT ... FOR UPDATE SKIP LOCKED`, поэтому
+    несколько диспетчеров могут работать одновременно.
+    """
+
+    @staticmethod
+    async def add_one(event_type: str, payload: dict) -> None:
+        async with async_session() as session:
+            session.add(OutboxEvent(event_type=event_type, payload=payload))
+            await session.commit()
+
+    @staticmethod
+    async def dispatch_batch(sink: EventSink, batch_size: int) -> int:
+        async with async_session() as session:
+            async with session.begin():
+                query = (
+                    select(OutboxEvent)
+                    .order_by(OutboxEvent.id)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                result = await session.execute(query)
+                events = result.scalars().all()
+                if not events:
+                    return 0
+                await sink.send([event.to_message() for event in events])
+                await session.execute(
+                    delete(OutboxEvent).where(
+                        OutboxEvent.id.in_([event.id for event in events])
+                    )
+                )
+            return len(events)
+
+
+class OutboxInMemoryRepository(OutboxAbstractRepository):
+    """
+    Репозиторий outbox, хранящий события в памяти процесса.
+    Используется вместе с UsersInMemoryRepository.
+    """
+
+    def __init__(self):
+        self.events: List[OutboxEvent] = []
+        self._last_id = 0
+
+    async def add_one(self, event_type: str, payload: dict) -> None:
+        self.add(event_type, payload)
+
+    def add(self, event_type: str, payload: dict) -> None:
+        """
+        Синхронно добавляет событие (для использования внутри
+        "транзакции" другого репозитория в памяти).
+        Args:
+            event_type (str): Тип события.
+            payload (dict): Данные события.
+        """
+        self._last_id += 1
+        self.events.append(
+            OutboxEvent(id=self._last_id, event_type=event_type, payload=payload)
+        )
+
+    async def dispatch_batch(self, sink: EventSink, batch_size: int) -> int:
+        events = self.events[:batch_size]
+        if not events:
+            return 0
+        await sink.send([event.to_message() for event in events])
+        del self.events[: len(events)]
+        return len(events)
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class EventSink(ABC):
+    """
+    Абстрактный приёмник событий, в который диспетчер отправляет
+    события из outbox. Доставка "как минимум один раз": при ошибке
+    отправки пачка будет отправлена повторно.
+    """
+
+    @abstractmethod
+    async def send(self, events: List[dict]) -> None:
+        """
+        Отправляет пачку событий.
+        Args:
+            events (List[dict]): События.
+        Raises:
+            Exception: Если пачку не удалось доставить.
+        """
+        raise NotImplementedError
+
+
+class LoggingEventSink(EventSink):
+    """
+    Приёмник, записывающий события в лог.
+    """
+
+    async def send(self, events: List[dict]) -> None:
+        for event in events:
+            logging.info("event %s", json.dumps(event, ensure_ascii=False))
+
+
+class FileEventSink(EventSink):
+    """
+    Приёмник, дописывающий события в файл в формате JSON Lines.
+    Локальная замена брокера сообщений для разработки и тестов.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def send(self, events: List[dict]) -> None:
+        lines = "".join(
+            json.dumps(event, ensure_ascii=False) + "\n" for event in events
+        )
+        await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+class QueueEventSink(EventSink):
+    """
+    Приёмник, складывающий события в asyncio.Queue (для тестов).
+    """
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+
+    async def send(self, events: List[dict]) -> None:
+        for event in events:
+            await self.queue.put(event)
@@ -1,49 +1,137 @@
-from pathlib import Path
-import os
+import asyncio
+from functools import partial
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
+from audit.dependiences import audit_log_service
+from database import dispose_engine, get_engine
+from auth.dependiences import idempotency_store, users_repository
 from auth.routers import router as auth_router
-from settings import settings
-
-if not settings.TESTING:
-    from uvicorn.workers import UvicornWorker
-
-    class BackendUvicornWorker(UvicornWorker):
-        """
-        Воркер с настроенным логгированием
-        """
-
-        CONFIG_KWARGS = {
-            "log_config": (
-                f"{str(Path(__file__).resolve().parent.parent) + os.sep}logging.yaml"
-            ),
-        }
-
-
-app = FastAPI(
-    openapi_url="/api/v1/auth/openapi.json"
-)
-
-app.add_middleware(
-    TrustedHostMiddleware,
-    allowed_hosts=(
-        settings.ALLOWED_HOSTS
-        if not settings.TESTING
-        else settings.TEST_ALLOWED_HOSTS
-    ),
-)
-
-origins = settings.ORIGINS if not settings.TESTING else settings.TEST_ORIGINS
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.include_router(auth_router)
+from events.dependiences import outbox_dispatcher
+from monitoring.health import warm_up_worker
+from monitoring.load_shedding import EventLoopLagMonitor, LoadSheddingMiddleware
+from monitoring.dependiences import request_profiles, worker_health
+from monitoring.profiling import RequestProfilingMiddleware
+from monitoring.routers import admin_router, router as monitoring_router
+from settings import get_settings
+from utils.idempotency import IdempotencyMiddleware
+from utils.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+
+# Запросы с проверкой пароля (bcrypt).
+EXPENSIVE_PATHS = ("/api/v1/login/", "/api/v1/registration/")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Прогрев воркера, запуск и остановка фоновых задач.
+    """
+    settings = get_settings()
+    lag_monitor: EventLoopLagMonitor = app.state.lag_monitor
+    audit_log = audit_log_service()
+    await worker_health().start(
+        partial(
+            warm_up_worker,
+            None if settings.USERS_REPOSITORY == "memory" else get_engine(),
+            users_repository(),
+        )
+    )
+    if settings.LOAD_SHEDDING_ENABLED:
+        await lag_monitor.start()
+    if settings.AUDIT_LOG_ENABLED:
+        await audit_log.start()
+    dispatcher = None
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        dispatcher = outbox_dispatcher()
+        dispatcher_task = asyncio.create_task(dispatcher.run())
+
+    yield
+
+    await worker_health().stop()
+    if dispatcher is not None:
+        dispatcher.stop()
+        await dispatcher_task
+    await audit_log.stop()
+    await lag_monitor.stop()
+    shutdown_tracing()
+    await dispose_engine()
+
+
+def create_app() -> FastAPI:
+    """
+    Создаёт приложение. Настройки читаются здесь, а не при импорте модуля:
+    gunicorn 'main:create_app()', uvicorn main:create_app --factory.
+    Returns:
+        FastAPI: Приложение.
+    """
+    settings = get_settings()
+    if settings.TRACING_ENABLED:
+        setup_tracing()
+
+    app = FastAPI(
+        openapi_url="/api/v1/auth/openapi.json",
+        lifespan=lifespan,
+    )
+    app.state.lag_monitor = EventLoopLagMonitor(
+        settings.LOAD_SHEDDING_MONITOR_INTERVAL_MS / 1000
+    )
+
+    if settings.LOAD_SHEDDING_ENABLED:
+        app.add_middleware(
+            LoadSheddingMiddleware,
+            monitor=app.state.lag_monitor,
+            expensive_paths=EXPENSIVE_PATHS,
+            lag_threshold=settings.LOAD_SHEDDING_LAG_THRESHOLD_MS / 1000,
+            max_in_flight=settings.LOAD_SHEDDING_MAX_IN_FLIGHT,
+            retry_after=settings.LOAD_SHEDDING_RETRY_AFTER_SECONDS,
+        )
+
+    # Снаружи сброса нагрузки: повтор получает сохранённый ответ,
+    # даже если сервис перегружен.
+    if settings.IDEMPOTENCY_ENABLED:
+        app.add_middleware(
+            IdempotencyMiddleware,
+            store=idempotency_store(),
+            paths=EXPENSIVE_PATHS,
+            wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS,
+        )
+
+    # Снаружи идемпотентности: ответ на запрос с недопустимым Host
+    # не сохраняется, повтор не обходит проверку Host.
+    app.add_middleware(
+        TrustedHostMiddleware,
+        allowed_hosts=(
+            settings.ALLOWED_HOSTS
+            if not settings.TESTING
+            else settings.TEST_ALLOWED_HOSTS
+        ),
+    )
+
+    if settings.PROFILING_TOKEN:
+        app.add_middleware(
+            RequestProfilingMiddleware,
+            secret=settings.PROFILING_TOKEN,
+            profiles=request_profiles(),
+            interval=settings.PROFILING_REQUEST_INTERVAL_MS / 1000,
+        )
+
+    origins = settings.ORIGINS if not settings.TESTING else settings.TEST_ORIGINS
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    if settings.TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
+
+    app.include_router(auth_router)
+    app.include_router(monitoring_router)
+    app.include_router(admin_router)
+    return app
@@ -0,0 +1,104 @@
+"""
+Быстрая проверка, что схема БД уже на последней ревизии миграций.
+
+Не импортирует Alembic, SQLAlchemy и модели: ревизии читаются из файлов
+миграций, текущая ревизия - из таблицы auth_alembic_version. Используется
+при запуске контейнера, чтобы не запускать Alembic без необходимости:
+
+    cd application && python -m migrations.check_head || alembic upgrade head
+
+Код возврата 0 - схема на последней ревизии, 1 - нужна миграция
+(или проверить не удалось).
+"""
+
+import ast
+import asyncio
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Set
+
+import asyncpg
+
+from settings import get_settings
+
+VERSIONS_DIR = Path(__file__).resolve().parent / "versions"
+VERSION_TABLE = "auth_alembic_version"
+CONNECT_TIMEOUT = 10
+
+
+def script_heads(versions_dir: Path = VERSIONS_DIR) -> Set[str]:
+    """
+    Последние ревизии (heads) по файлам миграций.
+    Args:
+        versions_dir (Path): Каталог с файлами миграций.
+    Returns:
+        Set[str]: Ревизии, от которых не зависит ни одна другая.
+    """
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        values = _module_constants(path, ("revision", "down_revision"))
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        down_revision = values.get("down_revision")
+        if isinstance(down_revision, str):
+            parents.add(down_revision)
+        elif down_revision:
+            parents.update(down_revision)
+    return revisions - parents
+
+
+async def database_revisions() -> Set[str]:
+    """
+    Текущие ревизии схемы БД.
+    Returns:
+        Set[str]: Ревизии из таблицы версий (пустое множество,
+            если миграции ещё не выполнялись).
+    """
+    connection = await asyncpg.connect(
+        get_settings().DB_URL.replace("postgresql+asyncpg", "postgresql"),
+        timeout=CONNECT_TIMEOUT,
+    )
+    try:
+        rows = await connection.fetch(f"SELECT version_num FROM {VERSION_TABLE}")
+    except asyncpg.UndefinedTableError:
+        return set()
+    finally:
+        await connection.close()
+    return {row["version_num"] for row in rows}
+
+
+def main() -> int:
+    heads = script_heads()
+    try:
+        current = asyncio.run(database_revisions())
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        print(f"cannot read schema revision: {e!r}", file=sys.stderr)
+        return 1
+    if current == heads:
+        print(f"schema is at head ({', '.join(sorted(heads))})")
+        return 0
+    print(
+        f"schema revision {', '.join(sorted(current)) or 'none'}, "
+        f"head {', '.join(sorted(heads))}"
+    )
+    return 1
+
+
+def _module_constants(path: Path, names: Iterable[str]) -> Dict[str, object]:
+    values = {}
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in names:
+                values[target.id] = ast.literal_eval(node.value)
+    return values
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,18 @@
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from sqlmodel import SQLModel
 
-from auth.models import *
-from settings import settings
+from settings import get_settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 config.set_main_option(
-    "sqlalchemy.url", settings.DB_URL + "?async_fallback=True"
+    "sqlalchemy.url", get_settings().DB_URL + "?async_fallback=True"
 )
 
 # Interpret the config file for Python logging.
@@ -21,11 +20,42 @@ config.set_main_option(
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+
+def load_target_metadata():
+    """Models are only needed to compare the schema with the database
+    (revision --autogenerate, check). Plain upgrade/downgrade runs
+    skip importing them.
+
+    """
+    cmd_opts = config.cmd_opts
+    if cmd_opts is not None and not getattr(cmd_opts, "autogenerate", False):
+        cmd = getattr(cmd_opts, "cmd", None)
+        if cmd is not None and cmd[0].__name__ != "check":
+            return None
+
+    from sqlmodel import SQLModel
+
+    import audit.models  # noqa: F401
+    import auth.models  # noqa: F401
+    import events.models  # noqa: F401
+
+    return SQLModel.metadata
+
+
+# Partitions are created by migrations (users) and by AuditLogService
+# (auth_audit_log), they have no models and are skipped by autogenerate.
+PARTITION_NAME = re.compile(r"users_p\d+|users_pending|auth_audit_log_p\d{8}")
+
+
+def include_name(name, type_, parent_names):
+    return type_ != "table" or PARTITION_NAME.fullmatch(name) is None
+
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = SQLModel.metadata
+target_metadata = load_target_metadata()
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -51,7 +81,9 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
-        version_table="auth_alembic_version"
+        version_table="auth_alembic_version",
+        include_name=include_name,
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -75,7 +107,9 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection, 
             target_metadata=target_metadata,
-            version_table="auth_alembic_version"
+            version_table="auth_alembic_version",
+            include_name=include_name,
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,319 @@
+"""
+Помощники для миграций больших таблиц без простоя сервиса.
+
+Использование в файле миграции:
+
+    from migrations.helpers import backfill, create_index_concurrently
+
+    def upgrade() -> None:
+        op.add_column("users", sa.Column("locale", sa.String(), nullable=True))
+        backfill("users", "locale = 'ru'", where="locale IS NULL")
+        create_index_concurrently("ix_users_locale", "users", ["locale"])
+
+Функции с autocommit фиксируют текущую транзакцию миграции (см.
+MigrationContext.autocommit_block), поэтому env.py выполняет каждую
+миграцию в отдельной транзакции.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+
+import sqlalchemy as sa
+from alembic import op
+
+# Запрос, ожидающий блокировку дольше lock_timeout, завершается ошибкой,
+# а не выстраивает за собой очередь из запросов приложения.
+LOCK_TIMEOUT = "5s"
+STATEMENT_TIMEOUT = "60s"
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def set_timeouts(
+    lock_timeout: str = LOCK_TIMEOUT,
+    statement_timeout: str = STATEMENT_TIMEOUT,
+    local: bool = True,
+) -> None:
+    """
+    Ограничивает ожидание блокировок и длительность запросов миграции.
+    Args:
+        lock_timeout (str): Максимальное ожидание блокировки.
+        statement_timeout (str): Максимальная длительность запроса.
+        local (bool): Только до конца текущей транзакции (SET LOCAL)
+            или до конца соединения (SET).
+    """
+    scope = "SET LOCAL" if local else "SET"
+    op.execute(f"{scope} lock_timeout = '{lock_timeout}'")
+    op.execute(f"{scope} statement_timeout = '{statement_timeout}'")
+
+
+def lock_table(
+    table_name: str,
+    mode: str = "ACCESS EXCLUSIVE",
+    lock_timeout: str = LOCK_TIMEOUT,
+    retries: int = 3,
+    retry_interval: float = 5,
+) -> None:
+    """
+    Блокирует таблицу до конца текущей транзакции миграции.
+    Попытка, превысившая lock_timeout, откатывается к точке сохранения,
+    транзакция миграции продолжается со следующей попытки.
+    Args:
+        table_name (str): Имя таблицы.
+        mode (str): Режим блокировки.
+        lock_timeout (str): Максимальное ожидание блокировки.
+        retries (int): Количество попыток при превышении lock_timeout.
+        retry_interval (float): Пауза между попытками (в секундах).
+    """
+    op.execute(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+    lock = f"LOCK TABLE {table_name} IN {mode} MODE"
+    if op.get_context().as_sql:
+        op.execute(lock)
+        return
+    bind = op.get_bind()
+
+    def acquire() -> None:
+        with bind.begin_nested():
+            bind.execute(sa.text(lock))
+
+    _with_retries(acquire, retries, retry_interval)
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Iterable[str],
+    unique: bool = False,
+    where: Optional[str] = None,
+    lock_timeout: str = LOCK_TIMEOUT,
+    retries: int = 3,
+    retry_interval: float = 5,
+) -> None:
+    """
+    Создаёт индекс, не блокируя запись в таблицу (CREATE INDEX CONCURRENTLY).
+    Для секционированной таблицы индекс создаётся на родителе (ON ONLY),
+    конкурентно на каждой секции и присоединяется к родителю.
+    Повторный запуск безопасен: недостроенный после ошибки индекс
+    удаляется и строится заново.
+    Args:
+        index_name (str): Имя индекса.
+        table_name (str): Имя таблицы.
+        columns (Iterable[str]): Столбцы или выражения индекса.
+        unique (bool): Уникальный индекс.
+        where (Optional[str]): Условие частичного индекса.
+        lock_timeout (str): Максимальное ожидание блокировки.
+        retries (int): Количество попыток при превышении lock_timeout.
+        retry_interval (float): Пауза между попытками (в секундах).
+    """
+    columns = list(columns)
+    # Построение индекса может занять долго, ограничивается только
+    # ожидание блокировок.
+    with _autocommit(lock_timeout, "0"):
+        partitions = _partitions(table_name)
+        if not partitions:
+            _with_retries(
+                lambda: _create_index(
+                    index_name, table_name, columns, unique, where, True
+                ),
+                retries,
+                retry_interval,
+            )
+            return
+        _with_retries(
+            lambda: _create_index(
+                index_name, f"ONLY {table_name}", columns, unique, where, False
+            ),
+            retries,
+            retry_interval,
+        )
+        for partition in partitions:
+            partition_index = f"{partition}_{index_name}"[:63]
+            _with_retries(
+                lambda: _create_index(
+                    partition_index, partition, columns, unique, where, True
+                ),
+                retries,
+                retry_interval,
+            )
+            _with_retries(
+                lambda: _attach_index(index_name, partition_index),
+                retries,
+                retry_interval,
+            )
+
+
+def drop_index_concurrently(
+    index_name: str, lock_timeout: str = LOCK_TIMEOUT
+) -> None:
+    """
+    Удаляет индекс, не блокируя запись в таблицу (DROP INDEX CONCURRENTLY).
+    Индекс секционированной таблицы так удалить нельзя, для него
+    используется op.drop_index.
+    Args:
+        index_name (str): Имя индекса.
+        lock_timeout (str): Максимальное ожидание блокировки.
+    """
+    with _autocommit(lock_timeout, "0"):
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+
+
+def backfill(
+    table_name: str,
+    set_sql: str,
+    where: str = "true",
+    key: str = "id",
+    batch_size: int = 10_000,
+    pause: float = 0.1,
+    statement_timeout: str = STATEMENT_TIMEOUT,
+    lock_timeout: str = LOCK_TIMEOUT,
+) -> int:
+    """
+    Заполняет столбцы пачками по возрастанию ключа (keyset pagination).
+    Каждая пачка выполняется в отдельной транзакции, поэтому блокировки
+    строк держатся недолго, а между пачками делается пауза, чтобы
+    не нагружать БД и реплики.
+    Args:
+        table_name (str): Имя таблицы.
+        set_sql (str): Выражение SET, например "locale = 'ru'".
+        where (str): Условие для строк, которые нужно обновить.
+        key (str): Индексированный столбец для пагинации.
+        batch_size (int): Количество строк в пачке.
+        pause (float): Пауза между пачками (в секундах).
+        statement_timeout (str): Максимальная длительность пачки.
+        lock_timeout (str): Максимальное ожидание блокировки.
+    Returns:
+        int: Количество обновлённых строк.
+    """
+    update = (
+        f"UPDATE {table_name} SET {set_sql} "
+        f"WHERE {key} > :last AND {key} <= :upper AND ({where})"
+    )
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE {table_name} SET {set_sql} WHERE {where}")
+        return 0
+
+    # Граница пачки ищется по индексу ключа, само обновление
+    # затрагивает только строки пачки, подходящие под условие.
+    next_upper = sa.text(
+        f"SELECT max({key}) FROM (SELECT {key} FROM {table_name} "
+        f"WHERE {key} > :last ORDER BY {key} LIMIT :batch_size) batch"
+    )
+    updated = 0
+    with _autocommit(lock_timeout, statement_timeout):
+        bind = op.get_bind()
+        last = bind.execute(
+            sa.text(f"SELECT min({key}) - 1 FROM {table_name}")
+        ).scalar()
+        while last is not None:
+            upper = bind.execute(
+                next_upper, {"last": last, "batch_size": batch_size}
+            ).scalar()
+            if upper is None:
+                break
+            updated += bind.execute(
+                sa.text(update), {"last": last, "upper": upper}
+            ).rowcount
+            logger.info(
+                "backfill %s: %s rows, %s = %s", table_name, updated, key, upper
+            )
+            last = upper
+            time.sleep(pause)
+    return updated
+
+
+@contextmanager
+def _autocommit(lock_timeout: str, statement_timeout: str) -> Iterator[None]:
+    with op.get_context().autocommit_block():
+        op.execute(f"SET lock_timeout = '{lock_timeout}'")
+        op.execute(f"SET statement_timeout = '{statement_timeout}'")
+        try:
+            yield
+        finally:
+            op.execute("RESET lock_timeout")
+            op.execute("RESET statement_timeout")
+
+
+def _partitions(table_name: str) -> List[str]:
+    if op.get_context().as_sql:
+        return []
+    return list(
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table AND parent.relkind = 'p' "
+                "ORDER BY child.relname"
+            ),
+            {"table": table_name},
+        )
+        .scalars()
+    )
+
+
+def _create_index(
+    index_name: str,
+    table_name: str,
+    columns: List[str],
+    unique: bool,
+    where: Optional[str],
+    concurrently: bool,
+) -> None:
+    if concurrently and not op.get_context().as_sql:
+        # Прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс.
+        invalid = op.get_bind().execute(
+            sa.text(
+                "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = indexrelid "
+                "WHERE relname = :index AND NOT indisvalid"
+            ),
+            {"index": index_name},
+        ).scalar()
+        if invalid:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+    sql = (
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX "
+        f"{'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index_name} "
+        f"ON {table_name} ({', '.join(columns)})"
+    )
+    if where:
+        sql += f" WHERE {where}"
+    op.execute(sql)
+
+
+def _attach_index(index_name: str, partition_index: str) -> None:
+    attached = (
+        None
+        if op.get_context().as_sql
+        else op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT 1 FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = inhrelid "
+                "JOIN pg_class parent ON parent.oid = inhparent "
+                "WHERE child.relname = :child AND parent.relname = :parent"
+            ),
+            {"child": partition_index, "parent": index_name},
+        )
+        .scalar()
+    )
+    if not attached:
+        op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}")
+
+
+def _with_retries(func, retries: int, retry_interval: float) -> None:
+    for attempt in range(retries):
+        try:
+            func()
+            return
+        except sa.exc.DBAPIError as e:
+            # Превышен lock_timeout: lock_not_available (55P03).
+            code = getattr(e.orig, "sqlstate", None) or getattr(
+                e.orig, "pgcode", None
+            )
+            if code != "55P03" or attempt == retries - 1:
+                raise
+            logger.warning("lock timeout, retrying in %s s", retry_interval)
+            time.sleep(retry_interval)
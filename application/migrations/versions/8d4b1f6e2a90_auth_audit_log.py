@@ -0,0 +1,45 @@
+"""auth audit log
+
+Revision ID: 8d4b1f6e2a90
+Revises: 5c2e8a41d7f3
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4b1f6e2a90'
+down_revision: Union[str, Sequence[str], None] = '5c2e8a41d7f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Секции по дням создаёт и удаляет AuditLogService при работе сервиса.
+    op.execute(sa.schema.CreateSequence(sa.Sequence('auth_audit_log_id_seq')))
+    op.create_table('auth_audit_log',
+    sa.Column('id', sa.BigInteger(), server_default=sa.text("nextval('auth_audit_log_id_seq')"), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('event_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('success', sa.Boolean(), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=True),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('ip', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_auth_audit_log_user_id_created_at', 'auth_audit_log', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_auth_audit_log_email_created_at', 'auth_audit_log', ['email', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_auth_audit_log_email_created_at', table_name='auth_audit_log')
+    op.drop_index('ix_auth_audit_log_user_id_created_at', table_name='auth_audit_log')
+    op.drop_table('auth_audit_log')
+    op.execute(sa.schema.DropSequence(sa.Sequence('auth_audit_log_id_seq')))
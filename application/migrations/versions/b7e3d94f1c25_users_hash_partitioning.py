@@ -0,0 +1,222 @@
+"""users hash partitioning
+
+Revision ID: b7e3d94f1c25
+Revises: 8d4b1f6e2a90
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+from migrations.helpers import lock_table
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d94f1c25'
+down_revision: Union[str, Sequence[str], None] = '8d4b1f6e2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Значение auth.models.USERS_SHARDS на момент миграции.
+SHARDS = 16
+BATCH_SIZE = 10_000
+LOCK_TIMEOUT = '5s'
+LOCK_RETRIES = 10
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Перенос users в секционированную таблицу без остановки сервиса:
+    1. создаётся users_partitioned, триггер на users повторяет в ней
+       все изменения;
+    2. существующие строки копируются пачками, каждая пачка в отдельной
+       транзакции;
+    3. таблицы меняются местами под коротким эксклюзивным блокированием.
+    Существующие пользователи сохраняют свои id.
+    Шаги 1 и 2 фиксируются до замены таблиц, поэтому после ошибки
+    (например, не дождались блокировки users) миграцию можно запустить
+    снова: созданные объекты переиспользуются, копирование продолжается
+    с последней скопированной пачки.
+    """
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION auth_user_shard(email text) RETURNS smallint
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT (('x' || substr(md5(email), 1, 8))::bit(32)::bigint % {SHARDS})::smallint $$
+    """)
+    op.create_table('users_partitioned',
+    sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('shard', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('hash_password', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'shard', name='users_partitioned_pkey'),
+    sa.UniqueConstraint('email', 'shard', name='users_partitioned_email_shard_key'),
+    postgresql_partition_by='LIST (shard)',
+    if_not_exists=True
+    )
+    for shard in range(SHARDS):
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS users_p{shard:02d} "
+            f"PARTITION OF users_partitioned FOR VALUES IN ({shard})"
+        )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION auth_users_sync_partitioned() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM users_partitioned
+                WHERE id = OLD.id AND shard = auth_user_shard(OLD.email);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO users_partitioned (id, shard, email, hash_password)
+                VALUES (NEW.id, auth_user_shard(NEW.email), NEW.email, NEW.hash_password)
+                ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS users_sync_partitioned ON users")
+    op.execute("""
+        CREATE TRIGGER users_sync_partitioned
+        AFTER INSERT OR UPDATE OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION auth_users_sync_partitioned()
+    """)
+    # Последний скопированный id: с него продолжается копирование
+    # при повторном запуске миграции.
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS auth_users_copy_progress "
+        "(last_id bigint NOT NULL)"
+    )
+    op.execute(
+        "INSERT INTO auth_users_copy_progress (last_id) SELECT 0 "
+        "WHERE NOT EXISTS (SELECT 1 FROM auth_users_copy_progress)"
+    )
+
+    # Триггер должен быть виден другим соединениям до начала копирования,
+    # поэтому autocommit_block сначала фиксирует текущую транзакцию.
+    with op.get_context().autocommit_block():
+        _copy_users()
+
+    # Ожидание блокировки ограничено, чтобы не задерживать запросы
+    # приложения, выстроившиеся за ней; при превышении - новая попытка.
+    lock_table('users', lock_timeout=LOCK_TIMEOUT, retries=LOCK_RETRIES)
+    op.execute("DROP TRIGGER users_sync_partitioned ON users")
+    op.execute("DROP FUNCTION auth_users_sync_partitioned()")
+    op.execute("DROP TABLE auth_users_copy_progress")
+    op.execute("ALTER SEQUENCE users_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE users_id_seq AS bigint")
+    op.drop_table('users')
+    op.rename_table('users_partitioned', 'users')
+    op.execute("ALTER TABLE users RENAME CONSTRAINT users_partitioned_pkey TO users_pkey")
+    op.execute(
+        "ALTER TABLE users RENAME CONSTRAINT "
+        "users_partitioned_email_shard_key TO users_email_shard_key"
+    )
+    op.execute("ALTER SEQUENCE users_id_seq OWNED BY users.id")
+
+    # Пока идёт выкатка, предыдущая версия приложения вставляет строки
+    # без id и shard. Они попадают в секцию users_pending и сразу
+    # переносятся в свою секцию. id кодирует секцию так же, как у новой
+    # версии, иначе значение nextval совпало бы с id вида
+    # nextval * SHARDS + shard; RETURNING возвращает уже закодированный id.
+    op.execute(
+        "ALTER TABLE users ALTER COLUMN id SET DEFAULT nextval('users_id_seq'), "
+        "ALTER COLUMN shard SET DEFAULT -1"
+    )
+    op.execute("CREATE TABLE users_pending PARTITION OF users FOR VALUES IN (-1)")
+    op.execute(f"""
+        CREATE FUNCTION auth_users_encode_pending_id() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.id := NEW.id * {SHARDS} + auth_user_shard(NEW.email);
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER users_encode_pending_id
+        BEFORE INSERT ON users_pending
+        FOR EACH ROW EXECUTE FUNCTION auth_users_encode_pending_id()
+    """)
+    op.execute("""
+        CREATE FUNCTION auth_users_route_pending() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            DELETE FROM users_pending WHERE id = NEW.id AND shard = NEW.shard;
+            INSERT INTO users (id, shard, email, hash_password)
+            VALUES (NEW.id, auth_user_shard(NEW.email), NEW.email, NEW.hash_password);
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER users_route_pending
+        AFTER INSERT ON users_pending
+        FOR EACH ROW EXECUTE FUNCTION auth_users_route_pending()
+    """)
+
+
+def _copy_users() -> None:
+    copy = """
+        WITH batch AS (
+            SELECT id, email, hash_password FROM users
+            WHERE id > :last_id ORDER BY id LIMIT :batch_size
+            FOR SHARE
+        ), copied AS (
+            INSERT INTO users_partitioned (id, shard, email, hash_password)
+            SELECT id, auth_user_shard(email), email, hash_password FROM batch
+            ON CONFLICT DO NOTHING
+        ), progress AS (
+            UPDATE auth_users_copy_progress SET last_id = (SELECT max(id) FROM batch)
+            WHERE EXISTS (SELECT 1 FROM batch)
+        )
+        SELECT max(id) FROM batch
+    """
+    if context.is_offline_mode():
+        op.execute(
+            "INSERT INTO users_partitioned (id, shard, email, hash_password) "
+            "SELECT id, auth_user_shard(email), email, hash_password FROM users "
+            "ON CONFLICT DO NOTHING"
+        )
+        return
+    # FOR SHARE не даёт изменить или удалить строку, пока её пачка
+    # копируется; изменения после копирования переносит триггер.
+    bind = op.get_bind()
+    last_id = bind.execute(
+        sa.text("SELECT last_id FROM auth_users_copy_progress")
+    ).scalar()
+    while True:
+        last_id = bind.execute(
+            sa.text(copy), {"last_id": last_id, "batch_size": BATCH_SIZE}
+        ).scalar()
+        if last_id is None:
+            break
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    op.execute("LOCK TABLE users IN ACCESS EXCLUSIVE MODE")
+    op.create_table('users_unpartitioned',
+    sa.Column('id', sa.BigInteger(), server_default=sa.text("nextval('users_id_seq')"), nullable=False),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('hash_password', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name='users_unpartitioned_pkey'),
+    sa.UniqueConstraint('email', name='users_unpartitioned_email_key')
+    )
+    op.execute(
+        "INSERT INTO users_unpartitioned (id, email, hash_password) "
+        "SELECT id, email, hash_password FROM users"
+    )
+    op.execute("ALTER SEQUENCE users_id_seq OWNED BY NONE")
+    op.drop_table('users')
+    op.execute("DROP FUNCTION auth_users_route_pending()")
+    op.execute("DROP FUNCTION auth_users_encode_pending_id()")
+    op.execute("DROP FUNCTION auth_user_shard(text)")
+    op.rename_table('users_unpartitioned', 'users')
+    op.execute("ALTER TABLE users RENAME CONSTRAINT users_unpartitioned_pkey TO users_pkey")
+    op.execute("ALTER TABLE users RENAME CONSTRAINT users_unpartitioned_email_key TO users_email_key")
+    op.execute("ALTER SEQUENCE users_id_seq OWNED BY users.id")
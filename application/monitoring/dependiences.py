@@ -0,0 +1,58 @@
+import hmac
+from functools import cache
+
+from fastapi import Header, HTTPException, status
+
+from monitoring.health import WorkerHealth
+from monitoring.profiling import ProfileStore
+from settings import get_settings
+
+
+@cache
+def request_profiles() -> ProfileStore:
+    return ProfileStore(get_settings().PROFILING_MAX_PROFILES)
+
+
+@cache
+def worker_health() -> WorkerHealth:
+    settings = get_settings()
+    return WorkerHealth(
+        settings.WARM_UP_TIMEOUT_SECONDS, settings.WARM_UP_RETRY_INTERVAL_SECONDS
+    )
+
+
+def metrics_access(authorization: str = Header(default=None)):
+    """
+    Проверяет доступ к метрикам.
+    Если METRICS_TOKEN не задан, метрики недоступны.
+    Args:
+        authorization (str): Заголовок Authorization вида `Bearer <токен>`.
+    Raises:
+        HTTPException: Если метрики выключены или токен неверный.
+    """
+    settings = get_settings()
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if authorization is None or not hmac.compare_digest(
+        authorization.encode(), expected.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+def admin_access(x_admin_token: str = Header(default=None)):
+    """
+    Проверяет доступ к административным эндпоинтам.
+    Если PROFILING_TOKEN не задан, эндпоинты недоступны.
+    Args:
+        x_admin_token (str): Токен администратора из заголовка X-Admin-Token.
+    Raises:
+        HTTPException: Если профилирование выключено или токен неверный.
+    """
+    settings = get_settings()
+    if not settings.PROFILING_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(), settings.PROFILING_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
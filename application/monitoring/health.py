@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from auth.repositories import UsersAbstractRepository
+from utils.hashes import HashService
+from utils.metrics import metrics
+from utils.tokens import JWTTokenService
+
+
+async def warm_up_worker(
+    engine: Optional[AsyncEngine], users_repository: UsersAbstractRepository
+) -> None:
+    """
+    Прогревает воркер перед приёмом запросов: разбирает ключи JWT,
+    загружает backend bcrypt, открывает соединения пула и компилирует
+    запросы репозитория пользователей.
+    Args:
+        engine (Optional[AsyncEngine]): Движок БД или None, если БД не используется.
+        users_repository (UsersAbstractRepository): Репозиторий пользователей.
+    """
+    JWTTokenService.warm_up()
+    await asyncio.to_thread(HashService.warm_up)
+    if engine is not None:
+        await _fill_pool(engine)
+    await users_repository.get_one_by_email("")
+    await users_repository.get_one(0)
+
+
+async def _fill_pool(engine: AsyncEngine) -> None:
+    # Соединения открываются одновременно и возвращаются в пул
+    # только после того, как открыты все: иначе пул выдавал бы
+    # одно и то же соединение повторно.
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    async with AsyncExitStack() as stack:
+        connections = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(size))
+        )
+        await asyncio.gather(
+            *(connection.execute(text("SELECT 1")) for connection in connections)
+        )
+
+
+class WorkerHealth:
+    """
+    Состояние готовности воркера.
+    Воркер готов принимать запросы, когда прогрев завершился успешно.
+    Если прогрев не удался (например, БД недоступна), он повторяется
+    в фоне, а воркер остаётся неготовым.
+    """
+
+    def __init__(self, timeout: float, retry_interval: float):
+        """
+        Args:
+            timeout (float): Максимальная длительность прогрева (в секундах).
+            retry_interval (float): Пауза перед повтором прогрева (в секундах).
+        """
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+        metrics.gauge(
+            "auth_worker_ready",
+            "Готовность воркера принимать запросы",
+            lambda: float(self.ready),
+        )
+
+    async def start(self, warm_up: Callable[[], Awaitable[None]]) -> None:
+        """
+        Выполняет прогрев. При неудаче запускает повторы в фоне.
+        Args:
+            warm_up (Callable[[], Awaitable[None]]): Функция прогрева.
+        """
+        if not await self._warm_up(warm_up):
+            self._task = asyncio.create_task(self._retry(warm_up))
+
+    async def stop(self) -> None:
+        """
+        Снимает готовность воркера и останавливает повторы прогрева.
+        """
+        self.ready = False
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _warm_up(self, warm_up: Callable[[], Awaitable[None]]) -> bool:
+        try:
+            await asyncio.wait_for(warm_up(), self.timeout)
+        except Exception as e:
+            logging.error("worker warm-up failed: %r", e)
+            return False
+        self.ready = True
+        return True
+
+    async def _retry(self, warm_up: Callable[[], Awaitable[None]]) -> None:
+        while True:
+            await asyncio.sleep(self.retry_interval)
+            if await self._warm_up(warm_up):
+                return
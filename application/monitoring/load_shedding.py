@@ -0,0 +1,125 @@
+import asyncio
+from typing import Iterable, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from utils.metrics import metrics
+
+
+class EventLoopLagMonitor:
+    """
+    Периодически измеряет задержку event loop: насколько позже
+    запланированного просыпается задача, спящая interval секунд.
+    Пиковое значение затухает постепенно (decay за каждое измерение),
+    чтобы кратковременный спад задержки не снимал перегрузку сразу.
+    """
+
+    def __init__(self, interval: float, decay: float = 0.9):
+        """
+        Args:
+            interval (float): Период измерения (в секундах).
+            decay (float): Коэффициент затухания пикового значения.
+        """
+        self.interval = interval
+        self.decay = decay
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._gauge = metrics.gauge(
+            "auth_event_loop_lag_seconds", "Задержка event loop воркера"
+        )
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            sample = max(0.0, loop.time() - start - self.interval)
+            self.lag = max(sample, self.lag * self.decay)
+            self._gauge.set(self.lag)
+
+
+class LoadSheddingMiddleware:
+    """
+    Middleware для сброса нагрузки.
+    Считает запросы в обработке и, если задержка event loop или их
+    количество превышает порог, сразу отвечает 503 с заголовком
+    Retry-After на дорогие запросы (bcrypt: вход и регистрация).
+    Остальные запросы (обновление токенов, публичный ключ) продолжают
+    обрабатываться.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        monitor: EventLoopLagMonitor,
+        expensive_paths: Iterable[str],
+        lag_threshold: float,
+        max_in_flight: int,
+        retry_after: int,
+    ):
+        """
+        Args:
+            app (ASGIApp): Приложение.
+            monitor (EventLoopLagMonitor): Монитор задержки event loop.
+            expensive_paths (Iterable[str]): Пути дорогих запросов.
+            lag_threshold (float): Порог задержки event loop (в секундах).
+            max_in_flight (int): Порог количества запросов в обработке.
+            retry_after (int): Значение заголовка Retry-After (в секундах).
+        """
+        self.app = app
+        self.monitor = monitor
+        self.expensive_paths = frozenset(expensive_paths)
+        self.lag_threshold = lag_threshold
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._in_flight_gauge = metrics.gauge(
+            "auth_http_requests_in_flight", "HTTP запросы в обработке"
+        )
+        self._shed = metrics.counter(
+            "auth_http_requests_shed_total",
+            "HTTP запросы, отклонённые из-за перегрузки",
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] in self.expensive_paths and self.overloaded():
+            self._shed.inc()
+            response = JSONResponse(
+                {"detail": "Сервис перегружен, повторите запрос позже"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        self._in_flight_gauge.set(self.in_flight)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self._in_flight_gauge.set(self.in_flight)
+
+    def overloaded(self) -> bool:
+        if self.monitor.lag > self.lag_threshold:
+            return True
+        return self.in_flight >= self.max_in_flight
@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import hmac
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class StackSampler:
+    """
+    Семплирующий профилировщик CPU.
+    Фоновый поток с периодом interval снимает стеки всех потоков процесса
+    (event loop и пула потоков, где выполняются bcrypt и синхронные
+    эндпоинты) и считает одинаковые стеки. Первый кадр стека - имя потока.
+    Результат - строки в формате "collapsed stacks" (`frame;frame count`),
+    который понимают flamegraph.pl, speedscope и inferno.
+    Пока профилировщик не запущен, накладных расходов нет.
+    """
+
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval (float): Период снятия стека (в секундах).
+        """
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> str:
+        """
+        Останавливает профилировщик.
+        Returns:
+            str: Стеки в формате collapsed stacks.
+        """
+        self._stopped.set()
+        self._thread.join()
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+
+async def profile_cpu(seconds: float, interval: float) -> str:
+    """
+    Профилирует все потоки текущего воркера.
+    Args:
+        seconds (float): Длительность профилирования (в секундах).
+        interval (float): Период снятия стека (в секундах).
+    Returns:
+        str: Стеки в формате collapsed stacks.
+    """
+    sampler = StackSampler(interval)
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stacks = sampler.stop()
+    return stacks
+
+
+# Количество выполняющихся измерений memory_growth и включён ли
+# tracemalloc ими (а не при запуске процесса).
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+async def memory_growth(seconds: float, limit: int) -> List[str]:
+    """
+    Сравнивает снимки tracemalloc в начале и в конце интервала.
+    Если tracemalloc не был включён, он включается только на время
+    измерения (учитываются только выделения памяти за интервал);
+    одновременные измерения используют его совместно.
+    Args:
+        seconds (float): Длительность измерения (в секундах).
+        limit (int): Количество строк кода с наибольшим ростом.
+    Returns:
+        List[str]: Строки с наибольшим ростом выделенной памяти.
+    """
+    global _tracemalloc_users, _tracemalloc_started
+    if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _tracemalloc_started = True
+    _tracemalloc_users += 1
+    try:
+        before = tracemalloc.take_snapshot()
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+    finally:
+        _tracemalloc_users -= 1
+        # Останавливает последнее из одновременных измерений.
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+    return [str(stat) for stat in after.compare_to(before, "lineno")[:limit]]
+
+
+class ProfileStore:
+    """
+    Ограниченное по размеру хранилище профилей запросов.
+    """
+
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._profiles: OrderedDict[str, str] = OrderedDict()
+
+    def add(self, profile_id: str, profile: str) -> None:
+        self._profiles[profile_id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[str]:
+        return self._profiles.get(profile_id)
+
+
+def sign_profile_request(secret: str, method: str, path: str, timestamp: int) -> str:
+    """
+    Подпись запроса, который нужно профилировать.
+    Args:
+        secret (str): Секрет профилирования.
+        method (str): HTTP метод.
+        path (str): Путь запроса.
+        timestamp (int): Время подписи (unix time).
+    Returns:
+        str: Подпись для заголовка X-Profile-Signature.
+    """
+    message = f"{method.upper()}\n{path}\n{timestamp}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+class RequestProfilingMiddleware:
+    """
+    Middleware для профилирования отдельного запроса.
+    Запрос профилируется, если в нём переданы заголовки X-Profile-Timestamp
+    и X-Profile-Signature с действительной подписью (см. sign_profile_request).
+    Профиль сохраняется в памяти воркера, его id возвращается в заголовке
+    X-Profile-Id. Профиль содержит стеки всех потоков воркера за время
+    запроса, в том числе стеки параллельных запросов.
+    Подключается только при заданном PROFILING_TOKEN.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret: str,
+        profiles: ProfileStore,
+        interval: float,
+        max_age: int = 60,
+    ):
+        """
+        Args:
+            app (ASGIApp): Приложение.
+            secret (str): Секрет для проверки подписи.
+            profiles (ProfileStore): Хранилище профилей.
+            interval (float): Период снятия стека (в секундах).
+            max_age (int): Срок действия подписи (в секундах).
+        """
+        self.app = app
+        self.secret = secret
+        self.profiles = profiles
+        self.interval = interval
+        self.max_age = max_age
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._is_signed(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Profile-Id", profile_id)
+            await send(message)
+
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.profiles.add(profile_id, sampler.stop())
+
+    def _is_signed(self, scope: Scope) -> bool:
+        headers = dict(scope["headers"])
+        signature = headers.get(b"x-profile-signature")
+        timestamp = headers.get(b"x-profile-timestamp")
+        if signature is None or timestamp is None:
+            return False
+        try:
+            timestamp = int(timestamp)
+        except ValueError:
+            return False
+        if abs(time.time() - timestamp) > self.max_age:
+            return False
+        expected = sign_profile_request(
+            self.secret, scope["method"], scope["path"], timestamp
+        )
+        return hmac.compare_digest(expected, signature.decode("latin-1"))
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from monitoring.dependiences import (
+    admin_access,
+    metrics_access,
+    request_profiles,
+    worker_health,
+)
+from monitoring.profiling import memory_growth, profile_cpu
+from utils.metrics import metrics
+
+router = APIRouter(tags=["Monitoring"])
+admin_router = APIRouter(
+    prefix="/api/v1/admin/profiling",
+    tags=["Admin"],
+    dependencies=[Depends(admin_access)],
+)
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(metrics_access)],
+)
+def get_metrics():
+    """
+    Получение метрик текущего воркера.
+    Доступно только с токеном METRICS_TOKEN в заголовке Authorization.
+
+    Returns:
+        str: Метрики в текстовом формате Prometheus.
+    """
+    return metrics.render()
+
+
+@router.get("/health/live")
+def health_live():
+    """
+    Проверка, что воркер запущен и обрабатывает запросы.
+
+    Returns:
+        dict: Статус воркера.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+def health_ready():
+    """
+    Проверка готовности воркера принимать трафик.
+    Воркер готов после успешного прогрева и до начала остановки.
+    Raises:
+        HTTPException: Если воркер не готов.
+    Returns:
+        dict: Статус воркера.
+    """
+    if not worker_health().ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Воркер не готов",
+        )
+    return {"status": "ready"}
+
+
+@admin_router.get("/cpu", response_class=PlainTextResponse)
+async def get_cpu_profile(
+    seconds: float = Query(default=10, gt=0, le=60),
+    interval_ms: float = Query(default=5, ge=1, le=1000),
+):
+    """
+    Семплирующий профиль CPU текущего воркера.
+    Args:
+        seconds (float): Длительность профилирования (в секундах).
+        interval_ms (float): Период снятия стека (в миллисекундах).
+    Returns:
+        str: Стеки в формате collapsed stacks для построения flamegraph.
+    """
+    return await profile_cpu(seconds, interval_ms / 1000)
+
+
+@admin_router.get("/memory", response_class=PlainTextResponse)
+async def get_memory_growth(
+    seconds: float = Query(default=10, gt=0, le=60),
+    limit: int = Query(default=30, ge=1, le=500),
+):
+    """
+    Рост выделенной памяти текущего воркера по строкам кода (tracemalloc).
+    Args:
+        seconds (float): Длительность измерения (в секундах).
+        limit (int): Количество строк в ответе.
+    Returns:
+        str: Строки кода с наибольшим ростом выделенной памяти.
+    """
+    return "\n".join(await memory_growth(seconds, limit)) + "\n"
+
+
+@admin_router.get("/requests/{profile_id}", response_class=PlainTextResponse)
+def get_request_profile(profile_id: str):
+    """
+    Профиль отдельного запроса, снятый по подписанному заголовку.
+    Профиль хранится в памяти воркера, обработавшего запрос.
+    Args:
+        profile_id (str): Идентификатор профиля из заголовка X-Profile-Id.
+    Raises:
+        HTTPException: Если профиль не найден.
+    Returns:
+        str: Стеки в формате collapsed stacks.
+    """
+    profile = request_profiles().get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Профиль не найден",
+        )
+    return profile
@@ -0,0 +1,48 @@
+"""
+Внутренний RPC сервиса аутентификации (msgpack поверх TCP или Unix socket).
+
+Запускается отдельным процессом рядом с HTTP-сервисом:
+    cd application && python -m rpc
+"""
+
+import asyncio
+import logging
+import signal
+
+from auth.dependiences import users_repository
+from database import dispose_engine, get_engine
+from monitoring.health import warm_up_worker
+from rpc.dependiences import rpc_server
+from settings import get_settings
+
+
+async def serve() -> None:
+    """
+    Прогревает процесс, запускает RPC-сервер и работает
+    до получения SIGINT или SIGTERM.
+    """
+    settings = get_settings()
+    await warm_up_worker(
+        None if settings.USERS_REPOSITORY == "memory" else get_engine(),
+        users_repository(),
+    )
+    server = rpc_server()
+    await server.start(
+        settings.RPC_HOST, settings.RPC_PORT, settings.RPC_SOCKET_PATH
+    )
+    logging.info(
+        "RPC server listening on %s",
+        ", ".join(str(socket.getsockname()) for socket in server.sockets),
+    )
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopped.set)
+    await stopped.wait()
+    await server.stop()
+    await dispose_engine()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve())
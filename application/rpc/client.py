@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rpc.protocol import HELLO, RPCError, encode_frame, read_frame
+
+
+class RPCClient:
+    """
+    Клиент внутреннего RPC.
+    Использует одно постоянное соединение: запросы из разных задач
+    отправляются, не дожидаясь ответов на предыдущие (pipelining),
+    ответы сопоставляются по id.
+
+    Пример:
+        async with await RPCClient.connect(path="/run/auth/rpc.sock") as client:
+            payload = await client.call("tokens.decode", {"token": token})
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    @classmethod
+    async def connect(
+        cls,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        path: Optional[str] = None,
+        secret: Optional[str] = None,
+    ) -> "RPCClient":
+        """
+        Открывает соединение с RPC-сервером.
+        Args:
+            host (Optional[str]): Адрес TCP.
+            port (Optional[int]): Порт TCP.
+            path (Optional[str]): Путь к Unix socket (вместо TCP).
+            secret (Optional[str]): Общий секрет, если он задан на сервере.
+        Returns:
+            RPCClient: Клиент.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        client = cls(reader, writer)
+        if secret is not None:
+            try:
+                await client.call(HELLO, {"secret": secret})
+            except BaseException:
+                await client.close()
+                raise
+        return client
+
+    async def call(self, method: str, params: Optional[dict] = None) -> Any:
+        """
+        Выполняет запрос.
+        Args:
+            method (str): Имя метода.
+            params (Optional[dict]): Параметры метода.
+        Returns:
+            Any: Результат метода.
+        Raises:
+            RPCError: Если сервер вернул ошибку.
+            ConnectionError: Если соединение закрыто.
+        """
+        id = next(self._ids)
+        error, result = await self._send(id, [id, method, params or {}])
+        if error is not None:
+            raise RPCError(*error)
+        return result
+
+    async def batch(
+        self, calls: Iterable[Tuple[str, Optional[dict]]]
+    ) -> List[Any]:
+        """
+        Выполняет пакет запросов одним кадром.
+        Args:
+            calls (Iterable[Tuple[str, Optional[dict]]]): Пары
+                (метод, параметры).
+        Returns:
+            List[Any]: Результаты в порядке запросов; для запросов,
+                завершившихся ошибкой, - объекты RPCError.
+        """
+        requests = [
+            [next(self._ids), method, params or {}] for method, params in calls
+        ]
+        if not requests:
+            return []
+        responses = await self._send(requests[0][0], requests)
+        return [
+            RPCError(*error) if error is not None else result
+            for _, error, result in responses
+        ]
+
+    async def close(self) -> None:
+        """
+        Закрывает соединение.
+        """
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self) -> "RPCClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _send(self, id: int, message: Any) -> Any:
+        if self._reader_task.done():
+            raise ConnectionError("Соединение с RPC-сервером закрыто")
+        future = asyncio.get_running_loop().create_future()
+        self._pending[id] = future
+        try:
+            self._writer.write(encode_frame(message))
+            await self._writer.drain()
+            return await future
+        finally:
+            self._pending.pop(id, None)
+
+    async def _read_responses(self) -> None:
+        error: BaseException = ConnectionError(
+            "Соединение с RPC-сервером закрыто"
+        )
+        try:
+            while True:
+                response = await read_frame(self._reader)
+                if response and isinstance(response[0], list):
+                    # Ответ на пакет: находим запрос по id первого ответа.
+                    id, value = response[0][0], response
+                else:
+                    id, value = response[0], response[1:]
+                    if id is None:
+                        # Сервер отклонил кадр и закрывает соединение.
+                        error = RPCError(*response[1])
+                        break
+                future = self._pending.get(id)
+                if future is not None and not future.done():
+                    future.set_result(value)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
@@ -0,0 +1,19 @@
+from functools import cache
+
+from auth.dependiences import user_service
+from rpc.methods import AuthRPCMethods
+from rpc.server import RPCServer
+from settings import get_settings
+
+
+@cache
+def rpc_server() -> RPCServer:
+    settings = get_settings()
+    return RPCServer(
+        AuthRPCMethods(user_service).registry(),
+        secret=settings.RPC_SECRET,
+        max_frame_size=settings.RPC_MAX_FRAME_BYTES,
+        max_batch_size=settings.RPC_MAX_BATCH_SIZE,
+        max_in_flight=settings.RPC_MAX_IN_FLIGHT,
+        hello_timeout=settings.RPC_HELLO_TIMEOUT_SECONDS,
+    )
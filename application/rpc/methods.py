@@ -0,0 +1,81 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+
+from auth.services import UserService
+from settings import get_settings
+from utils.tokens import JWTTokenService
+
+Method = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class AuthRPCMethods:
+    """
+    Методы внутреннего RPC: операции JWTTokenService и поиск
+    пользователей через UserService.
+    Пользователь возвращается без хэша пароля, время истечения
+    токена - в секундах Unix time.
+    Кэш access токенов у RPC-процесса свой, поэтому методы не используют
+    его и не дают его сбросить: после выхода (/logout/) RPC не вернёт
+    access токен, выпущенный до него.
+    """
+
+    def __init__(
+        self,
+        user_service: Callable[[], UserService],
+        token_service: Type[JWTTokenService] = JWTTokenService,
+    ):
+        """
+        Args:
+            user_service (Callable[[], UserService]): Фабрика сервиса
+                пользователей.
+            token_service (Type[JWTTokenService]): Сервис JWT токенов.
+        """
+        self.user_service = user_service
+        self.token_service = token_service
+
+    def registry(self) -> Dict[str, Method]:
+        """
+        Методы по именам.
+        Returns:
+            Dict[str, Method]: Имя метода и функция, принимающая params.
+        """
+        return {
+            "keys.public": self.public_key,
+            "tokens.create": self.create_tokens,
+            "tokens.decode": self.decode_token,
+            "users.get": self.get_user,
+            "users.get_by_email": self.get_user_by_email,
+        }
+
+    async def public_key(self, params: Dict[str, Any]) -> str:
+        return get_settings().PUBLIC_KEY
+
+    async def create_tokens(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        access_token, access_token_expire, refresh_token = (
+            self.token_service.create_tokens({"id": params["user_id"]})
+        )
+        return {
+            "access_token": access_token,
+            "access_token_expire": int(access_token_expire.timestamp()),
+            "refresh_token": refresh_token,
+        }
+
+    async def decode_token(
+        self, params: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        return self.token_service.decode_jwt_token(params["token"])
+
+    async def get_user(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self._user(await self.user_service().get_one(params["id"]))
+
+    async def get_user_by_email(
+        self, params: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        return self._user(
+            await self.user_service().get_one_by_email(params["email"])
+        )
+
+    @staticmethod
+    def _user(user) -> Optional[Dict[str, Any]]:
+        if user is None:
+            return None
+        return {"id": user.id, "email": user.email}
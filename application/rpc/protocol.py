@@ -0,0 +1,84 @@
+"""
+Формат сообщений внутреннего RPC.
+
+Каждое сообщение - кадр: длина (4 байта, big-endian) и тело в msgpack.
+- запрос: [id, method, params], где params - словарь;
+- ответ: [id, error, result], где error - None или [code, message];
+- пакет: список запросов в одном кадре, ответ - список ответов
+  в том же порядке.
+Если на сервере задан секрет, первым запросом соединения должен быть
+[id, "auth.hello", {"secret": ...}].
+Запросы одного соединения выполняются конкурентно (pipelining),
+поэтому ответы приходят не обязательно в порядке запросов и
+сопоставляются по id.
+"""
+
+import asyncio
+import struct
+from typing import Any, Optional
+
+import msgpack
+
+HEADER = struct.Struct(">I")
+
+# Первый запрос соединения, если на сервере задан секрет.
+HELLO = "auth.hello"
+
+# Коды ошибок ответа.
+UNAUTHORIZED = "unauthorized"
+METHOD_NOT_FOUND = "method_not_found"
+INVALID_REQUEST = "invalid_request"
+INVALID_PARAMS = "invalid_params"
+UNAVAILABLE = "unavailable"
+INTERNAL = "internal"
+
+
+class RPCError(Exception):
+    """
+    Ошибка выполнения RPC-запроса, передаваемая клиенту.
+    """
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+
+class FrameTooLargeError(Exception):
+    """
+    Исключение, выбрасываемое, если длина кадра превышает допустимую.
+    """
+
+    pass
+
+
+def encode_frame(message: Any) -> bytes:
+    """
+    Кодирует сообщение в кадр.
+    Args:
+        message (Any): Сообщение.
+    Returns:
+        bytes: Длина и тело сообщения.
+    """
+    body = msgpack.packb(message, use_bin_type=True)
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(
+    reader: asyncio.StreamReader, max_size: Optional[int] = None
+) -> Any:
+    """
+    Читает и декодирует один кадр.
+    Args:
+        reader (asyncio.StreamReader): Поток соединения.
+        max_size (Optional[int]): Максимальная длина тела (в байтах).
+    Returns:
+        Any: Сообщение.
+    Raises:
+        asyncio.IncompleteReadError: Если соединение закрыто.
+        FrameTooLargeError: Если тело длиннее max_size.
+    """
+    (size,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if max_size is not None and size > max_size:
+        raise FrameTooLargeError(f"Кадр {size} байт больше {max_size}")
+    return msgpack.unpackb(await reader.readexactly(size), raw=False)
@@ -0,0 +1,234 @@
+import asyncio
+import hmac
+import logging
+import os
+from typing import Any, Mapping, Optional, Set
+
+from auth.exceptions import RepositoryUnavailableError
+from rpc.methods import Method
+from rpc.protocol import (
+    INTERNAL,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    HELLO,
+    UNAUTHORIZED,
+    UNAVAILABLE,
+    RPCError,
+    encode_frame,
+    read_frame,
+)
+
+
+class RPCServer:
+    """
+    Сервер внутреннего RPC.
+    - Соединения постоянные, запросы одного соединения выполняются
+      конкурентно (не больше max_in_flight одновременно), ответы
+      отправляются по мере готовности.
+    - Кадр может содержать пакет запросов, они выполняются конкурентно,
+      ответ на пакет отправляется одним кадром.
+    - Если задан secret, первым запросом соединения должен быть
+      auth.hello с этим секретом (не позже hello_timeout секунд
+      после подключения), иначе соединение закрывается. Без секрета
+      сервер принимает соединения только на Unix socket.
+    """
+
+    def __init__(
+        self,
+        methods: Mapping[str, Method],
+        secret: Optional[str] = None,
+        max_frame_size: int = 1_048_576,
+        max_batch_size: int = 1000,
+        max_in_flight: int = 256,
+        hello_timeout: float = 5,
+    ):
+        """
+        Args:
+            methods (Mapping[str, Method]): Методы по именам.
+            secret (Optional[str]): Общий секрет клиентов.
+            max_frame_size (int): Максимальная длина кадра (в байтах).
+            max_batch_size (int): Максимальное количество запросов в пакете.
+            max_in_flight (int): Максимальное количество одновременно
+                выполняющихся кадров одного соединения.
+            hello_timeout (float): Максимальное ожидание auth.hello
+                (в секундах).
+        """
+        self.methods = methods
+        self.secret = secret
+        self.max_frame_size = max_frame_size
+        self.max_batch_size = max_batch_size
+        self.max_in_flight = max_in_flight
+        self.hello_timeout = hello_timeout
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    async def start(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        """
+        Начинает принимать соединения на Unix socket (если задан path)
+        или на TCP-порту.
+        Args:
+            host (Optional[str]): Адрес TCP.
+            port (Optional[int]): Порт TCP.
+            path (Optional[str]): Путь к Unix socket.
+        Raises:
+            ValueError: Если для TCP не задан secret.
+        """
+        if path is None and self.secret is None:
+            # Иначе любой, кому доступен порт, выпускает токены
+            # для любого пользователя (tokens.create).
+            raise ValueError("RPC по TCP требует секрет (RPC_SECRET)")
+        if path is not None:
+            if os.path.exists(path):
+                os.unlink(path)
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path
+            )
+            # Доступ к сокету есть только у пользователя сервиса.
+            os.chmod(path, 0o600)
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host, port
+            )
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server is not None else ()
+
+    async def stop(self) -> None:
+        """
+        Перестаёт принимать соединения и закрывает открытые.
+        """
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        requests: Set[asyncio.Task] = set()
+        try:
+            if self.secret is not None and not await self._hello(
+                reader, writer
+            ):
+                return
+            while True:
+                try:
+                    message = await read_frame(reader, self.max_frame_size)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except Exception as e:
+                    # Кадр слишком длинный или не разбирается: дальнейший
+                    # поток нельзя разделить на кадры.
+                    error = [INVALID_REQUEST, str(e) or repr(e)]
+                    await self._send(writer, [None, error, None])
+                    return
+                # Новые кадры не читаются, пока выполняется max_in_flight.
+                await in_flight.acquire()
+                request = asyncio.create_task(
+                    self._respond(message, writer, in_flight)
+                )
+                requests.add(request)
+                request.add_done_callback(requests.discard)
+        finally:
+            for request in requests:
+                request.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            self._connections.discard(connection)
+
+    async def _hello(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        try:
+            id, method, params = await asyncio.wait_for(
+                read_frame(reader, self.max_frame_size), self.hello_timeout
+            )
+            secret = params["secret"]
+        except Exception:
+            return False
+        if method != HELLO or not hmac.compare_digest(
+            str(secret).encode(), self.secret.encode()
+        ):
+            await self._send(
+                writer, [id, [UNAUTHORIZED, "Неверный секрет"], None]
+            )
+            return False
+        await self._send(writer, [id, None, True])
+        return True
+
+    async def _respond(
+        self,
+        message: Any,
+        writer: asyncio.StreamWriter,
+        in_flight: asyncio.Semaphore,
+    ) -> None:
+        try:
+            if isinstance(message, list) and all(
+                isinstance(request, list) for request in message
+            ):
+                if len(message) > self.max_batch_size:
+                    error = [
+                        INVALID_REQUEST,
+                        f"Пакет больше {self.max_batch_size} запросов",
+                    ]
+                    response = [
+                        [request[0] if request else None, error, None]
+                        for request in message
+                    ]
+                else:
+                    response = list(
+                        await asyncio.gather(*map(self._call, message))
+                    )
+            else:
+                response = await self._call(message)
+            await self._send(writer, response)
+        except ConnectionError:
+            pass
+        finally:
+            in_flight.release()
+
+    async def _call(self, request: Any) -> list:
+        if not isinstance(request, list) or len(request) != 3:
+            error = [INVALID_REQUEST, "Ожидается [id, method, params]"]
+            return [None, error, None]
+        id, method, params = request
+        func = self.methods.get(method)
+        if func is None:
+            error = [METHOD_NOT_FOUND, f"Метод {method} не найден"]
+            return [id, error, None]
+        if not isinstance(params, dict):
+            error = [INVALID_PARAMS, "params должен быть словарём"]
+            return [id, error, None]
+        try:
+            return [id, None, await func(params)]
+        except RPCError as e:
+            return [id, [e.code, e.message], None]
+        except (KeyError, TypeError, ValueError) as e:
+            return [id, [INVALID_PARAMS, repr(e)], None]
+        except RepositoryUnavailableError as e:
+            return [id, [UNAVAILABLE, str(e)], None]
+        except Exception as e:
+            logging.exception("RPC %s failed", method)
+            return [id, [INTERNAL, repr(e)], None]
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: Any) -> None:
+        writer.write(encode_frame(message))
+        await writer.drain()
@@ -1,5 +1,7 @@
 import os
+from functools import cache, cached_property
 from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -30,6 +32,62 @@ class Settings(BaseSettings):
     TEST_ALLOWED_HOSTS_STRING: str
     TEST_ORIGINS_STRING: str
     TESTING: bool = False
+    USERS_REPOSITORY: Literal["postgresql", "memory"] = "postgresql"
+    OUTBOX_DISPATCHER_ENABLED: bool = False
+    OUTBOX_SINK: Literal["log", "file"] = "log"
+    OUTBOX_SINK_PATH: str = "auth_events.jsonl"
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_LOG_BATCH_SIZE: int = 500
+    AUDIT_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_LOG_MAX_BUFFER_SIZE: int = 10_000
+    AUDIT_LOG_RETENTION_DAYS: int = 90
+    AUDIT_LOG_PARTITIONS_AHEAD_DAYS: int = 3
+    AUDIT_LOG_MAINTENANCE_INTERVAL_SECONDS: float = 3600
+    AUDIT_LOG_MAX_RETRY_INTERVAL_SECONDS: float = 60
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_MONITOR_INTERVAL_MS: int = 50
+    LOAD_SHEDDING_LAG_THRESHOLD_MS: int = 200
+    LOAD_SHEDDING_MAX_IN_FLIGHT: int = 64
+    LOAD_SHEDDING_RETRY_AFTER_SECONDS: int = 1
+    PROFILING_TOKEN: Optional[str] = None
+    METRICS_TOKEN: Optional[str] = None
+    PROFILING_REQUEST_INTERVAL_MS: float = 1
+    PROFILING_MAX_PROFILES: int = 20
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "auth_service"
+    TRACING_EXPORTER: Literal["otlp", "console", "file"] = "otlp"
+    TRACING_OTLP_ENDPOINT: Optional[str] = None
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 0.01
+    BREACHED_PASSWORDS_FILTER_PATH: Optional[str] = None
+    ACCESS_TOKEN_CACHE_ENABLED: bool = False
+    ACCESS_TOKEN_CACHE_MAX_SIZE: int = 100_000
+    ACCESS_TOKEN_CACHE_MIN_REMAINING_SECONDS: int = 120
+    WARM_UP_TIMEOUT_SECONDS: float = 10
+    WARM_UP_RETRY_INTERVAL_SECONDS: float = 5
+    DB_QUERY_TIMEOUT_SECONDS: float = 2
+    DB_POOL_TIMEOUT_SECONDS: float = 1
+    DB_CIRCUIT_BREAKER_ENABLED: bool = True
+    DB_CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    DB_CIRCUIT_BREAKER_RESET_SECONDS: float = 5
+    DEGRADED_USER_CACHE_TTL_SECONDS: float = 300
+    DEGRADED_USER_CACHE_MAX_SIZE: int = 100_000
+    DB_FAULT_LATENCY_MS: int = 0
+    DB_FAULT_ERROR_RATE: float = 0.0
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: float = 600
+    IDEMPOTENCY_MAX_SIZE: int = 100_000
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = 30
+    RPC_HOST: str = "127.0.0.1"
+    RPC_PORT: int = 8001
+    RPC_SOCKET_PATH: Optional[str] = None
+    RPC_SECRET: Optional[str] = None
+    RPC_MAX_FRAME_BYTES: int = 1_048_576
+    RPC_MAX_BATCH_SIZE: int = 1000
+    RPC_MAX_IN_FLIGHT: int = 256
+    RPC_HELLO_TIMEOUT_SECONDS: float = 5
 
     @property
     def ALLOWED_HOSTS(self):
@@ -61,15 +119,22 @@ class Settings(BaseSettings):
             f"{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/test"
         )
 
-    @property
+    @cached_property
     def PRIVATE_KEY(self):
         with open(self.PRIVATE_KEY_PATH) as file:
             return file.read()
 
-    @property
+    @cached_property
     def PUBLIC_KEY(self):
         with open(self.PUBLIC_KEY_PATH) as file:
             return file.read()
 
 
-settings = Settings()
+@cache
+def get_settings() -> Settings:
+    """
+    Возвращает настройки сервиса, читая их при первом обращении.
+    Returns:
+        Settings: Настройки сервиса.
+    """
+    return Settings()
@@ -0,0 +1,221 @@
+"""
+Фильтр Блума, хранящийся в файле и отображаемый в память (mmap).
+
+Файл открывается только на чтение, поэтому все воркеры gunicorn
+используют одни и те же страницы из page cache.
+
+Сборка фильтра из списка SHA-1 хэшей паролей (формат HIBP: `HASH:COUNT`
+или просто `HASH` в каждой строке):
+    cd application
+    python -m utils.bloom pwned-passwords-sha1.txt passwords.bloom
+"""
+
+import argparse
+import math
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"AUTHBLM1"
+HEADER = struct.Struct(">8sQI4x")
+
+
+class BloomFilter:
+    """
+    Фильтр Блума поверх отображённого в память файла.
+    Элементы фильтра - равномерно распределённые дайджесты (например, SHA-1),
+    позиции битов вычисляются двойным хэшированием из первых 16 байт.
+    """
+
+    def __init__(self, buffer: mmap.mmap, num_bits: int, num_hashes: int):
+        self._buffer = buffer
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+
+    @classmethod
+    def open(cls, path: str) -> "BloomFilter":
+        """
+        Открывает фильтр из файла только на чтение.
+        Args:
+            path (str): Путь к файлу фильтра.
+        Returns:
+            BloomFilter: Фильтр.
+        Raises:
+            ValueError: Если файл пуст, обрезан или не является
+                фильтром Блума.
+        """
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise ValueError(
+                    f"{path} не является фильтром Блума: файл пуст или обрезан"
+                )
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, num_bits, num_hashes = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            buffer.close()
+            raise ValueError(
+                f"{path} не является фильтром Блума: неверная сигнатура"
+            )
+        size = HEADER.size + math.ceil(num_bits / 8)
+        if not num_bits or not num_hashes or len(buffer) < size:
+            buffer.close()
+            raise ValueError(f"Фильтр Блума {path} обрезан или повреждён")
+        return cls(buffer, num_bits, num_hashes)
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        digests: Iterable[bytes],
+        expected: int,
+        fp_rate: float,
+    ) -> int:
+        """
+        Создаёт файл фильтра из потока дайджестов.
+        Битовый массив пишется напрямую в отображённый файл, поэтому
+        потребление памяти не зависит от размера входного списка.
+        Args:
+            path (str): Путь к создаваемому файлу.
+            digests (Iterable[bytes]): Дайджесты (не короче 16 байт).
+            expected (int): Ожидаемое количество элементов.
+            fp_rate (float): Допустимая доля ложноположительных срабатываний.
+        Returns:
+            int: Количество добавленных элементов.
+        """
+        num_bits, num_hashes = cls.optimal_parameters(expected, fp_rate)
+        size = HEADER.size + math.ceil(num_bits / 8)
+        with open(path, "w+b") as file:
+            file.truncate(size)
+            buffer = mmap.mmap(file.fileno(), size)
+        try:
+            HEADER.pack_into(buffer, 0, MAGIC, num_bits, num_hashes)
+            bloom = cls(buffer, num_bits, num_hashes)
+            count = 0
+            for digest in digests:
+                bloom._add(digest)
+                count += 1
+            buffer.flush()
+        finally:
+            buffer.close()
+        return count
+
+    @staticmethod
+    def optimal_parameters(expected: int, fp_rate: float) -> Tuple[int, int]:
+        """
+        Вычисляет размер битового массива и количество хэш-функций.
+        Args:
+            expected (int): Ожидаемое количество элементов.
+            fp_rate (float): Допустимая доля ложноположительных срабатываний.
+        Returns:
+            Tuple[int, int]: Количество бит и количество хэш-функций.
+        Raises:
+            ValueError: Если fp_rate не в интервале (0, 1).
+        """
+        if not 0 < fp_rate < 1:
+            raise ValueError(
+                f"Доля ложноположительных срабатываний должна быть в (0, 1), "
+                f"получено {fp_rate}"
+            )
+        expected = max(expected, 1)
+        num_bits = math.ceil(-expected * math.log(fp_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / expected * math.log(2)))
+        return num_bits, num_hashes
+
+    def __contains__(self, digest: bytes) -> bool:
+        buffer = self._buffer
+        for position in self._positions(digest):
+            byte = buffer[HEADER.size + (position >> 3)]
+            if not byte & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def _add(self, digest: bytes) -> None:
+        buffer = self._buffer
+        for position in self._positions(digest):
+            index = HEADER.size + (position >> 3)
+            buffer[index] = buffer[index] | (1 << (position & 7))
+
+    def _positions(self, digest: bytes) -> List[int]:
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+
+def read_digests(path: str) -> Iterator[bytes]:
+    """
+    Построчно читает SHA-1 хэши из текстового файла.
+    Args:
+        path (str): Путь к файлу.
+    Yields:
+        bytes: Дайджест; строки, не являющиеся SHA-1 хэшем, пропускаются.
+    """
+    with open(path, encoding="ascii", errors="ignore") as file:
+        for line in file:
+            value = line.split(":", 1)[0].strip()
+            if len(value) != 40:
+                continue
+            try:
+                yield bytes.fromhex(value)
+            except ValueError:
+                continue
+
+
+def fp_rate(value: str) -> float:
+    """
+    Разбирает аргумент --fp-rate.
+    Args:
+        value (str): Значение аргумента.
+    Returns:
+        float: Доля ложноположительных срабатываний.
+    Raises:
+        argparse.ArgumentTypeError: Если значение не число в (0, 1).
+    """
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = math.nan
+    if not 0 < rate < 1:
+        raise argparse.ArgumentTypeError(
+            f"ожидается число в интервале (0, 1), получено {value!r}"
+        )
+    return rate
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Сборка фильтра Блума из списка SHA-1 хэшей паролей"
+    )
+    parser.add_argument("input", help="файл со строками HASH или HASH:COUNT")
+    parser.add_argument("output", help="путь к создаваемому фильтру")
+    parser.add_argument(
+        "--expected",
+        type=int,
+        default=None,
+        help="ожидаемое количество хэшей (по умолчанию считается по файлу)",
+    )
+    parser.add_argument(
+        "--fp-rate",
+        type=fp_rate,
+        default=0.001,
+        help="допустимая доля ложноположительных срабатываний, (0, 1)",
+    )
+    args = parser.parse_args(argv)
+
+    expected = args.expected
+    if expected is None:
+        expected = sum(1 for _ in read_digests(args.input))
+    tmp_path = f"{args.output}.tmp"
+    count = BloomFilter.build(
+        tmp_path, read_digests(args.input), expected, args.fp_rate
+    )
+    # Атомарная замена: работающие воркеры продолжают читать старый файл.
+    os.replace(tmp_path, args.output)
+    print(f"Добавлено {count} хэшей в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import hashlib
+from typing import Optional
+
+from settings import get_settings
+from utils.bloom import BloomFilter
+
+
+class BreachedPasswordService:
+    """
+    Сервис для проверки паролей по локальному списку утёкших паролей.
+    Список хранится в виде фильтра Блума (см. utils.bloom), путь к которому
+    задаётся настройкой BREACHED_PASSWORDS_FILTER_PATH. Если путь не задан,
+    проверка отключена.
+    """
+
+    _filter: Optional[BloomFilter] = None
+
+    @classmethod
+    def is_breached(cls, password: str) -> bool:
+        """
+        Проверяет, встречается ли пароль в списке утёкших.
+        Возможны редкие ложноположительные срабатывания, пропусков нет.
+        Args:
+            password (str): Пароль.
+        Returns:
+            bool: True, если пароль найден в списке, иначе False.
+        """
+        bloom = cls._get_filter()
+        if bloom is None:
+            return False
+        return hashlib.sha1(password.encode()).digest() in bloom
+
+    @classmethod
+    def _get_filter(cls) -> Optional[BloomFilter]:
+        # Файл открывается лениво, уже в процессе воркера.
+        path = get_settings().BREACHED_PASSWORDS_FILTER_PATH
+        if cls._filter is None and path:
+            cls._filter = BloomFilter.open(path)
+        return cls._filter
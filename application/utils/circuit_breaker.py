@@ -0,0 +1,155 @@
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from utils.metrics import metrics
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """
+    Исключение, выбрасываемое, когда вызов отклонён открытым
+    автоматическим выключателем.
+    """
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Выключатель {name} разомкнут")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель (circuit breaker) для вызовов внешней
+    зависимости.
+    - closed: вызовы выполняются, подряд идущие ошибки считаются;
+    - open: после failure_threshold ошибок подряд вызовы сразу
+      отклоняются с CircuitOpenError, не дожидаясь зависимости;
+    - half_open: через reset_timeout секунд выполняется один пробный
+      вызов, его успех замыкает выключатель, ошибка снова размыкает.
+    Отказом считаются только исключения, для которых is_failure возвращает
+    True, остальные (например, нарушение уникальности) означают,
+    что зависимость ответила.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        is_failure: Callable[[Exception], bool] = lambda e: True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            name (str): Имя выключателя (для метрик и сообщений).
+            failure_threshold (int): Количество ошибок подряд для размыкания.
+            reset_timeout (float): Время до пробного вызова (в секундах).
+            is_failure (Callable[[Exception], bool]): Является ли
+                исключение отказом зависимости.
+            clock (Callable[[], float]): Источник монотонного времени.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self._clock = clock
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        metrics.gauge(
+            f"auth_circuit_breaker_{name}_state",
+            f"Состояние выключателя {name}: 0 - замкнут, 1 - разомкнут, "
+            "2 - пробный вызов",
+            lambda: _STATE_VALUES[self.state],
+        )
+        self._opened = metrics.counter(
+            f"auth_circuit_breaker_{name}_opened_total",
+            f"Размыкания выключателя {name}",
+        )
+        self._rejected = metrics.counter(
+            f"auth_circuit_breaker_{name}_rejected_total",
+            f"Вызовы, отклонённые выключателем {name}",
+        )
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.retry_after() == 0:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """
+        Время до пробного вызова.
+        Returns:
+            float: Секунды до перехода в half_open (0, если выключатель
+                не разомкнут или время уже прошло).
+        """
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет вызов через выключатель.
+        Args:
+            func (Callable[[], Awaitable[T]]): Вызов зависимости.
+        Returns:
+            T: Результат func.
+        Raises:
+            CircuitOpenError: Если выключатель разомкнут или пробный вызов
+                уже выполняется.
+        """
+        probe = self._acquire()
+        try:
+            result = await func()
+        except Exception as e:
+            if self.is_failure(e):
+                self._on_failure()
+            else:
+                self._on_success()
+            raise
+        except BaseException:
+            # Отменённый пробный вызов ничего не говорит о зависимости,
+            # следующий вызов снова будет пробным.
+            if probe:
+                self._state = OPEN
+            raise
+        finally:
+            if probe:
+                self._probe_in_flight = False
+        self._on_success()
+        return result
+
+    def _acquire(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+            return True
+        self._rejected.inc()
+        raise CircuitOpenError(
+            self.name, self.retry_after() or self.reset_timeout
+        )
+
+    def _on_success(self) -> None:
+        self._state = CLOSED
+        self._consecutive_failures = 0
+
+    def _on_failure(self) -> None:
+        self._consecutive_failures += 1
+        threshold_reached = self._consecutive_failures >= self.failure_threshold
+        tripped = self._state == HALF_OPEN or threshold_reached
+        if tripped:
+            if self._state != OPEN:
+                self._opened.inc()
+            self._state = OPEN
+            self._opened_at = self._clock()
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class InFlightCoalescer:
+    """
+    Объединяет одновременные одинаковые вызовы в одно выполнение.
+    Пока вызов с ключом выполняется, остальные вызовы с тем же ключом
+    ждут его результат. После завершения ключ удаляется, поэтому результат
+    не переживает окно выполнения и не кэшируется.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def run(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет func или присоединяется к уже выполняющемуся вызову.
+        Args:
+            key (str): Ключ вызова.
+            func (Callable[[], Awaitable[T]]): Функция, которую нужно выполнить.
+        Returns:
+            T: Результат выполнения func (общий для всех ожидающих).
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._in_flight[key] = future
+            future.add_done_callback(
+                lambda done: self._forget(key, done)
+            )
+        # shield: отмена одного ожидающего не должна отменять общий вызов
+        return await asyncio.shield(future)
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # помечаем исключение как полученное, даже если ждущих не осталось
+            future.exception()
@@ -1,4 +1,10 @@
-from passlib.context import CryptContext
+import functools
+from typing import TYPE_CHECKING
+
+from utils.tracing import traced
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
 
 class HashService:
@@ -7,9 +13,29 @@ class HashService:
     Использует библиотеку `passlib` и алгоритм bcrypt для безопасного хранения паролей.
     """
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    @staticmethod
+    @functools.cache
+    def pwd_context() -> "CryptContext":
+        """
+        Контекст passlib (создаётся при первом обращении, вместе с ним
+        загружается backend bcrypt).
+        Returns:
+            CryptContext: Контекст хеширования паролей.
+        """
+        from passlib.context import CryptContext
+
+        return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """
+        Загружает backend bcrypt заранее, чтобы первый запрос
+        воркера не тратил на это время.
+        """
+        cls.pwd_context().hash("warm-up")
 
     @classmethod
+    @traced("HashService.create_hash_password")
     def create_hash_password(cls, password: str) -> str:
         """
         Создает хеш для переданного пароля.
@@ -19,9 +45,10 @@ class HashService:
         Returns:
             str: Хэш пароля.
         """
-        return cls.pwd_context.hash(password)
+        return cls.pwd_context().hash(password)
 
     @classmethod
+    @traced("HashService.verify_password")
     def verify_password(
         cls, plain_password: str, hashed_password: str
     ) -> bool:
@@ -33,4 +60,4 @@ class HashService:
         Returns:
             bool: True, если пароль корректный, иначе False.
         """
-        return cls.pwd_context.verify(plain_password, hashed_password)
+        return cls.pwd_context().verify(plain_password, hashed_password)
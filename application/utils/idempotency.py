@@ -0,0 +1,403 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import metrics
+
+IDEMPOTENCY_KEY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+
+class StoredResponse:
+    """
+    Сохранённый ответ на запрос с ключом идемпотентности.
+    """
+
+    def __init__(
+        self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes
+    ):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class IdempotencyRecord:
+    """
+    Запись о запросе с ключом идемпотентности: отпечаток тела запроса
+    и ответ (None, пока первый запрос ещё выполняется).
+    """
+
+    def __init__(
+        self, fingerprint: str, response: Optional[StoredResponse] = None
+    ):
+        self.fingerprint = fingerprint
+        self.response = response
+
+
+class IdempotencyAbstractStore(ABC):
+    """
+    Абстрактное хранилище ответов по ключам идемпотентности.
+    """
+
+    @abstractmethod
+    async def reserve(
+        self, key: str, fingerprint: str
+    ) -> Optional[IdempotencyRecord]:
+        """
+        Атомарно занимает ключ, если он свободен.
+        Args:
+            key (str): Ключ идемпотентности.
+            fingerprint (str): Отпечаток тела запроса.
+        Returns:
+            Optional[IdempotencyRecord]: None, если ключ занят этим вызовом,
+                иначе существующая запись.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        """
+        Сохраняет ответ на запрос, занявший ключ.
+        Args:
+            key (str): Ключ идемпотентности.
+            response (StoredResponse): Ответ.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """
+        Освобождает ключ без сохранения ответа (запрос можно повторить).
+        Args:
+            key (str): Ключ идемпотентности.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def wait(
+        self, key: str, timeout: float
+    ) -> Optional[IdempotencyRecord]:
+        """
+        Ожидает завершения запроса, занявшего ключ.
+        Args:
+            key (str): Ключ идемпотентности.
+            timeout (float): Максимальное время ожидания (в секундах).
+        Returns:
+            Optional[IdempotencyRecord]: Запись (с ответом или ещё без него,
+                если время ожидания истекло) или None, если ключ освобождён.
+        """
+        raise NotImplementedError
+
+
+class IdempotencyInMemoryStore(IdempotencyAbstractStore):
+    """
+    Хранилище ответов в памяти процесса.
+    Ответ хранится ttl секунд, количество ответов ограничено max_size
+    (вытесняются самые старые). Ключ, занятый выполняющимся запросом,
+    не вытесняется и не истекает до его завершения.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            ttl (float): Время хранения ответа (в секундах).
+            max_size (int): Максимальное количество сохранённых ответов.
+            clock (Callable[[], float]): Источник монотонного времени.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        # Время хранения одинаково, поэтому порядок вставки совпадает
+        # с порядком истечения: старые ответы всегда в начале.
+        self._completed: OrderedDict[
+            str, Tuple[IdempotencyRecord, float]
+        ] = OrderedDict()
+        self._in_progress: Dict[
+            str, Tuple[IdempotencyRecord, asyncio.Event]
+        ] = {}
+        metrics.gauge(
+            "auth_idempotency_store_size",
+            "Количество ответов в хранилище ключей идемпотентности",
+            lambda: len(self._completed),
+        )
+
+    def __len__(self) -> int:
+        return len(self._completed) + len(self._in_progress)
+
+    async def reserve(
+        self, key: str, fingerprint: str
+    ) -> Optional[IdempotencyRecord]:
+        self._evict()
+        if key in self._in_progress:
+            return self._in_progress[key][0]
+        if key in self._completed:
+            return self._completed[key][0]
+        self._in_progress[key] = (
+            IdempotencyRecord(fingerprint),
+            asyncio.Event(),
+        )
+        return None
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        record, done = self._in_progress.pop(key)
+        record.response = response
+        self._completed[key] = (record, self._clock() + self.ttl)
+        self._evict()
+        done.set()
+
+    async def release(self, key: str) -> None:
+        _, done = self._in_progress.pop(key)
+        done.set()
+
+    async def wait(
+        self, key: str, timeout: float
+    ) -> Optional[IdempotencyRecord]:
+        if key in self._in_progress:
+            record, done = self._in_progress[key]
+            try:
+                await asyncio.wait_for(done.wait(), timeout)
+            except asyncio.TimeoutError:
+                return record
+        completed = self._completed.get(key)
+        return completed[0] if completed is not None else None
+
+    def _evict(self) -> None:
+        now = self._clock()
+        while self._completed:
+            key, (_, expires_at) = next(iter(self._completed.items()))
+            if len(self._completed) <= self.max_size and expires_at > now:
+                break
+            del self._completed[key]
+
+
+class IdempotencyMiddleware:
+    """
+    Middleware для повторов запросов с заголовком Idempotency-Key.
+    Для POST-запросов на paths с этим заголовком:
+    - первый запрос выполняется, его ответ сохраняется (кроме ответов 5xx:
+      такой запрос можно повторить, и ответов с Cache-Control: no-store,
+      например с токенами);
+    - повтор с тем же ключом и телом получает сохранённый ответ
+      с заголовком Idempotent-Replayed, обработчик не вызывается;
+    - повтор, пришедший во время выполнения первого запроса, ждёт
+      его ответ;
+    - запрос с тем же ключом, но другим телом отклоняется (422).
+    Ключ действует в пределах пути запроса и клиента: поля identity_field
+    JSON-тела (например, email) или, если его нет, IP-адреса. Тело запроса
+    и клиент хранятся только в виде HMAC-отпечатков с секретом процесса.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyAbstractStore,
+        paths: Iterable[str],
+        wait_timeout: float,
+        secret: Optional[bytes] = None,
+        identity_field: Optional[str] = "email",
+    ):
+        """
+        Args:
+            app (ASGIApp): Приложение.
+            store (IdempotencyAbstractStore): Хранилище ответов.
+            paths (Iterable[str]): Пути, для которых учитывается ключ.
+            wait_timeout (float): Максимальное ожидание ответа на первый
+                запрос (в секундах).
+            secret (Optional[bytes]): Секрет отпечатка тела запроса
+                (общий для процессов, если хранилище общее).
+            identity_field (Optional[str]): Поле JSON-тела, определяющее
+                клиента (None - клиент определяется по IP-адресу).
+        """
+        self.app = app
+        self.store = store
+        self.paths = frozenset(paths)
+        self.wait_timeout = wait_timeout
+        self.secret = secret if secret is not None else secrets.token_bytes(32)
+        self.identity_field = identity_field
+        self._replayed = metrics.counter(
+            "auth_idempotency_replays_total",
+            "Ответы, возвращённые повторно по ключу идемпотентности",
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        idempotency_key = self._idempotency_key(scope)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._error(
+                scope,
+                receive,
+                send,
+                status.HTTP_400_BAD_REQUEST,
+                "Некорректный заголовок Idempotency-Key",
+            )
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            # Клиент отключился, не отправив тело запроса.
+            return
+        client = self._fingerprint(self._client_identity(scope, body))
+        key = f"{scope['path']}:{client}:{idempotency_key}"
+        fingerprint = self._fingerprint(body)
+
+        while True:
+            record = await self.store.reserve(key, fingerprint)
+            if record is None:
+                break
+            if record.fingerprint != fingerprint:
+                await self._error(
+                    scope,
+                    receive,
+                    send,
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    "Idempotency-Key уже использован с другим телом запроса",
+                )
+                return
+            if record.response is None:
+                record = await self.store.wait(key, self.wait_timeout)
+                if record is None:
+                    # Первый запрос завершился ошибкой, пробуем занять ключ.
+                    continue
+            if record.response is None:
+                await self._error(
+                    scope,
+                    receive,
+                    send,
+                    status.HTTP_409_CONFLICT,
+                    "Запрос с этим Idempotency-Key ещё выполняется",
+                )
+                return
+            self._replayed.inc()
+            await self._replay(record.response, send)
+            return
+
+        await self._execute(scope, receive, send, key, body)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        key: str,
+        body: bytes,
+    ) -> None:
+        response_start: Optional[Message] = None
+        chunks: List[bytes] = []
+        body_sent = False
+
+        async def replay_body() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body}
+            return await receive()
+
+        async def capture(message: Message) -> None:
+            nonlocal response_start
+            if message["type"] == "http.response.start":
+                response_start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, replay_body, capture)
+            if response_start is not None and self._storable(response_start):
+                await self.store.complete(
+                    key,
+                    StoredResponse(
+                        response_start["status"],
+                        list(response_start.get("headers", [])),
+                        b"".join(chunks),
+                    ),
+                )
+                completed = True
+        finally:
+            if not completed:
+                await self.store.release(key)
+
+    async def _replay(self, response: StoredResponse, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status,
+                "headers": [
+                    *response.headers,
+                    (b"idempotent-replayed", b"true"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": response.body})
+
+    def _fingerprint(self, data: bytes) -> str:
+        return hmac.new(self.secret, data, hashlib.sha256).hexdigest()
+
+    def _client_identity(self, scope: Scope, body: bytes) -> bytes:
+        if self.identity_field is not None:
+            try:
+                identity = json.loads(body).get(self.identity_field)
+            except (ValueError, AttributeError):
+                identity = None
+            if isinstance(identity, str):
+                return b"field:" + identity.strip().lower().encode()
+        client = scope.get("client")
+        return b"ip:" + (client[0] if client else "").encode()
+
+    @staticmethod
+    def _storable(response_start: Message) -> bool:
+        if response_start["status"] >= 500:
+            return False
+        for name, value in response_start.get("headers", []):
+            if name.lower() == b"cache-control" and b"no-store" in value:
+                return False
+        return True
+
+    def _idempotency_key(self, scope: Scope) -> Optional[str]:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return None
+        if scope["path"] not in self.paths:
+            return None
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_KEY_HEADER:
+                return value.decode("latin-1")
+        return None
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> Optional[bytes]:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _error(
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        status_code: int,
+        detail: str,
+    ) -> None:
+        response = JSONResponse({"detail": detail}, status_code=status_code)
+        await response(scope, receive, send)
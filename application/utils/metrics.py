@@ -0,0 +1,114 @@
+from typing import Callable, Dict, List, Optional
+
+
+class Counter:
+    """
+    Монотонно возрастающий счётчик.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def inc(self, amount: float = 1) -> None:
+        self._value += amount
+
+
+class Gauge:
+    """
+    Текущее значение величины.
+    Значение задаётся явно через set() или вычисляется функцией при экспорте.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        func: Optional[Callable[[], float]] = None,
+    ):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._func = func
+
+    @property
+    def value(self) -> float:
+        if self._func is not None:
+            return self._func()
+        return self._value
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._value -= amount
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик процесса с экспортом в текстовом формате Prometheus.
+    Метрики хранятся отдельно в каждом воркере gunicorn.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Counter | Gauge] = {}
+
+    def counter(self, name: str, description: str) -> Counter:
+        """
+        Возвращает счётчик, создавая его при первом обращении.
+        Args:
+            name (str): Имя метрики.
+            description (str): Описание метрики.
+        Returns:
+            Counter: Счётчик.
+        """
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, description)
+        return self._metrics[name]
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        func: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        """
+        Возвращает gauge-метрику, создавая её при первом обращении.
+        Args:
+            name (str): Имя метрики.
+            description (str): Описание метрики.
+            func (Optional[Callable[[], float]]): Функция для вычисления значения.
+        Returns:
+            Gauge: Метрика.
+        """
+        if name not in self._metrics:
+            self._metrics[name] = Gauge(name, description, func)
+        return self._metrics[name]
+
+    def render(self) -> str:
+        """
+        Формирует текстовое представление всех метрик.
+        Returns:
+            str: Метрики в формате Prometheus.
+        """
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.append(f"{metric.name} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
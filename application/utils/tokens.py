@@ -1,8 +1,117 @@
+import functools
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
-from typing import Tuple, Optional, Dict, Any
+from typing import TYPE_CHECKING, Tuple, Optional, Dict, Any
 
-from jose import JWTError, jwt
-from settings import settings
+from settings import get_settings
+from utils.metrics import metrics
+from utils.tracing import traced
+
+# jose вместе с backend cryptography загружается при первой подписи
+# или проверке токена, а не при импорте модуля.
+if TYPE_CHECKING:
+    from jose.backends.base import Key
+
+
+class AccessTokenCache:
+    """
+    Кэш выпущенных access токенов по id пользователя.
+    Позволяет вернуть недавно подписанный токен вместо подписи нового,
+    пока до истечения его срока действия остаётся больше порога.
+    Размер кэша ограничен, устаревшие записи вытесняются.
+    """
+
+    def __init__(self, max_size: int, min_remaining_seconds: int):
+        """
+        Args:
+            max_size (int): Максимальное количество записей.
+            min_remaining_seconds (int): Минимальное оставшееся время жизни
+                токена (в секундах), при котором его можно вернуть повторно.
+        """
+        self.max_size = max_size
+        self.min_remaining = timedelta(seconds=min_remaining_seconds)
+        # Все access токены живут одинаково, поэтому порядок вставки
+        # совпадает с порядком истечения: старые записи всегда в начале.
+        self._tokens: OrderedDict[Any, Tuple[str, datetime]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = metrics.counter(
+            "auth_access_token_cache_hits_total",
+            "Access токены, возвращённые из кэша",
+        )
+        self.misses = metrics.counter(
+            "auth_access_token_cache_misses_total",
+            "Access токены, подписанные из-за промаха кэша",
+        )
+        metrics.gauge(
+            "auth_access_token_cache_size",
+            "Количество записей в кэше access токенов",
+            lambda: len(self._tokens),
+        )
+        metrics.gauge(
+            "auth_access_token_cache_hit_ratio",
+            "Доля обращений к кэшу access токенов, завершившихся попаданием",
+            self.hit_ratio,
+        )
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def hit_ratio(self) -> float:
+        total = self.hits.value + self.misses.value
+        return self.hits.value / total if total else 0.0
+
+    def get(self, user_id: Any) -> Optional[Tuple[str, datetime]]:
+        """
+        Возвращает ещё свежий access токен пользователя.
+        Args:
+            user_id (Any): Идентификатор пользователя.
+        Returns:
+            Optional[Tuple[str, datetime]]: Токен и время его истечения
+                или None, если подходящего токена нет.
+        """
+        with self._lock:
+            cached = self._tokens.get(user_id)
+            if cached is not None and not self._is_fresh(cached[1]):
+                del self._tokens[user_id]
+                cached = None
+        if cached is None:
+            self.misses.inc()
+        else:
+            self.hits.inc()
+        return cached
+
+    def set(self, user_id: Any, token: str, expire: datetime) -> None:
+        """
+        Сохраняет access токен пользователя.
+        Args:
+            user_id (Any): Идентификатор пользователя.
+            token (str): Access токен.
+            expire (datetime): Время истечения токена.
+        """
+        with self._lock:
+            self._tokens.pop(user_id, None)
+            self._tokens[user_id] = (token, expire)
+            self._evict()
+
+    def invalidate(self, user_id: Any) -> None:
+        """
+        Удаляет токен пользователя из кэша (например, при выходе).
+        Args:
+            user_id (Any): Идентификатор пользователя.
+        """
+        with self._lock:
+            self._tokens.pop(user_id, None)
+
+    def _is_fresh(self, expire: datetime) -> bool:
+        return expire - datetime.now(timezone.utc) > self.min_remaining
+
+    def _evict(self) -> None:
+        while self._tokens:
+            user_id, (_, expire) = next(iter(self._tokens.items()))
+            if len(self._tokens) <= self.max_size and self._is_fresh(expire):
+                break
+            del self._tokens[user_id]
 
 
 class JWTTokenService:
@@ -10,6 +119,57 @@ class JWTTokenService:
     Сервис для генерации и валидации JWT токенов.
     """
 
+    @staticmethod
+    @functools.cache
+    def access_token_cache() -> Optional[AccessTokenCache]:
+        """
+        Кэш access токенов (создаётся при первом обращении).
+        Returns:
+            Optional[AccessTokenCache]: Кэш или None, если он выключен.
+        """
+        settings = get_settings()
+        if not settings.ACCESS_TOKEN_CACHE_ENABLED:
+            return None
+        return AccessTokenCache(
+            settings.ACCESS_TOKEN_CACHE_MAX_SIZE,
+            settings.ACCESS_TOKEN_CACHE_MIN_REMAINING_SECONDS,
+        )
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """
+        Заранее читает и разбирает ключи, чтобы первый запрос
+        воркера не тратил на это время.
+        """
+        cls._signing_key()
+        cls._verification_key()
+
+    @staticmethod
+    @functools.cache
+    def _signing_key() -> "Key":
+        """
+        Приватный ключ для подписи токенов (разбирается один раз).
+        Returns:
+            Key: Ключ.
+        """
+        from jose import jwk
+
+        settings = get_settings()
+        return jwk.construct(settings.PRIVATE_KEY, settings.JWT_ALGORITHM)
+
+    @staticmethod
+    @functools.cache
+    def _verification_key() -> "Key":
+        """
+        Публичный ключ для проверки токенов (разбирается один раз).
+        Returns:
+            Key: Ключ.
+        """
+        from jose import jwk
+
+        settings = get_settings()
+        return jwk.construct(settings.PUBLIC_KEY, settings.JWT_ALGORITHM)
+
     @classmethod
     def create_access_and_refresh_tokens(cls, data: dict) -> Tuple[str, str]:
         """
@@ -19,20 +179,65 @@ class JWTTokenService:
         Returns:
             Tuple[str, str]: Кортеж, который содержит access_token и refresh_token.
         """
-        access_token = cls._create_jwt_token(
-            data,
-            "access",
-            settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+        access_token, _, refresh_token = cls.create_tokens(data)
+        return access_token, refresh_token
+
+    @classmethod
+    @traced("JWTTokenService.create_tokens")
+    def create_tokens(
+        cls, data: dict, reuse_access_token: bool = False
+    ) -> Tuple[str, datetime, str]:
+        """
+        Создаёт пару токенов: access и refresh.
+        Если включён кэш access токенов и reuse_access_token=True,
+        вместо подписи нового access токена возвращается ещё свежий
+        токен, выпущенный этому пользователю ранее.
+        Args:
+            data (dict): Данные, которые будут добавлены в payload токена.
+            reuse_access_token (bool): Разрешить повторное использование
+                access токена из кэша.
+        Returns:
+            Tuple[str, datetime, str]: access_token, время его истечения
+                и refresh_token.
+        """
+        settings = get_settings()
+        cache = cls.access_token_cache() if set(data) == {"id"} else None
+        cached = (
+            cache.get(data["id"])
+            if cache is not None and reuse_access_token
+            else None
         )
+        if cached is not None:
+            access_token, access_token_expire = cached
+        else:
+            access_token_expire = cls._get_expire(
+                "access", settings.ACCESS_TOKEN_EXPIRE_MINUTES
+            )
+            access_token = cls._encode_jwt_token(
+                data, "access", access_token_expire
+            )
+            if cache is not None:
+                cache.set(data["id"], access_token, access_token_expire)
         refresh_token = cls._create_jwt_token(
             data,
             "refresh",
             settings.REFRESH_TOKEN_EXPIRE_DAYS,
         )
-        return access_token, refresh_token
+        return access_token, access_token_expire, refresh_token
 
-    @staticmethod
-    def _create_jwt_token(data: dict, type: str, token_expire: int) -> str:
+    @classmethod
+    def invalidate_access_token(cls, user_id: Any) -> None:
+        """
+        Удаляет access токен пользователя из кэша.
+        Args:
+            user_id (Any): Идентификатор пользователя.
+        """
+        cache = cls.access_token_cache()
+        if cache is not None:
+            cache.invalidate(user_id)
+
+    @classmethod
+    def _create_jwt_token(cls, data: dict, type: str, token_expire: int) -> str:
         """
         Создаёт JWT токен определённого типа.
         Args:
@@ -42,27 +247,51 @@ class JWTTokenService:
         Returns:
             str: Сгенерированный JWT токен.
         """
+        return cls._encode_jwt_token(
+            data, type, cls._get_expire(type, token_expire)
+        )
+
+    @staticmethod
+    def _get_expire(type: str, token_expire: int) -> datetime:
+        """
+        Вычисляет время истечения токена определённого типа.
+        Args:
+            type (str): Тип токена.
+            token_expire (int): Время жизни токена.
+        Returns:
+            datetime: Время истечения токена.
+        """
         if type == "access":
-            expire = datetime.now(timezone.utc) + timedelta(
-                minutes=token_expire
-            )
+            return datetime.now(timezone.utc) + timedelta(minutes=token_expire)
         elif type == "refresh":
-            expire = datetime.now(timezone.utc) + timedelta(days=token_expire)
-        else:
-            raise ValueError(
-                "Неверный тип токена. Ожидается 'access' или 'refresh'."
-            )
+            return datetime.now(timezone.utc) + timedelta(days=token_expire)
+        raise ValueError("Неверный тип токена. Ожидается 'access' или 'refresh'.")
+
+    @classmethod
+    @traced("JWTTokenService.encode_jwt_token")
+    def _encode_jwt_token(cls, data: dict, type: str, expire: datetime) -> str:
+        """
+        Подписывает JWT токен.
+        Args:
+            data (dict): Данные для payload.
+            type (str): Тип токена.
+            expire (datetime): Время истечения токена.
+        Returns:
+            str: Сгенерированный JWT токен.
+        """
+        from jose import jwt
 
         payload = data.copy()
         payload.update({"exp": expire, "type": type})
 
         token = jwt.encode(
-            payload, settings.PRIVATE_KEY, algorithm=settings.JWT_ALGORITHM
+            payload, cls._signing_key(), algorithm=get_settings().JWT_ALGORITHM
         )
         return token
 
-    @staticmethod
-    def decode_jwt_token(token: str) -> Optional[Dict[str, Any]]:
+    @classmethod
+    @traced("JWTTokenService.decode_jwt_token")
+    def decode_jwt_token(cls, token: str) -> Optional[Dict[str, Any]]:
         """
         Декодирует и проверяет JWT токен.
         Args:
@@ -72,11 +301,13 @@ class JWTTokenService:
                 - словарь с расшифрованными данными, если токен валиден;
                 - None, если токен невалидный или не соответствует схеме.
         """
+        from jose import JWTError, jwt
+
         try:
             decode_token = jwt.decode(
                 token,
-                settings.PUBLIC_KEY,
-                algorithms=[settings.JWT_ALGORITHM],
+                cls._verification_key(),
+                algorithms=[get_settings().JWT_ALGORITHM],
             )
         except (JWTError, AttributeError):
             return None
@@ -0,0 +1,185 @@
+"""
+Трассировка OpenTelemetry.
+
+Трассировка включается настройкой TRACING_ENABLED. Пока она выключена,
+opentelemetry не импортируется, а декоратор traced лишь вызывает функцию.
+"""
+
+import functools
+import inspect
+from typing import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from settings import get_settings
+
+_tracer = None
+_provider = None
+_exporter_file = None
+
+
+def setup_tracing() -> None:
+    """
+    Настраивает провайдер трассировки: семплирование, пакетный экспорт
+    в фоновом потоке и спаны SQL-запросов всех движков SQLAlchemy
+    (в том числе созданных позже).
+    """
+    global _tracer, _provider
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    settings = get_settings()
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(_create_exporter()))
+    trace.set_tracer_provider(_provider)
+    _tracer = _provider.get_tracer("auth_service")
+    _instrument_engines()
+
+
+def shutdown_tracing() -> None:
+    """
+    Отправляет накопленные спаны, останавливает экспорт и закрывает
+    файл экспорта (TRACING_EXPORTER=file).
+    """
+    global _tracer, _provider, _exporter_file
+    if _provider is not None:
+        _provider.shutdown()
+    if _exporter_file is not None:
+        _exporter_file.close()
+    _tracer = _provider = _exporter_file = None
+
+
+def traced(name: str) -> Callable:
+    """
+    Декоратор, оборачивающий вызов функции в спан.
+    Поддерживает синхронные и асинхронные функции.
+    Args:
+        name (str): Имя спана.
+    Returns:
+        Callable: Декоратор.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with _tracer.start_as_current_span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.start_as_current_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingMiddleware:
+    """
+    Middleware, создающий серверный спан на каждый HTTP запрос.
+    Контекст трассировки берётся из заголовков W3C (traceparent, tracestate),
+    поэтому спаны сервиса продолжают трассу вызывающей стороны.
+    """
+
+    def __init__(self, app: ASGIApp):
+        from opentelemetry.trace import SpanKind
+        from opentelemetry.trace.propagation.tracecontext import (
+            TraceContextTextMapPropagator,
+        )
+
+        self.app = app
+        self.span_kind = SpanKind.SERVER
+        self.propagator = TraceContextTextMapPropagator()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope["headers"]
+        }
+        context = self.propagator.extract(headers)
+        with _tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=context,
+            kind=self.span_kind,
+            attributes={
+                "http.request.method": scope["method"],
+                "url.path": scope["path"],
+            },
+        ) as span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute(
+                        "http.response.status_code", message["status"]
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+def _create_exporter():
+    global _exporter_file
+    settings = get_settings()
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if settings.TRACING_EXPORTER == "file":
+        _exporter_file = open(settings.TRACING_FILE_PATH, "a", encoding="utf-8")
+        return ConsoleSpanExporter(
+            out=_exporter_file,
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    return ConsoleSpanExporter()
+
+
+def _instrument_engines() -> None:
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context._otel_span = _tracer.start_span(
+            statement.split(None, 1)[0] if statement else "db.query",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": "postgresql", "db.statement": statement},
+        )
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        span = getattr(context, "_otel_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(Engine, "handle_error")
+    def handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_otel_span", None)
+        if span is not None:
+            span.set_status(Status(StatusCode.ERROR))
+            span.record_exception(exception_context.original_exception)
+            span.end()
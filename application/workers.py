@@ -0,0 +1,16 @@
+import os
+from pathlib import Path
+
+from uvicorn.workers import UvicornWorker
+
+
+class BackendUvicornWorker(UvicornWorker):
+    """
+    Воркер с настроенным логгированием
+    """
+
+    CONFIG_KWARGS = {
+        "log_config": (
+            f"{str(Path(__file__).resolve().parent.parent) + os.sep}logging.yaml"
+        ),
+    }
@@ -0,0 +1,6 @@
+import os
+import sys
+from pathlib import Path
+
+# Бенчмарки используют те же пути импорта, что и приложение.
+sys.path.insert(0, f"{str(Path(__file__).resolve().parent.parent) + os.sep}application")
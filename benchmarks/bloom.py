@@ -0,0 +1,64 @@
+"""
+Бенчмарк фильтра Блума утёкших паролей: скорость проверки
+и доля ложноположительных срабатываний.
+
+Запуск из корня проекта:
+    python -m benchmarks.bloom --expected 1000000
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from utils.bloom import BloomFilter
+
+
+def digests(prefix: str, number: int):
+    for i in range(number):
+        yield hashlib.sha1(f"{prefix}{i}".encode()).digest()
+
+
+def main(expected: int, fp_rate: float, lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "passwords.bloom")
+
+        start = time.perf_counter()
+        BloomFilter.build(path, digests("member", expected), expected, fp_rate)
+        build_time = time.perf_counter() - start
+        bloom = BloomFilter.open(path)
+        print(
+            f"build: {expected} items in {build_time:.2f} s, "
+            f"{os.path.getsize(path) / 2**20:.1f} MiB, "
+            f"{bloom.num_hashes} hashes"
+        )
+
+        members = list(digests("member", min(lookups, expected)))
+        start = time.perf_counter()
+        assert all(digest in bloom for digest in members)
+        elapsed = time.perf_counter() - start
+        print(
+            f"members: {elapsed / len(members) * 1e6:.2f} us/lookup, "
+            f"{len(members) / elapsed:.0f} lookups/s"
+        )
+
+        others = list(digests("other", lookups))
+        start = time.perf_counter()
+        false_positives = sum(digest in bloom for digest in others)
+        elapsed = time.perf_counter() - start
+        print(
+            f"non-members: {elapsed / lookups * 1e6:.2f} us/lookup, "
+            f"false positive rate {false_positives / lookups:.5f} "
+            f"(target {fp_rate})"
+        )
+        bloom.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--expected", type=int, default=1_000_000)
+    parser.add_argument("--fp-rate", type=float, default=0.001)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+    main(args.expected, args.fp_rate, args.lookups)
@@ -0,0 +1,249 @@
+"""
+Бенчмарк внутреннего RPC (msgpack) против HTTP-эндпоинтов на одной машине.
+
+Сервис запускается в отдельном процессе (HTTP через uvicorn и RPC через
+TCP и Unix socket в одном event loop), клиент измеряет из текущего
+процесса:
+- публичный ключ: GET /api/v1/jwt.key и keys.public;
+- обновление токенов: GET /api/v1/refresh_token/ и последовательность
+  tokens.decode, users.get, tokens.create;
+- проверку токенов: tokens.decode по одному и пакетами.
+HTTP-клиент держит пул keep-alive соединений, RPC-клиент - одно
+соединение с pipelining.
+
+Запуск из корня проекта (USERS_REPOSITORY=memory - без PostgreSQL):
+    python -m benchmarks.rpc --requests 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, List
+
+BENCH_PASSWORD = "benchmark-password"
+BENCH_SECRET = "benchmark-secret"
+
+
+async def measure(
+    name: str,
+    func: Callable[[], Awaitable[object]],
+    requests: int,
+    concurrency: int,
+    per_request: int = 1,
+) -> None:
+    latencies: List[float] = []
+    remaining = [requests]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            await func()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"{name:<36} {requests * per_request / elapsed:>9.0f} ops/s  "
+        f"p50 {latencies[len(latencies) // 2] * 1e3:>8.3f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:>8.3f} ms"
+    )
+
+
+async def serve(http_port: int, rpc_port: int, socket_path: str) -> None:
+    import uvicorn
+
+    from auth.dependiences import user_service, users_repository
+    from rpc.methods import AuthRPCMethods
+    from rpc.server import RPCServer
+    from utils.hashes import HashService
+
+    http = uvicorn.Server(
+        uvicorn.Config(
+            "main:create_app",
+            factory=True,
+            host="127.0.0.1",
+            port=http_port,
+            log_level="warning",
+        )
+    )
+    http_task = asyncio.create_task(http.serve())
+    while not http.started:
+        if http_task.done():
+            await http_task
+            return
+        await asyncio.sleep(0.05)
+
+    methods = AuthRPCMethods(user_service).registry()
+    tcp, unix = RPCServer(methods, secret=BENCH_SECRET), RPCServer(methods)
+    await tcp.start("127.0.0.1", rpc_port)
+    await unix.start(path=socket_path)
+
+    user = await users_repository().add_one(
+        {
+            "email": f"bench-{uuid.uuid4().hex}@bench.test",
+            "hash_password": HashService.create_hash_password(BENCH_PASSWORD),
+        }
+    )
+    print(f"ready {user.id}", flush=True)
+    await http_task
+    await tcp.stop()
+    await unix.stop()
+
+
+async def run(
+    http_port: int,
+    rpc_port: int,
+    socket_path: str,
+    user_id: int,
+    requests: int,
+    concurrency: int,
+    batch_size: int,
+) -> None:
+    import httpx
+
+    from rpc.client import RPCClient
+    from settings import get_settings
+    from utils.tokens import JWTTokenService
+
+    settings = get_settings()
+    hosts = settings.TEST_ALLOWED_HOSTS if settings.TESTING else settings.ALLOWED_HOSTS
+    host = next((host for host in hosts if "*" not in host), "localhost")
+    _, refresh_token = JWTTokenService.create_access_and_refresh_tokens(
+        {"id": user_id}
+    )
+
+    http = httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{http_port}",
+        headers={"Host": host},
+        limits=httpx.Limits(max_keepalive_connections=concurrency),
+    )
+    tcp = await RPCClient.connect("127.0.0.1", rpc_port, secret=BENCH_SECRET)
+    unix = await RPCClient.connect(path=socket_path)
+    try:
+        async def http_public_key():
+            response = await http.get("/api/v1/jwt.key")
+            response.raise_for_status()
+
+        async def http_refresh():
+            response = await http.get(
+                "/api/v1/refresh_token/",
+                headers={"Cookie": f"resumes_token={refresh_token}"},
+            )
+            response.raise_for_status()
+
+        def rpc_refresh(client: RPCClient):
+            async def refresh():
+                payload = await client.call(
+                    "tokens.decode", {"token": refresh_token}
+                )
+                user = await client.call("users.get", {"id": payload["id"]})
+                await client.call("tokens.create", {"user_id": user["id"]})
+
+            return refresh
+
+        tokens = [
+            JWTTokenService.create_access_and_refresh_tokens({"id": user_id})[0]
+            for _ in range(batch_size)
+        ]
+
+        async def rpc_decode():
+            await unix.call("tokens.decode", {"token": tokens[0]})
+
+        async def rpc_decode_batch():
+            await unix.batch(
+                [("tokens.decode", {"token": token}) for token in tokens]
+            )
+
+        await measure("http: GET /jwt.key", http_public_key, requests, concurrency)
+        await measure(
+            "rpc tcp: keys.public",
+            lambda: tcp.call("keys.public"),
+            requests,
+            concurrency,
+        )
+        await measure(
+            "rpc unix: keys.public",
+            lambda: unix.call("keys.public"),
+            requests,
+            concurrency,
+        )
+        await measure("http: GET /refresh_token/", http_refresh, requests, concurrency)
+        await measure(
+            "rpc tcp: decode + get + create", rpc_refresh(tcp), requests, concurrency
+        )
+        await measure(
+            "rpc unix: decode + get + create",
+            rpc_refresh(unix),
+            requests,
+            concurrency,
+        )
+        await measure("rpc unix: tokens.decode", rpc_decode, requests, concurrency)
+        await measure(
+            f"rpc unix: tokens.decode x{batch_size} batch",
+            rpc_decode_batch,
+            max(1, requests // batch_size),
+            concurrency,
+            per_request=batch_size,
+        )
+    finally:
+        await http.aclose()
+        await tcp.close()
+        await unix.close()
+
+
+def main(args: argparse.Namespace) -> None:
+    socket_path = args.socket or os.path.join(
+        tempfile.mkdtemp(), "auth_rpc.sock"
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.rpc", "--serve",
+            "--http-port", str(args.http_port),
+            "--rpc-port", str(args.rpc_port),
+            "--socket", socket_path,
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        line = server.stdout.readline()
+        if not line.startswith("ready"):
+            raise SystemExit("benchmark server failed to start")
+        asyncio.run(
+            run(
+                args.http_port,
+                args.rpc_port,
+                socket_path,
+                int(line.split()[1]),
+                args.requests,
+                args.concurrency,
+                args.batch_size,
+            )
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--http-port", type=int, default=18000)
+    parser.add_argument("--rpc-port", type=int, default=18001)
+    parser.add_argument("--socket", help="путь к Unix socket RPC")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        asyncio.run(serve(args.http_port, args.rpc_port, args.socket))
+    else:
+        main(args)
@@ -0,0 +1,71 @@
+"""
+Микробенчмарки сервисного слоя без PostgreSQL.
+
+Запуск из корня проекта:
+    python -m benchmarks.services
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from auth.repositories import UsersInMemoryRepository
+from auth.schemes import UserRequestScheme
+from auth.services import UserService
+from utils.hashes import HashService
+from utils.tokens import JWTTokenService
+
+
+async def measure(
+    name: str, func: Callable[[int], Awaitable[object]], number: int
+) -> None:
+    start = time.perf_counter()
+    for i in range(number):
+        await func(i)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<24} {number:>8} ops  "
+        f"{elapsed / number * 1e6:>12.1f} us/op  {number / elapsed:>12.0f} ops/s"
+    )
+
+
+async def main(number: int, hash_number: int) -> None:
+    service = UserService(UsersInMemoryRepository(), HashService)
+    hash_password = HashService.create_hash_password("password")
+
+    ids = []
+
+    async def add_one(i: int):
+        user = await service.repo.add_one(
+            {"email": f"user{i}@test.com", "hash_password": hash_password}
+        )
+        ids.append(user.id)
+
+    async def get_one_by_email(i: int):
+        return await service.get_one_by_email(f"user{i}@test.com")
+
+    async def get_one(i: int):
+        return await service.get_one(ids[i])
+
+    async def authenticate_user(i: int):
+        return await service.authenticate_user(
+            UserRequestScheme(email=f"user{i}@test.com", password="password")
+        )
+
+    async def create_tokens(i: int):
+        return JWTTokenService.create_tokens({"id": ids[i]})
+
+    await measure("repo.add_one", add_one, number)
+    await measure("get_one_by_email", get_one_by_email, number)
+    await measure("get_one", get_one, number)
+    await measure("authenticate_user", authenticate_user, hash_number)
+    await measure("create_tokens", create_tokens, hash_number)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100_000)
+    parser.add_argument("--hash-number", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.number, args.hash_number))
@@ -0,0 +1,90 @@
+"""
+Бенчмарк холодного запуска: время импорта приложения по данным
+`python -X importtime` (каждый замер в отдельном процессе).
+
+Запуск из корня проекта:
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+APPLICATION_DIR = Path(__file__).resolve().parent.parent / "application"
+
+# Пакеты и модули приложения (без внешних зависимостей).
+APPLICATION_MODULES = (
+    "audit",
+    "auth",
+    "database",
+    "events",
+    "main",
+    "monitoring",
+    "rpc",
+    "settings",
+    "utils",
+)
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Импортирует модуль в новом процессе и собирает время импорта.
+    Args:
+        module (str): Импортируемый модуль.
+    Returns:
+        Dict[str, Tuple[int, int]]: Собственное и суммарное время импорта
+            (в микросекундах) каждого загруженного модуля.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APPLICATION_DIR,
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def is_application_module(name: str) -> bool:
+    return name.split(".", 1)[0] in APPLICATION_MODULES
+
+
+def main(module: str, runs: int, top: int) -> None:
+    samples = [import_times(module) for _ in range(runs)]
+    totals = sorted(times[module][1] for times in samples)
+    print(
+        f"import {module}: min {totals[0] / 1000:.1f} ms, "
+        f"median {totals[len(totals) // 2] / 1000:.1f} ms, "
+        f"{len(samples[0])} modules"
+    )
+    best = min(samples, key=lambda times: times[module][1])
+    own = sum(
+        self_us for name, (self_us, _) in best.items() if is_application_module(name)
+    )
+    print(f"application modules (self): {own / 1000:.1f} ms")
+    print(f"top {top} modules by self time:")
+    for name, (self_us, _) in sorted(
+        best.items(), key=lambda item: item[1][0], reverse=True
+    )[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    main(args.module, args.runs, args.top)
@@ -0,0 +1,246 @@
+"""
+Бенчмарк секционированной таблицы users против одной таблицы на PostgreSQL.
+
+Создаёт в схеме bench_users две таблицы с одинаковыми синтетическими
+данными (по умолчанию 10 млн строк): users_single (как до секционирования)
+и users_sharded (LIST по shard, USERS_SHARDS секций, id кодирует секцию),
+затем сравнивает:
+- время построения индексов и VACUUM (всей таблицы и одной секции);
+- размер таблиц и индексов;
+- задержку и пропускную способность поиска по email и по id (в том числе
+  поиска по id без номера секции) и вставки.
+
+Подключение берётся из настроек сервиса (POSTGRES_*). Запуск из корня проекта:
+    python -m benchmarks.users_partitioning --rows 10000000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, List
+
+import asyncpg
+
+from auth.models import USERS_SHARDS
+from auth.repositories import encode_user_id, user_shard
+from settings import get_settings
+
+SCHEMA = "bench_users"
+HASH_PASSWORD = "$2b$12$jY7D8CoOfJSRrrLDx8kXbuyPXvP02g.7SlcNLsST13S238ji.a.gy"
+SHARD_SQL = f"(('x' || substr(md5(email), 1, 8))::bit(32)::bigint % {USERS_SHARDS})"
+
+
+def email(i: int) -> str:
+    return f"user{i}@bench.test"
+
+
+async def timed(name: str, coro: Awaitable) -> float:
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    print(f"{name:<44} {elapsed:>10.2f} s")
+    return elapsed
+
+
+async def create_tables(conn: asyncpg.Connection) -> None:
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(
+        f"CREATE TABLE {SCHEMA}.users_single "
+        "(id bigint NOT NULL, email varchar NOT NULL, hash_password varchar NOT NULL)"
+    )
+    await conn.execute(
+        f"CREATE TABLE {SCHEMA}.users_sharded "
+        "(id bigint NOT NULL, shard smallint NOT NULL, "
+        "email varchar NOT NULL, hash_password varchar NOT NULL) "
+        "PARTITION BY LIST (shard)"
+    )
+    for shard in range(USERS_SHARDS):
+        await conn.execute(
+            f"CREATE TABLE {SCHEMA}.users_sharded_p{shard:02d} "
+            f"PARTITION OF {SCHEMA}.users_sharded FOR VALUES IN ({shard})"
+        )
+
+
+async def load(conn: asyncpg.Connection, rows: int, chunk: int) -> None:
+    # Данные генерируются на сервере, индексы строятся после загрузки.
+    for start in range(1, rows + 1, chunk):
+        stop = min(start + chunk - 1, rows)
+        await conn.execute(
+            f"INSERT INTO {SCHEMA}.users_single "
+            "SELECT i, 'user' || i || '@bench.test', $3 "
+            "FROM generate_series($1::bigint, $2::bigint) i",
+            start, stop, HASH_PASSWORD,
+        )
+        await conn.execute(
+            f"INSERT INTO {SCHEMA}.users_sharded "
+            f"SELECT i * {USERS_SHARDS} + {SHARD_SQL}, {SHARD_SQL}, email, $3 "
+            "FROM (SELECT i, 'user' || i || '@bench.test' AS email "
+            "FROM generate_series($1::bigint, $2::bigint) i) s",
+            start, stop, HASH_PASSWORD,
+        )
+        print(f"loaded {stop}/{rows}", end="\r", flush=True)
+    print()
+
+
+async def print_sizes(conn: asyncpg.Connection) -> None:
+    for table in ("users_single", "users_sharded"):
+        table_size, index_size, biggest = await conn.fetchrow(
+            "SELECT sum(pg_table_size(relid)), sum(pg_indexes_size(relid)), "
+            "max(pg_total_relation_size(relid)) "
+            "FROM pg_partition_tree($1::regclass) WHERE isleaf",
+            f"{SCHEMA}.{table}",
+        )
+        print(
+            f"{table:<14} table {table_size / 2**20:>9.1f} MiB  "
+            f"indexes {index_size / 2**20:>9.1f} MiB  "
+            f"largest relation {biggest / 2**20:>9.1f} MiB"
+        )
+
+
+async def measure(
+    name: str,
+    pool: asyncpg.Pool,
+    func: Callable[[asyncpg.Connection, int], Awaitable],
+    keys: List[int],
+    concurrency: int,
+) -> None:
+    latencies = []
+    queue = list(keys)
+
+    async def worker():
+        async with pool.acquire() as conn:
+            while queue:
+                key = queue.pop()
+                start = time.perf_counter()
+                await func(conn, key)
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"{name:<32} {len(keys) / elapsed:>9.0f} ops/s  "
+        f"p50 {latencies[len(latencies) // 2] * 1e3:>7.3f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:>7.3f} ms"
+    )
+
+
+async def main(rows: int, lookups: int, concurrency: int, keep: bool) -> None:
+    dsn = get_settings().DB_URL.replace("postgresql+asyncpg", "postgresql")
+    conn = await asyncpg.connect(dsn)
+    try:
+        await create_tables(conn)
+        await timed("load", load(conn, rows, 1_000_000))
+        await timed(
+            "single: primary key + unique(email)",
+            conn.execute(
+                f"ALTER TABLE {SCHEMA}.users_single ADD PRIMARY KEY (id), "
+                "ADD UNIQUE (email)"
+            ),
+        )
+        await timed(
+            "sharded: primary key + unique(email, shard)",
+            conn.execute(
+                f"ALTER TABLE {SCHEMA}.users_sharded ADD PRIMARY KEY (id, shard), "
+                "ADD UNIQUE (email, shard)"
+            ),
+        )
+        await timed(
+            "single: vacuum analyze",
+            conn.execute(f"VACUUM ANALYZE {SCHEMA}.users_single"),
+        )
+        await timed(
+            "sharded: vacuum analyze",
+            conn.execute(f"VACUUM ANALYZE {SCHEMA}.users_sharded"),
+        )
+        # Автоочистка обрабатывает секции по отдельности.
+        await timed(
+            "sharded: vacuum of one partition",
+            conn.execute(f"VACUUM {SCHEMA}.users_sharded_p00"),
+        )
+        await print_sizes(conn)
+    finally:
+        await conn.close()
+
+    keys = random.sample(range(1, rows + 1), min(lookups, rows))
+    pool = await asyncpg.create_pool(dsn, min_size=concurrency, max_size=concurrency)
+    try:
+        async def single_by_email(conn, i):
+            await conn.fetchrow(
+                f"SELECT * FROM {SCHEMA}.users_single WHERE email = $1", email(i)
+            )
+
+        async def sharded_by_email(conn, i):
+            await conn.fetchrow(
+                f"SELECT * FROM {SCHEMA}.users_sharded "
+                "WHERE shard = $1 AND email = $2",
+                user_shard(email(i)), email(i),
+            )
+
+        async def single_by_id(conn, i):
+            await conn.fetchrow(
+                f"SELECT * FROM {SCHEMA}.users_single WHERE id = $1", i
+            )
+
+        async def sharded_by_id(conn, i):
+            shard = user_shard(email(i))
+            await conn.fetchrow(
+                f"SELECT * FROM {SCHEMA}.users_sharded WHERE shard = $1 AND id = $2",
+                shard, encode_user_id(i, shard),
+            )
+
+        async def sharded_by_id_unpruned(conn, i):
+            await conn.fetchrow(
+                f"SELECT * FROM {SCHEMA}.users_sharded WHERE id = $1",
+                encode_user_id(i, user_shard(email(i))),
+            )
+
+        async def single_insert(conn, i):
+            await conn.execute(
+                f"INSERT INTO {SCHEMA}.users_single VALUES ($1, $2, $3)",
+                rows + i, email(rows + i), HASH_PASSWORD,
+            )
+
+        async def sharded_insert(conn, i):
+            shard = user_shard(email(rows + i))
+            await conn.execute(
+                f"INSERT INTO {SCHEMA}.users_sharded VALUES ($1, $2, $3, $4)",
+                encode_user_id(rows + i, shard), shard, email(rows + i),
+                HASH_PASSWORD,
+            )
+
+        await measure("single: get by email", pool, single_by_email, keys, concurrency)
+        await measure("sharded: get by email", pool, sharded_by_email, keys, concurrency)
+        await measure("single: get by id", pool, single_by_id, keys, concurrency)
+        await measure("sharded: get by id", pool, sharded_by_id, keys, concurrency)
+        await measure(
+            "sharded: get by id (all shards)",
+            pool, sharded_by_id_unpruned, keys, concurrency,
+        )
+        inserts = list(range(1, len(keys) + 1))
+        await measure("single: insert", pool, single_insert, inserts, concurrency)
+        await measure("sharded: insert", pool, sharded_insert, inserts, concurrency)
+    finally:
+        await pool.close()
+
+    if not keep:
+        conn = await asyncpg.connect(dsn)
+        try:
+            await conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        finally:
+            await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--keep", action="store_true", help="не удалять схему bench_users"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.lookups, args.concurrency, args.keep))
@@ -1,9 +1,14 @@
 import pytest
 import pytest_asyncio
+from sqlalchemy import select
 
-from application.database import async_session, async_engine
-from application.auth.models import User
+from application.database import async_session, get_engine
+from application.auth.models import User, users_id_seq
 from application.utils.tokens import JWTTokenService
+from auth.dependiences import users_repository
+from auth.repositories import UsersInMemoryRepository, encode_user_id, user_shard
+
+IN_MEMORY = isinstance(users_repository(), UsersInMemoryRepository)
 
 
 @pytest_asyncio.fixture(scope="session", autouse=True)
@@ -11,25 +16,41 @@ async def setup_test_db():
     """
     Фикстура для создания таблицы User перед тестами
     и удаления после тестов.
+    При USERS_REPOSITORY=memory база данных не используется,
+    хранилище в памяти очищается после тестов.
     """
-    async with async_engine.begin() as conn:
+    if IN_MEMORY:
+        yield
+        users_repository().clear()
+        return
+
+    async with get_engine().begin() as conn:
         await conn.run_sync(
             lambda sync_conn: User.metadata.create_all(bind=sync_conn)
         )
 
     yield
 
-    async with async_engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(User.metadata.drop_all)
 
 
 @pytest_asyncio.fixture(scope="function")
 async def test_user():
+    data = {
+        "email": "testuser@test.com",
+        "hash_password": "$2b$12$jY7D8CoOfJSRrrLDx8kXbuyPXvP02g.7SlcNLsST13S238ji.a.gy",
+    }
+    if IN_MEMORY:
+        user = await users_repository().add_one(data)
+        yield user
+        users_repository().remove(user.id)
+        return
+
     async with async_session() as session:
-        user = User(
-            email="testuser@test.com",
-            hash_password="$2b$12$jY7D8CoOfJSRrrLDx8kXbuyPXvP02g.7SlcNLsST13S238ji.a.gy",
-        )
+        shard = user_shard(data["email"])
+        sequence_value = await session.scalar(select(users_id_seq.next_value()))
+        user = User(**data, shard=shard, id=encode_user_id(sequence_value, shard))
         session.add(user)
         await session.commit()
         await session.refresh(user)
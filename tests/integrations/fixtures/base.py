@@ -1,7 +1,9 @@
 import pytest_asyncio
 from httpx import AsyncClient
 
-from application.main import app
+from application.main import create_app
+
+app = create_app()
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -11,6 +11,9 @@ from .fixtures.auth import (
 )
 from .fixtures.base import ac
 from application.auth.models import User
+from auth.dependiences import service_users_repository
+from auth.repositories import UsersFaultInjectionRepository, is_database_failure
+from utils.circuit_breaker import CircuitBreaker
 
 
 @pytest.mark.asyncio
@@ -108,3 +111,72 @@ async def test_refresh_token_user_not_found(
     cookies = {"resumes_token": refresh}
     response = await ac.get("/api/v1/refresh_token/", cookies=cookies)
     assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_database_unavailable(
+    ac: AsyncClient,
+    test_user: User,
+    access_and_refresh_tokens_test_user: tuple,
+    monkeypatch,
+):
+    repository = service_users_repository()
+    faults = UsersFaultInjectionRepository(repository.repo, 0, 0)
+    monkeypatch.setattr(repository, "repo", faults)
+    monkeypatch.setattr(
+        repository,
+        "breaker",
+        CircuitBreaker("test_users_db", 1, 60, is_failure=is_database_failure),
+    )
+    _, refresh = access_and_refresh_tokens_test_user
+    cookies = {"resumes_token": refresh}
+    response = await ac.get("/api/v1/refresh_token/", cookies=cookies)
+    assert response.status_code == 200
+
+    faults.error_rate = 1
+    response = await ac.get("/api/v1/refresh_token/", cookies=cookies)
+    assert response.status_code == 200
+    response = await ac.post(
+        "/api/v1/login/",
+        json={"email": test_user.email, "password": "12345678"},
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "60"
+
+
+@pytest.mark.asyncio
+async def test_registration_retry_with_idempotency_key(ac: AsyncClient):
+    data = {"email": "idempotent@test.com", "password": "strong-password-1"}
+    headers = {"Idempotency-Key": "registration-retry"}
+    first = await ac.post("/api/v1/registration/", json=data, headers=headers)
+    retry = await ac.post("/api/v1/registration/", json=data, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_login_response_is_not_replayed(ac: AsyncClient):
+    data = {"email": "idempotent-login@test.com", "password": "strong-password-1"}
+    await ac.post("/api/v1/registration/", json=data)
+    headers = {"Idempotency-Key": "login-retry"}
+    for _ in range(2):
+        response = await ac.post("/api/v1/login/", json=data, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "no-store"
+        assert "Idempotent-Replayed" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_not_stored_for_invalid_host(ac: AsyncClient):
+    data = {"email": "idempotent-host@test.com", "password": "strong-password-1"}
+    headers = {"Idempotency-Key": "registration-invalid-host"}
+    rejected = await ac.post(
+        "/api/v1/registration/",
+        json=data,
+        headers={**headers, "Host": "evil.example"},
+    )
+    assert rejected.status_code == 400
+    retry = await ac.post("/api/v1/registration/", json=data, headers=headers)
+    assert retry.status_code == 201
+    assert "Idempotent-Replayed" not in retry.headers
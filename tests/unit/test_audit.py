@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from audit.repositories import AuditLogInMemoryRepository, partition_day
+from audit.services import AuditLogService
+
+
+class CountingRepository(AuditLogInMemoryRepository):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def add_many(self, events):
+        self.batches.append(len(events))
+        await super().add_many(events)
+
+
+def audit_log_service(repo, **kwargs) -> AuditLogService:
+    params = dict(
+        batch_size=3,
+        flush_interval=0.05,
+        max_buffer_size=100,
+        retention_days=90,
+        partitions_ahead_days=1,
+        maintenance_interval=3600,
+        max_retry_interval=0.05,
+    )
+    params.update(kwargs)
+    return AuditLogService(repo, **params)
+
+
+@pytest.mark.asyncio
+async def test_audit_log_writes_batches_and_flushes_on_stop():
+    repo = CountingRepository()
+    audit_log = audit_log_service(repo)
+    await audit_log.start()
+    for i in range(7):
+        await audit_log.record("login", True, user_id=i, ip="127.0.0.1")
+    await asyncio.sleep(0.2)
+    await audit_log.record("refresh", False, ip="127.0.0.1")
+    await audit_log.stop()
+    assert sum(repo.batches) == 8
+    assert max(repo.batches) <= 3
+    assert repo.events[-1]["event_type"] == "refresh"
+
+
+class BlockedRepository(AuditLogInMemoryRepository):
+    def __init__(self):
+        super().__init__()
+        self.released = asyncio.Event()
+
+    async def add_many(self, events):
+        await self.released.wait()
+        await super().add_many(events)
+
+
+@pytest.mark.asyncio
+async def test_audit_log_applies_backpressure_when_full():
+    repo = BlockedRepository()
+    audit_log = audit_log_service(repo, batch_size=1, max_buffer_size=1)
+    await audit_log.start()
+    await audit_log.record("login", True)
+    await asyncio.sleep(0.01)
+    await audit_log.record("login", True)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(audit_log.record("login", True), 0.05)
+    repo.released.set()
+    await audit_log.stop()
+    assert len(repo.events) == 2
+
+
+class FlakyRepository(BlockedRepository):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.released.set()
+
+    async def add_many(self, events):
+        await self.released.wait()
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        await AuditLogInMemoryRepository.add_many(self, events)
+
+
+@pytest.mark.asyncio
+async def test_audit_log_retries_failed_batches():
+    repo = FlakyRepository(failures=3)
+    audit_log = audit_log_service(repo, flush_interval=0.01)
+    failed = audit_log._failed.value
+    await audit_log.start()
+    for i in range(5):
+        await audit_log.record("login", True, user_id=i)
+    await asyncio.sleep(0.3)
+    await audit_log.stop()
+    assert sorted(event["user_id"] for event in repo.events) == list(range(5))
+    assert audit_log._failed.value == failed
+
+
+@pytest.mark.asyncio
+async def test_audit_log_drops_only_what_does_not_fit():
+    repo = FlakyRepository(failures=1)
+    repo.released.clear()
+    audit_log = audit_log_service(repo, batch_size=2, max_buffer_size=2)
+    failed = audit_log._failed.value
+    await audit_log.start()
+    await audit_log.record("login", True, user_id=0)
+    await audit_log.record("login", True, user_id=1)
+    await asyncio.sleep(0.01)
+    # Пока пачка записывается, буфер заполняется новыми событиями.
+    await audit_log.record("login", True, user_id=2)
+    await audit_log.record("login", True, user_id=3)
+    repo.released.set()
+    await asyncio.sleep(0.3)
+    await audit_log.stop()
+    assert audit_log._failed.value - failed == 2
+    assert sorted(event["user_id"] for event in repo.events) == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_audit_log_disabled_until_started():
+    repo = CountingRepository()
+    audit_log = audit_log_service(repo)
+    await audit_log.record("login", True)
+    await audit_log.stop()
+    assert repo.events == []
+
+
+@pytest.mark.asyncio
+async def test_in_memory_retention():
+    repo = AuditLogInMemoryRepository()
+    now = datetime.now(timezone.utc)
+    await repo.add_many(
+        [{"created_at": now - timedelta(days=100)}, {"created_at": now}]
+    )
+    await repo.maintain_partitions(1, 90)
+    assert repo.events == [{"created_at": now}]
+
+
+def test_partition_day():
+    assert partition_day("auth_audit_log_p20261019") == datetime(2026, 10, 19).date()
+    assert partition_day("auth_audit_log_default") is None
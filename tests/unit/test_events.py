@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from auth.repositories import UsersInMemoryRepository
+from events.dispatcher import OutboxDispatcher
+from events.repositories import OutboxInMemoryRepository
+from events.sinks import EventSink, QueueEventSink
+
+
+class FailingSink(EventSink):
+    async def send(self, events):
+        raise ConnectionError("sink is down")
+
+
+@pytest.mark.asyncio
+async def test_registration_event_is_dispatched_in_batches():
+    outbox = OutboxInMemoryRepository()
+    users = UsersInMemoryRepository(outbox)
+    ids = [
+        (
+            await users.add_one(
+                {"email": f"user{i}@test.com", "hash_password": "hash"}
+            )
+        ).id
+        for i in range(5)
+    ]
+
+    queue = asyncio.Queue()
+    dispatcher = OutboxDispatcher(outbox, QueueEventSink(queue), 2, 0.01)
+    assert await dispatcher.dispatch() == 5
+    events = [queue.get_nowait() for _ in range(5)]
+    assert [event["type"] for event in events] == ["user.registered"] * 5
+    assert events[0]["payload"] == {"id": ids[0], "email": "user0@test.com"}
+    assert outbox.events == []
+
+
+@pytest.mark.asyncio
+async def test_failed_dispatch_keeps_events():
+    outbox = OutboxInMemoryRepository()
+    await outbox.add_one("user.logged_in", {"id": 1})
+    dispatcher = OutboxDispatcher(outbox, FailingSink(), 10, 0.01)
+    with pytest.raises(ConnectionError):
+        await dispatcher.dispatch()
+    assert len(outbox.events) == 1
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from auth.repositories import UsersInMemoryRepository
+from monitoring.dependiences import worker_health
+from monitoring.health import WorkerHealth, warm_up_worker
+from monitoring.routers import router
+from settings import get_settings
+
+
+@pytest.fixture()
+def health_app():
+    app = FastAPI()
+    app.include_router(router)
+    yield app
+    worker_health().ready = False
+
+
+async def test_warm_up_worker_without_database():
+    await warm_up_worker(None, UsersInMemoryRepository())
+
+
+async def test_worker_ready_after_warm_up():
+    health = WorkerHealth(timeout=1, retry_interval=0.01)
+    calls = []
+
+    async def warm_up():
+        calls.append(1)
+
+    await health.start(warm_up)
+    assert health.ready
+    assert len(calls) == 1
+
+    await health.stop()
+    assert not health.ready
+
+
+async def test_failed_warm_up_is_retried():
+    health = WorkerHealth(timeout=1, retry_interval=0.01)
+    attempts = []
+
+    async def warm_up():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("database is unavailable")
+
+    await health.start(warm_up)
+    assert not health.ready
+
+    for _ in range(100):
+        if health.ready:
+            break
+        await asyncio.sleep(0.01)
+    assert health.ready
+    assert len(attempts) == 3
+    await health.stop()
+
+
+async def test_hanging_warm_up_times_out():
+    health = WorkerHealth(timeout=0.01, retry_interval=60)
+
+    async def warm_up():
+        await asyncio.sleep(60)
+
+    await health.start(warm_up)
+    assert not health.ready
+    await health.stop()
+
+
+async def test_health_endpoints(health_app):
+    async with AsyncClient(app=health_app, base_url="http://test") as client:
+        assert (await client.get("/health/live")).status_code == 200
+        assert (await client.get("/health/ready")).status_code == 503
+
+        worker_health().ready = True
+        response = await client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
+
+
+async def test_metrics_require_token(health_app, monkeypatch):
+    async with AsyncClient(app=health_app, base_url="http://test") as client:
+        assert (await client.get("/metrics")).status_code == 404
+        monkeypatch.setattr(get_settings(), "METRICS_TOKEN", "secret")
+        assert (await client.get("/metrics")).status_code == 401
+        wrong = {"Authorization": "Bearer wrong"}
+        assert (await client.get("/metrics", headers=wrong)).status_code == 401
+        valid = {"Authorization": "Bearer secret"}
+        response = await client.get("/metrics", headers=valid)
+        assert response.status_code == 200
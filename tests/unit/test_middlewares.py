@@ -0,0 +1,252 @@
+import asyncio
+import time
+import tracemalloc
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient
+
+from monitoring.load_shedding import EventLoopLagMonitor, LoadSheddingMiddleware
+from monitoring.profiling import (
+    ProfileStore,
+    RequestProfilingMiddleware,
+    memory_growth,
+    sign_profile_request,
+)
+from utils.idempotency import (
+    IdempotencyInMemoryStore,
+    IdempotencyMiddleware,
+    StoredResponse,
+)
+
+
+@pytest.fixture()
+def lag_monitor():
+    return EventLoopLagMonitor(0.05)
+
+
+@pytest.fixture()
+def shedding_app(lag_monitor):
+    app = FastAPI()
+
+    @app.post("/login/")
+    async def login():
+        return {}
+
+    @app.get("/refresh_token/")
+    async def refresh_token():
+        return {}
+
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        monitor=lag_monitor,
+        expensive_paths=("/login/",),
+        lag_threshold=0.2,
+        max_in_flight=10,
+        retry_after=3,
+    )
+    return app
+
+
+@pytest.mark.asyncio
+async def test_load_shedding_rejects_only_expensive_requests(
+    shedding_app, lag_monitor
+):
+    async with AsyncClient(app=shedding_app, base_url="http://test") as client:
+        assert (await client.post("/login/")).status_code == 200
+
+        lag_monitor.lag = 0.5
+        response = await client.post("/login/")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        assert (await client.get("/refresh_token/")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_monitor_measures_blocking(lag_monitor):
+    await lag_monitor.start()
+    await asyncio.sleep(0.01)
+    time.sleep(0.2)
+    await asyncio.sleep(0.1)
+    await lag_monitor.stop()
+    assert lag_monitor.lag > 0.05
+
+
+@pytest.mark.asyncio
+async def test_request_profiling_requires_valid_signature():
+    app = FastAPI()
+
+    @app.get("/slow/")
+    def slow():
+        time.sleep(0.05)
+        return {}
+
+    profiles = ProfileStore(5)
+    app.add_middleware(
+        RequestProfilingMiddleware,
+        secret="secret",
+        profiles=profiles,
+        interval=0.001,
+    )
+    timestamp = int(time.time())
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/slow/")
+        assert "X-Profile-Id" not in response.headers
+
+        response = await client.get(
+            "/slow/",
+            headers={
+                "X-Profile-Timestamp": str(timestamp),
+                "X-Profile-Signature": sign_profile_request(
+                    "other", "GET", "/slow/", timestamp
+                ),
+            },
+        )
+        assert "X-Profile-Id" not in response.headers
+
+        response = await client.get(
+            "/slow/",
+            headers={
+                "X-Profile-Timestamp": str(timestamp),
+                "X-Profile-Signature": sign_profile_request(
+                    "secret", "GET", "/slow/", timestamp
+                ),
+            },
+        )
+    profile = profiles.get(response.headers["X-Profile-Id"])
+    assert profile
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in profile.splitlines())
+
+
+@pytest.mark.asyncio
+async def test_memory_growth_overlapping_calls():
+    assert not tracemalloc.is_tracing()
+
+    async def allocate():
+        await asyncio.sleep(0.02)
+        return [bytearray(1024) for _ in range(100)]
+
+    first, second, _ = await asyncio.gather(
+        memory_growth(0.05, 5), memory_growth(0.1, 5), allocate()
+    )
+    assert first and second
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.fixture()
+def idempotency_app():
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.gate = asyncio.Event()
+    app.state.gate.set()
+
+    @app.post("/registration/", status_code=201)
+    async def registration(user: dict):
+        app.state.calls += 1
+        await app.state.gate.wait()
+        if user.get("fail"):
+            return JSONResponse({}, status_code=503)
+        if user.get("no_store"):
+            return JSONResponse(
+                {}, status_code=201, headers={"Cache-Control": "no-store"}
+            )
+        return {"id": app.state.calls, **user}
+
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=IdempotencyInMemoryStore(ttl=60, max_size=100),
+        paths=("/registration/",),
+        wait_timeout=1,
+    )
+    return app
+
+
+@pytest.mark.asyncio
+async def test_idempotency_replays_stored_response(idempotency_app):
+    headers = {"Idempotency-Key": "key-1"}
+    body = {"email": "user@test.com"}
+    async with AsyncClient(app=idempotency_app, base_url="http://test") as client:
+        first = await client.post("/registration/", json=body, headers=headers)
+        replay = await client.post("/registration/", json=body, headers=headers)
+        assert first.status_code == replay.status_code == 201
+        assert replay.json() == first.json() == {"id": 1, **body}
+        assert replay.headers["Idempotent-Replayed"] == "true"
+        assert idempotency_app.state.calls == 1
+
+        changed = await client.post(
+            "/registration/", json={**body, "name": "changed"}, headers=headers
+        )
+        assert changed.status_code == 422
+        assert (await client.post("/registration/", json=body)).json()["id"] == 2
+
+
+@pytest.mark.asyncio
+async def test_idempotency_concurrent_duplicates_wait(idempotency_app):
+    headers = {"Idempotency-Key": "key-2"}
+    idempotency_app.state.gate.clear()
+    async with AsyncClient(app=idempotency_app, base_url="http://test") as client:
+        requests = [
+            asyncio.create_task(
+                client.post("/registration/", json={}, headers=headers)
+            )
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.05)
+        idempotency_app.state.gate.set()
+        responses = await asyncio.gather(*requests)
+    assert {response.json()["id"] for response in responses} == {1}
+    assert idempotency_app.state.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotency_does_not_store_server_errors(idempotency_app):
+    headers = {"Idempotency-Key": "key-3"}
+    async with AsyncClient(app=idempotency_app, base_url="http://test") as client:
+        for _ in range(2):
+            response = await client.post(
+                "/registration/", json={"fail": True}, headers=headers
+            )
+            assert response.status_code == 503
+    assert idempotency_app.state.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_is_scoped_per_client(idempotency_app):
+    headers = {"Idempotency-Key": "key-4"}
+    async with AsyncClient(app=idempotency_app, base_url="http://test") as client:
+        for email in ("first@test.com", "second@test.com"):
+            response = await client.post(
+                "/registration/", json={"email": email}, headers=headers
+            )
+            assert response.status_code == 201
+            assert "Idempotent-Replayed" not in response.headers
+    assert idempotency_app.state.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_idempotency_does_not_store_no_store_responses(idempotency_app):
+    headers = {"Idempotency-Key": "key-5"}
+    body = {"email": "user@test.com", "no_store": True}
+    async with AsyncClient(app=idempotency_app, base_url="http://test") as client:
+        for _ in range(2):
+            response = await client.post(
+                "/registration/", json=body, headers=headers
+            )
+            assert response.status_code == 201
+            assert "Idempotent-Replayed" not in response.headers
+    assert idempotency_app.state.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_idempotency_store_expires_and_bounds():
+    now = [0.0]
+    store = IdempotencyInMemoryStore(ttl=10, max_size=2, clock=lambda: now[0])
+    for key in ("a", "b", "c"):
+        assert await store.reserve(key, "fingerprint") is None
+        await store.complete(key, StoredResponse(200, [], b""))
+    assert await store.reserve("a", "fingerprint") is None
+    assert (await store.reserve("c", "fingerprint")).response.status == 200
+    now[0] = 11
+    assert await store.reserve("c", "fingerprint") is None
+    assert len(store) == 2
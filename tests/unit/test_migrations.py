@@ -0,0 +1,114 @@
+import io
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy as sa
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from alembic.script import ScriptDirectory
+
+from migrations import check_head, helpers
+from migrations.helpers import (
+    backfill,
+    create_index_concurrently,
+    lock_table,
+    set_timeouts,
+)
+
+
+@pytest.fixture()
+def offline_sql():
+    buffer = io.StringIO()
+    migration_context = MigrationContext.configure(
+        dialect_name="postgresql",
+        opts={"as_sql": True, "output_buffer": buffer},
+    )
+    with Operations.context(migration_context):
+        yield buffer
+
+
+def test_script_heads_match_alembic():
+    script = ScriptDirectory.from_config(Config("alembic.ini"))
+    assert check_head.script_heads() == set(script.get_heads())
+
+
+def test_check_head(monkeypatch):
+    heads = check_head.script_heads()
+
+    async def at_head():
+        return heads
+
+    async def behind():
+        return {"ebc79e595b8d"}
+
+    monkeypatch.setattr(check_head, "database_revisions", at_head)
+    assert check_head.main() == 0
+    monkeypatch.setattr(check_head, "database_revisions", behind)
+    assert check_head.main() == 1
+
+
+def test_set_timeouts(offline_sql):
+    set_timeouts("2s", "30s")
+    sql = offline_sql.getvalue()
+    assert "SET LOCAL lock_timeout = '2s'" in sql
+    assert "SET LOCAL statement_timeout = '30s'" in sql
+
+
+def test_create_index_concurrently_runs_outside_transaction(offline_sql):
+    create_index_concurrently(
+        "ix_users_email_lower", "users", ["lower(email)"], where="shard >= 0"
+    )
+    sql = offline_sql.getvalue()
+    assert sql.index("COMMIT") < sql.index("CREATE INDEX CONCURRENTLY")
+    assert (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_lower "
+        "ON users (lower(email)) WHERE shard >= 0"
+    ) in sql
+    assert "SET lock_timeout = '5s'" in sql
+    assert "RESET lock_timeout" in sql
+
+
+def test_backfill_offline(offline_sql):
+    assert backfill("users", "locale = 'ru'", where="locale IS NULL") == 0
+    assert "UPDATE users SET locale = 'ru' WHERE locale IS NULL" in (
+        offline_sql.getvalue()
+    )
+
+
+def test_lock_table_offline(offline_sql):
+    lock_table("users", lock_timeout="2s")
+    sql = offline_sql.getvalue()
+    assert sql.index("SET LOCAL lock_timeout = '2s'") < sql.index(
+        "LOCK TABLE users IN ACCESS EXCLUSIVE MODE"
+    )
+
+
+def test_lock_table_retries_lock_timeout(monkeypatch):
+    class LockNotAvailable(Exception):
+        sqlstate = "55P03"
+
+    attempts = []
+
+    def execute(statement):
+        attempts.append(str(statement))
+        if len(attempts) < 3:
+            raise sa.exc.OperationalError("LOCK", {}, LockNotAvailable())
+
+    bind = SimpleNamespace(begin_nested=nullcontext, execute=execute)
+    monkeypatch.setattr(
+        helpers,
+        "op",
+        SimpleNamespace(
+            execute=lambda sql: None,
+            get_bind=lambda: bind,
+            get_context=lambda: SimpleNamespace(as_sql=False),
+        ),
+    )
+    lock_table("users", retries=3, retry_interval=0)
+    assert attempts == ["LOCK TABLE users IN ACCESS EXCLUSIVE MODE"] * 3
+
+    attempts.clear()
+    with pytest.raises(sa.exc.OperationalError):
+        lock_table("users", retries=2, retry_interval=0)
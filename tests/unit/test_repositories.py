@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from auth.exceptions import RepositoryUnavailableError
+from auth.models import USERS_SHARDS
+from auth.repositories import (
+    UsersFaultInjectionRepository,
+    UsersInMemoryRepository,
+    UsersResilientRepository,
+    encode_user_id,
+    is_database_failure,
+    user_id_shard,
+    user_shard,
+)
+from utils.circuit_breaker import CircuitBreaker
+
+
+@pytest.mark.asyncio
+async def test_in_memory_repository_add_and_get():
+    repo = UsersInMemoryRepository()
+    user = await repo.add_one({"email": "user@test.com", "hash_password": "hash"})
+    assert user.shard == user_shard("user@test.com")
+    assert user.id == encode_user_id(1, user.shard)
+    assert (await repo.get_one(user.id)).email == "user@test.com"
+    assert (await repo.get_one_by_email("user@test.com")).id == user.id
+    assert await repo.get_one(1000) is None
+    assert await repo.get_one_by_email("other@test.com") is None
+
+
+@pytest.mark.asyncio
+async def test_in_memory_repository_unique_email():
+    repo = UsersInMemoryRepository()
+    await repo.add_one({"email": "user@test.com", "hash_password": "hash"})
+    with pytest.raises(IntegrityError):
+        await repo.add_one({"email": "user@test.com", "hash_password": "hash"})
+    user = await repo.add_one({"email": "user2@test.com", "hash_password": "hash"})
+    assert user.id == encode_user_id(2, user.shard)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_repository_returns_copies():
+    repo = UsersInMemoryRepository()
+    user = await repo.add_one({"email": "user@test.com", "hash_password": "hash"})
+    user.hash_password = "changed"
+    assert (await repo.get_one(user.id)).hash_password == "hash"
+
+
+def test_user_shard_is_stable_and_encoded_in_id():
+    # md5("user@test.com") = 14603184...; значение зафиксировано, так как
+    # его же вычисляет SQL-функция auth_user_shard в миграции.
+    assert user_shard("user@test.com") == 0x14603184 % USERS_SHARDS
+    shards = {user_shard(f"user{i}@test.com") for i in range(1000)}
+    assert shards == set(range(USERS_SHARDS))
+    for shard in range(USERS_SHARDS):
+        assert user_id_shard(encode_user_id(12345, shard)) == shard
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def resilient_repository(repo, clock, threshold=2):
+    breaker = CircuitBreaker(
+        "test_users_db", threshold, 10, is_failure=is_database_failure, clock=clock
+    )
+    return UsersResilientRepository(
+        repo, breaker, 0.05, cache_ttl=60, cache_max_size=2, clock=clock
+    )
+
+
+@pytest.mark.asyncio
+async def test_resilient_repository_serves_refresh_from_cache():
+    clock = FakeClock()
+    memory = UsersInMemoryRepository()
+    faults = UsersFaultInjectionRepository(memory, 0, 0)
+    repo = resilient_repository(faults, clock)
+    user = await repo.add_one({"email": "user@test.com", "hash_password": "hash"})
+
+    faults.error_rate = 1
+    cached = await repo.get_one(user.id)
+    assert (cached.id, cached.email, cached.hash_password) == (
+        user.id, "user@test.com", ""
+    )
+    # Вход без хэша пароля невозможен и сразу завершается ошибкой.
+    with pytest.raises(RepositoryUnavailableError):
+        await repo.get_one_by_email("user@test.com")
+    assert repo.breaker.state == "open"
+
+    clock.now = 61
+    with pytest.raises(RepositoryUnavailableError):
+        await repo.get_one(user.id)
+
+
+@pytest.mark.asyncio
+async def test_resilient_repository_times_out_and_recovers():
+    clock = FakeClock()
+    faults = UsersFaultInjectionRepository(UsersInMemoryRepository(), 1, 0)
+    repo = resilient_repository(faults, clock, threshold=1)
+    with pytest.raises(RepositoryUnavailableError) as error:
+        await repo.get_one(1)
+    assert isinstance(error.value.__cause__, asyncio.TimeoutError)
+    assert error.value.retry_after == 10
+
+    faults.latency = 0
+    with pytest.raises(RepositoryUnavailableError):
+        await repo.get_one(1)
+    clock.now = 10
+    assert await repo.get_one(1) is None
+    assert repo.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_resilient_repository_integrity_error_is_not_failure():
+    clock = FakeClock()
+    repo = resilient_repository(UsersInMemoryRepository(), clock, threshold=1)
+    await repo.add_one({"email": "user@test.com", "hash_password": "hash"})
+    with pytest.raises(IntegrityError):
+        await repo.add_one({"email": "user@test.com", "hash_password": "hash"})
+    assert repo.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_resilient_repository_cache_is_bounded():
+    clock = FakeClock()
+    memory = UsersInMemoryRepository()
+    repo = resilient_repository(memory, clock)
+    users = [
+        await repo.add_one({"email": f"user{i}@test.com", "hash_password": "hash"})
+        for i in range(3)
+    ]
+    memory.remove(users[2].id)
+    assert await repo.get_one(users[2].id) is None
+    assert list(repo._verified) == [users[1].id]
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from auth.repositories import UsersInMemoryRepository
+from auth.services import UserService
+from rpc.client import RPCClient
+from rpc.methods import AuthRPCMethods
+from rpc.protocol import HEADER, RPCError, encode_frame, read_frame
+from rpc.server import RPCServer
+from utils.hashes import HashService
+
+
+@pytest_asyncio.fixture()
+async def rpc(tmp_path):
+    repo = UsersInMemoryRepository()
+    user = await repo.add_one(
+        {"email": "user@test.com", "hash_password": "hash"}
+    )
+    methods = AuthRPCMethods(lambda: UserService(repo, HashService))
+    server = RPCServer(methods.registry(), max_frame_size=4096, max_batch_size=10)
+    path = str(tmp_path / "rpc.sock")
+    await server.start(path=path)
+    yield server, path, user
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_rpc_tokens_and_users(rpc):
+    _, path, user = rpc
+    async with await RPCClient.connect(path=path) as client:
+        tokens = await client.call("tokens.create", {"user_id": user.id})
+        payload = await client.call(
+            "tokens.decode", {"token": tokens["refresh_token"]}
+        )
+        assert (payload["id"], payload["type"]) == (user.id, "refresh")
+        assert await client.call("tokens.decode", {"token": "invalid"}) is None
+        assert await client.call("users.get", {"id": user.id}) == {
+            "id": user.id,
+            "email": "user@test.com",
+        }
+        assert await client.call(
+            "users.get_by_email", {"email": "other@test.com"}
+        ) is None
+
+        for method in ("users.delete", "tokens.invalidate"):
+            with pytest.raises(RPCError) as error:
+                await client.call(method, {"id": user.id})
+            assert error.value.code == "method_not_found"
+        with pytest.raises(RPCError) as error:
+            await client.call("users.get", {})
+        assert error.value.code == "invalid_params"
+
+
+@pytest.mark.asyncio
+async def test_rpc_pipelining_and_batch(rpc):
+    _, path, user = rpc
+    async with await RPCClient.connect(path=path) as client:
+        users = await asyncio.gather(
+            *(client.call("users.get", {"id": user.id}) for _ in range(50))
+        )
+        assert all(found["id"] == user.id for found in users)
+
+        results = await client.batch(
+            [("users.get", {"id": user.id}), ("unknown", None)]
+        )
+        assert results[0]["email"] == "user@test.com"
+        assert isinstance(results[1], RPCError)
+
+        results = await client.batch([("keys.public", None)] * 11)
+        assert all(result.code == "invalid_request" for result in results)
+
+
+@pytest.mark.asyncio
+async def test_rpc_rejects_large_frame(rpc):
+    _, path, _ = rpc
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(HEADER.pack(10_000))
+    await writer.drain()
+    id, error, _ = await read_frame(reader)
+    assert id is None and error[0] == "invalid_request"
+    assert await reader.read() == b""
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_rpc_tcp_requires_secret():
+    with pytest.raises(ValueError):
+        await RPCServer({}).start("127.0.0.1", 0)
+
+
+@pytest.mark.asyncio
+async def test_rpc_secret(tmp_path):
+    server = RPCServer(
+        {"ping": lambda params: asyncio.sleep(0, "pong")},
+        secret="secret",
+        hello_timeout=0.05,
+    )
+    path = str(tmp_path / "rpc.sock")
+    await server.start(path=path)
+    try:
+        async with await RPCClient.connect(path=path, secret="secret") as client:
+            assert await client.call("ping") == "pong"
+
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(encode_frame([1, "ping", {}]))
+        await writer.drain()
+        assert await reader.read() == b""
+        writer.close()
+
+        with pytest.raises(RPCError) as error:
+            await RPCClient.connect(path=path, secret="wrong")
+        assert error.value.code == "unauthorized"
+
+        # Соединение без auth.hello закрывается по hello_timeout.
+        reader, writer = await asyncio.open_unix_connection(path)
+        assert await asyncio.wait_for(reader.read(), 1) == b""
+        writer.close()
+    finally:
+        await server.stop()
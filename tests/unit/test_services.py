@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+
+from auth.exceptions import CompromisedPasswordError, VerifyPasswordError
+from auth.models import User
+from auth.repositories import UsersInMemoryRepository
+from auth.schemes import UserRequestScheme
+from auth.services import UserService
+
+
+class SlowHashService:
+    """Хэш-сервис, считающий количество проверок пароля"""
+
+    calls = 0
+
+    @classmethod
+    def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
+        cls.calls += 1
+        time.sleep(0.05)
+        return plain_password == hashed_password
+
+
+class StaticRepository:
+    """Репозиторий с единственным пользователем"""
+
+    @staticmethod
+    async def get_one_by_email(email: str):
+        return User(id=1, email=email, hash_password="12345678")
+
+
+@pytest.fixture()
+def slow_user_service():
+    SlowHashService.calls = 0
+    return UserService(StaticRepository, SlowHashService)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_logins_share_one_verification(slow_user_service):
+    auth_user = UserRequestScheme(email="user@test.com", password="12345678")
+    users = await asyncio.gather(
+        *(slow_user_service.authenticate_user(auth_user) for _ in range(5))
+    )
+    assert all(user.id == 1 for user in users)
+    assert SlowHashService.calls == 1
+    assert len(UserService._verifications) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_passwords_are_not_coalesced(slow_user_service):
+    valid = UserRequestScheme(email="user@test.com", password="12345678")
+    invalid = UserRequestScheme(email="user@test.com", password="87654321")
+    results = await asyncio.gather(
+        slow_user_service.authenticate_user(valid),
+        slow_user_service.authenticate_user(invalid),
+        return_exceptions=True,
+    )
+    assert results[0].id == 1
+    assert isinstance(results[1], VerifyPasswordError)
+    assert SlowHashService.calls == 2
+
+
+class BreachedPasswords:
+    """Список утёкших паролей из одного пароля"""
+
+    @staticmethod
+    def is_breached(password: str) -> bool:
+        return password == "qwerty123"
+
+
+@pytest.mark.asyncio
+async def test_add_one_rejects_breached_password():
+    repo = UsersInMemoryRepository()
+    service = UserService(repo, SlowHashService, BreachedPasswords)
+    with pytest.raises(CompromisedPasswordError):
+        await service.add_one(
+            UserRequestScheme(email="user@test.com", password="qwerty123")
+        )
+    assert await repo.get_one_by_email("user@test.com") is None
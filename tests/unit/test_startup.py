@@ -0,0 +1,66 @@
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup import APPLICATION_DIR, import_times, is_application_module
+
+# Бюджеты с запасом примерно в 2.5 раза от замеров на рабочей машине
+# (около 580 мс на импорт main, из них около 45 мс - модули приложения).
+# Зависят от скорости машины, поэтому запускаются отдельно:
+# pytest -m benchmark
+IMPORT_MAIN_BUDGET_MS = 1500
+APPLICATION_MODULES_BUDGET_MS = 120
+
+# Модули, которые загружаются только при первом использовании.
+LAZY_MODULES = (
+    "asyncpg",
+    "passlib.context",
+    "jose",
+    "opentelemetry",
+    "uvicorn.workers",
+)
+
+
+@pytest.fixture(scope="module")
+def main_import_times():
+    samples = [import_times("main") for _ in range(3)]
+    return min(samples, key=lambda times: times["main"][1])
+
+
+@pytest.mark.benchmark
+def test_main_import_time_budget(main_import_times):
+    assert main_import_times["main"][1] / 1000 < IMPORT_MAIN_BUDGET_MS
+
+
+@pytest.mark.benchmark
+def test_application_modules_import_time_budget(main_import_times):
+    own = sum(
+        self_us
+        for name, (self_us, _) in main_import_times.items()
+        if is_application_module(name)
+    )
+    assert own / 1000 < APPLICATION_MODULES_BUDGET_MS
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_heavy_modules_are_imported_lazily(main_import_times, module):
+    assert module not in main_import_times
+
+
+def test_settings_are_read_lazily():
+    # Settings() читает .env: при импорте приложения настройки
+    # не создаются, их читает create_app().
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import main, settings; "
+            "print(settings.get_settings.cache_info().currsize)",
+        ],
+        cwd=APPLICATION_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "0"
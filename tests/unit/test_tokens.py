@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils.tokens import AccessTokenCache, JWTTokenService
+
+
+@pytest.fixture()
+def token_cache(monkeypatch):
+    cache = AccessTokenCache(max_size=2, min_remaining_seconds=60)
+    monkeypatch.setattr(
+        JWTTokenService, "access_token_cache", staticmethod(lambda: cache)
+    )
+    return cache
+
+
+def test_refresh_reuses_fresh_access_token(token_cache: AccessTokenCache):
+    access, expire, refresh = JWTTokenService.create_tokens({"id": 1})
+    reused, reused_expire, new_refresh = JWTTokenService.create_tokens(
+        {"id": 1}, reuse_access_token=True
+    )
+    assert reused == access
+    assert reused_expire == expire
+    assert JWTTokenService.decode_jwt_token(new_refresh)["type"] == "refresh"
+    assert token_cache.hits.value >= 1
+
+
+def test_invalidate_access_token(token_cache: AccessTokenCache):
+    JWTTokenService.create_tokens({"id": 1})
+    JWTTokenService.invalidate_access_token(1)
+    assert token_cache.get(1) is None
+
+
+def test_cache_evicts_stale_and_oldest_tokens(token_cache: AccessTokenCache):
+    now = datetime.now(timezone.utc)
+    token_cache.set(1, "stale", now + timedelta(seconds=30))
+    assert token_cache.get(1) is None
+    token_cache.set(1, "first", now + timedelta(minutes=5))
+    token_cache.set(2, "second", now + timedelta(minutes=5))
+    token_cache.set(3, "third", now + timedelta(minutes=5))
+    assert len(token_cache) == 2
+    assert token_cache.get(1) is None
+    assert token_cache.get(3) == ("third", now + timedelta(minutes=5))
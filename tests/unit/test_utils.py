@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from utils import tracing
+from utils.bloom import BloomFilter, main as build_bloom
+from settings import get_settings
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def sha1(password: str) -> bytes:
+    return hashlib.sha1(password.encode()).digest()
+
+
+def test_bloom_filter_build_and_lookup(tmp_path):
+    source = tmp_path / "passwords.txt"
+    hashes = "".join(
+        f"{hashlib.sha1(f'password{i}'.encode()).hexdigest().upper()}:{i}\n"
+        for i in range(1000)
+    )
+    source.write_text(hashes + "not a hash\n")
+    output = tmp_path / "passwords.bloom"
+    build_bloom([str(source), str(output), "--fp-rate", "0.001"])
+
+    bloom = BloomFilter.open(str(output))
+    assert all(sha1(f"password{i}") in bloom for i in range(1000))
+    false_positives = sum(sha1(f"other{i}") in bloom for i in range(1000))
+    assert false_positives < 10
+    bloom.close()
+
+
+@pytest.mark.parametrize("rate", ["0", "1", "-0.1", "1.5", "nan", "abc"])
+def test_bloom_filter_rejects_invalid_fp_rate(tmp_path, rate):
+    source = tmp_path / "passwords.txt"
+    source.write_text("")
+    with pytest.raises(SystemExit):
+        build_bloom([str(source), str(tmp_path / "out"), "--fp-rate", rate])
+    with pytest.raises(ValueError, match=r"\(0, 1\)"):
+        BloomFilter.optimal_parameters(10, 1.0)
+
+
+@pytest.mark.parametrize("size", [0, 10, -1])
+def test_bloom_filter_open_rejects_truncated_file(tmp_path, size):
+    source = tmp_path / "passwords.txt"
+    source.write_text(hashlib.sha1(b"password").hexdigest() + "\n")
+    output = tmp_path / "passwords.bloom"
+    build_bloom([str(source), str(output)])
+    with open(output, "r+b") as file:
+        file.truncate(size if size >= 0 else output.stat().st_size + size)
+    with pytest.raises(ValueError, match="обрезан"):
+        BloomFilter.open(str(output))
+
+
+@pytest.fixture()
+def span_exporter(monkeypatch):
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "_tracer", provider.get_tracer("test"))
+    return exporter
+
+
+def test_shutdown_tracing_closes_file_exporter(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(
+        get_settings(), "TRACING_FILE_PATH", str(tmp_path / "spans.jsonl")
+    )
+    tracing._create_exporter()
+    exporter_file = tracing._exporter_file
+    assert not exporter_file.closed
+    tracing.shutdown_tracing()
+    assert exporter_file.closed
+    assert tracing._exporter_file is None
+
+
+@pytest.mark.asyncio
+async def test_traced_creates_nested_spans(span_exporter):
+    @tracing.traced("inner")
+    def inner():
+        return 1
+
+    @tracing.traced("outer")
+    async def outer():
+        return await asyncio.to_thread(inner)
+
+    assert await outer() == 1
+    spans = {span.name: span for span in span_exporter.get_finished_spans()}
+    assert spans["inner"].parent.span_id == spans["outer"].context.span_id
+
+
+@pytest.mark.asyncio
+async def test_tracing_middleware_continues_incoming_trace(span_exporter):
+    app = FastAPI()
+
+    @app.get("/traced/")
+    async def traced_endpoint():
+        return {}
+
+    app.add_middleware(tracing.TracingMiddleware)
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(
+            "/traced/",
+            headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+        )
+    assert response.status_code == 200
+    (span,) = span_exporter.get_finished_spans()
+    assert format(span.context.trace_id, "032x") == trace_id
+    assert span.attributes["http.response.status_code"] == 200
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_probes():
+    now = [0.0]
+    breaker = CircuitBreaker(
+        "test", 2, 5, is_failure=lambda e: isinstance(e, OSError),
+        clock=lambda: now[0],
+    )
+
+    async def fail():
+        raise OSError("down")
+
+    async def ok():
+        return "ok"
+
+    for _ in range(2):
+        with pytest.raises(OSError):
+            await breaker.call(fail)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as error:
+        await breaker.call(ok)
+    assert error.value.retry_after == 5
+
+    now[0] = 5
+    assert breaker.state == "half_open"
+    with pytest.raises(OSError):
+        await breaker.call(fail)
+    assert breaker.state == "open"
+
+    now[0] = 10
+    probe = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(0, "ok")))
+    await asyncio.sleep(0)
+    # Пока выполняется пробный вызов, остальные отклоняются.
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(ok)
+    assert await probe == "ok"
+    assert breaker.state == "closed"
+
+    async def invalid():
+        raise ValueError("bad request")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await breaker.call(invalid)
+    assert breaker.state == "closed"